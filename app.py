@@ -1,9 +1,10 @@
 import streamlit as st
-import tempfile
 import os
 import json
 from datetime import datetime
+from spacy.util import is_package
 from extraction_enhanced import PDFExtractor
+from core.ner_confidence import SERVING_BEAM_WIDTH
 
 # Configuration de la page
 st.set_page_config(
@@ -26,18 +27,14 @@ def get_available_models():
     """Détecte tous les modèles disponibles."""
     models = {}
 
-    # Modèle spaCy par défaut
-    try:
-        import spacy
-        spacy.load("fr_core_news_md")
+    # Modèle spaCy par défaut (package installé, vérifié sans le charger)
+    if is_package("fr_core_news_md"):
         models["spacy_default"] = {
             "name": "📚 Modèle spaCy par défaut",
             "description": "Modèle français général de spaCy",
             "path": None,
             "type": "default"
         }
-    except:
-        pass
 
     # Modèle général entraîné
     if os.path.exists("models/general_model"):
@@ -66,6 +63,16 @@ def get_available_models():
             "type": "trained"
         }
 
+    # Modèles compacts distillés (python -m training.distill --domain <domaine>)
+    for domain, label in (("general", "général"), ("medical", "médical"), ("legal", "juridique")):
+        if os.path.exists(f"models/{domain}_compact_model"):
+            models[f"{domain}_compact"] = {
+                "name": f"⚡ Modèle {label} compact",
+                "description": f"Modèle {label} distillé, plus rapide",
+                "path": f"models/{domain}_compact_model",
+                "type": "distilled"
+            }
+
     return models
 
 # Chargement des modèles disponibles
@@ -90,7 +97,7 @@ st.sidebar.markdown("---")
 st.sidebar.subheader("📊 Informations du modèle")
 st.sidebar.info(f"**Type:** {selected_model['description']}")
 
-if selected_model["type"] == "trained" and selected_model["path"]:
+if selected_model["type"] in ("trained", "distilled") and selected_model["path"]:
     metadata_path = f"{selected_model['path']}/model_info.json"
     if os.path.exists(metadata_path):
         try:
@@ -112,6 +119,17 @@ st.sidebar.markdown("---")
 st.sidebar.subheader("🔧 Options d'affichage")
 show_metadata = st.sidebar.checkbox("Afficher les métadonnées", value=True)
 show_confidence = st.sidebar.checkbox("Afficher les scores", value=False)
+drop_boilerplate = st.sidebar.checkbox(
+    "Ignorer les en-têtes et pieds de page répétés",
+    value=False,
+    help="Retire les lignes répétées (en-têtes, mentions légales...) avant l'analyse par le modèle"
+)
+anchors_only = st.sidebar.checkbox(
+    "Analyser uniquement autour des étiquettes",
+    value=False,
+    help="Le modèle n'analyse que de courtes fenêtres après les étiquettes (« Nom : », « Date : »...), "
+         "plus rapide sur les longs rapports"
+)
 
 # Section gestion des modèles
 st.sidebar.markdown("---")
@@ -122,12 +140,21 @@ if st.sidebar.button("🔄 Actualiser les modèles"):
     st.cache_data.clear()
     st.rerun()
 
+# Cache du texte extrait : évite de réanalyser les PDF déjà soumis
+PDF_TEXT_CACHE_DIR = ".cache/pdf_text"
+# Croissance mémoire maximale par document : au-delà, seules les pages déjà lues sont analysées
+PDF_MEMORY_CEILING_MB = 1024
+
 # Fonction pour charger l'extracteur
 @st.cache_resource
-def load_extractor(model_path):
+def load_extractor(model_path, drop_boilerplate=False, anchors_only=False):
     """Charge l'extracteur avec le modèle spécifié."""
     try:
-        return PDFExtractor(model_path)
+        return PDFExtractor(model_path, cache_dir=PDF_TEXT_CACHE_DIR,
+                            max_memory_mb=PDF_MEMORY_CEILING_MB,
+                            drop_boilerplate=drop_boilerplate,
+                            ner_scope="anchors" if anchors_only else "full",
+                            beam_width=SERVING_BEAM_WIDTH)
     except Exception as e:
         st.error(f"❌ Erreur lors du chargement du modèle: {e}")
         return None
@@ -154,7 +181,7 @@ with col2:
     """)
 
     # Statistiques du modèle
-    if selected_model["type"] == "trained":
+    if selected_model["type"] in ("trained", "distilled"):
         st.markdown("### 📊 Performances")
         metadata_path = f"{selected_model['path']}/model_info.json"
         if os.path.exists(metadata_path):
@@ -175,15 +202,13 @@ with col2:
 if uploaded_file:
     # Charger l'extracteur avec le modèle sélectionné
     model_path = selected_model["path"]
-    extracteur = load_extractor(model_path)
+    extracteur = load_extractor(model_path, drop_boilerplate, anchors_only)
 
     if not extracteur:
         st.stop()
-
-    # Enregistrement temporaire du PDF
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-        tmp_file.write(uploaded_file.read())
-        chemin_temp = tmp_file.name
+    if selected_model["type"] in ("trained", "distilled") and not extracteur.use_trained_model:
+        # Dossier présent mais modèle illisible : l'extracteur s'est replié sur le modèle par défaut
+        st.warning(f"⚠️ {selected_model['name']} ne se charge pas : extraction avec le modèle spaCy par défaut")
 
     # Affichage des informations du fichier
     st.markdown("---")
@@ -206,7 +231,8 @@ if uploaded_file:
     with st.spinner(f"Analyse en cours avec {selected_model['name']}..."):
         try:
             start_time = datetime.now()
-            donnees = extracteur.extraire_infos(chemin_temp)
+            # Le fichier uploadé est passé directement, sans copie sur disque
+            donnees = extracteur.extract_from_stream(uploaded_file)
             end_time = datetime.now()
             processing_time = (end_time - start_time).total_seconds()
 
@@ -221,6 +247,12 @@ if uploaded_file:
         # Métadonnées
         metadata = donnees.pop("_metadata", {})
         
+        if metadata.get("status") == "no_text_layer":
+            st.warning("🖼️ Aucune couche texte dans ce PDF (document scanné ?) : aucune information n'a pu être extraite")
+        
+        if metadata.get("memory_truncated"):
+            st.warning(f"⚠️ Document trop volumineux : seules {metadata.get('pdf_pages_read')} page(s) ont été analysées")
+        
         # Résultats principaux
         col1, col2 = st.columns(2)
         
@@ -228,9 +260,19 @@ if uploaded_file:
             st.markdown("### 📊 Données extraites")
             
             # Affichage structuré des résultats
+            confidences = metadata.get("confidences", {})
+            sources = metadata.get("field_sources", {})
             for field, value in donnees.items():
                 if value:
-                    st.success(f"**{field.replace('_', ' ').title()}**: {value}")
+                    score = ""
+                    if show_confidence:
+                        if sources.get(field) == "regex":
+                            score = " — *regex*"
+                        elif sources.get(field) == "labels":
+                            score = " — *étiquette*"
+                        elif field in confidences:
+                            score = f" — score {confidences[field]:.0%}"
+                    st.success(f"**{field.replace('_', ' ').title()}**: {value}{score}")
                 else:
                     st.warning(f"**{field.replace('_', ' ').title()}**: Non trouvé")
         
@@ -277,7 +319,17 @@ if uploaded_file:
                 st.metric("Champs regex", metadata.get("regex_fields", 0))
             with col4:
                 st.metric("Longueur texte", f"{metadata.get('text_length', 0)} chars")
-        
+
+            cascade = metadata.get("cascade")
+            if cascade:
+                st.caption("Cascade : " + " → ".join(
+                    f"{name} ({stats['time_ms']:.1f} ms, {stats['satisfied']}/{stats['fields']} champs)"
+                    if stats["runs"] else f"{name} (sautée)"
+                    for name, stats in cascade["stages"].items()
+                ))
+            if metadata.get("regex_timeout"):
+                st.warning(f"⏱️ Regex interrompues (budget de temps dépassé, moteur {metadata.get('regex_engine')})")
+
         # Affichage JSON complet
         with st.expander("🔍 Voir les données brutes (JSON)"):
             st.json(donnees)
@@ -285,12 +337,6 @@ if uploaded_file:
     else:
         st.warning("⚠️ Aucune donnée extraite du document")
 
-    # Nettoyage
-    try:
-        os.unlink(chemin_temp)
-    except:
-        pass
-
 # Footer avec informations
 st.markdown("---")
 col1, col2, col3 = st.columns(3)
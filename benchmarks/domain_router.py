@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Mesure le routeur de domaine : exactitude sur des textes produits par les
+générateurs d'entraînement et surcoût du routage face à l'analyse NER.
+
+    python -m benchmarks.domain_router --count 300 --model models/general_model
+"""
+
+import argparse
+import statistics
+import time
+from collections import Counter
+
+from core.domain_router import DomainRouter
+from core.generator_vocab import GENERATORS, generate_texts
+from core.nlp_profiles import load_pipeline
+
+
+def main():
+    """Affiche l'exactitude par domaine et le temps de routage comparé au temps NER."""
+    parser = argparse.ArgumentParser(description="Benchmark du routeur de domaine")
+    parser.add_argument("--count", type=int, default=300, help="Textes générés par domaine")
+    parser.add_argument("--model", help="Modèle NER de référence pour comparer les temps (optionnel)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    router = DomainRouter()
+    print(f"🧭 Index: {len(router.index)} mots-clés, construit en {(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+    samples = {domain: generate_texts(domain, args.count) for domain in GENERATORS}
+    route_us = []
+    print(f"{'domaine':<10} {'exactitude':>10} {'confiance':>10}  décisions")
+    for domain, texts in samples.items():
+        decisions = Counter()
+        confidences = []
+        for text in texts:
+            start = time.perf_counter()
+            routing = router.route(text)
+            route_us.append((time.perf_counter() - start) * 1e6)
+            decisions[routing["domain"]] += 1
+            confidences.append(routing["confidence"])
+        print(f"{domain:<10} {decisions[domain] / len(texts):>10.1%} {statistics.mean(confidences):>10.2f}  "
+              f"{dict(decisions)}")
+
+    route_mean = statistics.mean(route_us)
+    print(f"\n⏱️ Routage: {route_mean:.1f} µs/document (médiane {statistics.median(route_us):.1f} µs)")
+
+    if args.model:
+        nlp = load_pipeline(args.model)
+        texts = [text for domain_texts in samples.values() for text in domain_texts]
+        nlp(texts[0])
+        start = time.perf_counter()
+        for text in texts:
+            nlp(text)
+        ner_us = (time.perf_counter() - start) / len(texts) * 1e6
+        print(f"⏱️ NER ({args.model}): {ner_us:.0f} µs/document, "
+              f"surcoût du routage: {route_mean / ner_us:.2%} d'un passage NER")
+
+
+if __name__ == "__main__":
+    main()
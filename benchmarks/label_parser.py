@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Mesure l'analyse « Étiquette : valeur » (core/label_parser.py) sur des documents
+générés de chaque domaine : part des documents dont les cinq champs sont remplis
+(le modèle NER n'est alors pas appelé), exactitude des valeurs par rapport aux
+annotations, et temps par document, comparé à celui du modèle si --model est donné.
+
+    python -m benchmarks.label_parser --count 1000 --model models/medical_model
+"""
+
+import argparse
+import time
+
+from core.fields import NER_LABEL_TO_FIELD
+from core.generator_vocab import GENERATORS, generate_examples
+from core.label_parser import LabelParser, default_label_parser
+
+
+def main():
+    """Affiche, par domaine, la part des documents complets, l'exactitude et le temps par document."""
+    parser = argparse.ArgumentParser(description="Benchmark de l'analyse étiquette/valeur")
+    parser.add_argument("--count", type=int, default=1000, help="Documents générés par domaine")
+    parser.add_argument("--model", help="Modèle spaCy dont le temps par document sert de comparaison")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    LabelParser()
+    print(f"Construction : {(time.perf_counter() - start) * 1000:.1f} ms")
+    label_parser = default_label_parser()
+
+    nlp = None
+    if args.model:
+        from core.nlp_profiles import load_pipeline
+        nlp = load_pipeline(args.model)
+
+    print(f"{'domaine':<10} {'complets':>9} {'exacts':>8} {'µs/doc':>8}" + (f" {'modèle µs/doc':>14}" if nlp else ""))
+    for domain in GENERATORS:
+        examples = generate_examples(domain, args.count)
+        texts = [text for text, _ in examples]
+
+        start = time.perf_counter()
+        results = [label_parser.parse(text) for text in texts]
+        parse_us = (time.perf_counter() - start) / len(texts) * 1e6
+
+        complete = sum(label_parser.complete(entities) for entities in results)
+        # Valeurs trouvées identiques aux entités annotées
+        exact = sum(
+            all(value == text[entity_start:entity_end]
+                for field, (value, *_) in entities.items()
+                for entity_start, entity_end, label in annotations["entities"]
+                if NER_LABEL_TO_FIELD.get(label) == field)
+            for (text, annotations), entities in zip(examples, results)
+        )
+        line = f"{domain:<10} {complete / len(texts):>9.1%} {exact / len(texts):>8.1%} {parse_us:>8.1f}"
+        if nlp is not None:
+            start = time.perf_counter()
+            for _ in nlp.pipe(texts):
+                pass
+            line += f" {(time.perf_counter() - start) / len(texts) * 1e6:>14.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Compare les profils d'inférence spaCy (pipeline complet / NER seul) :
+temps de chargement, latence par document et mémoire résidente.
+
+Chaque couple (modèle, profil) est mesuré dans un processus neuf pour que
+la mémoire d'un profil ne fausse pas celle du suivant.
+
+    python -m benchmarks.nlp_profiles test_files/ --models models/general_model
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from core.memory import current_rss_mb
+from core.nlp_profiles import NLP_PROFILES, load_pipeline
+from core.pdf_reader import PDFReader
+
+DEFAULT_MODELS = ["models/general_model", "models/medical_model", "models/legal_model"]
+
+
+def load_texts(sample_dir: str) -> List[str]:
+    """Texte complet des PDF d'un dossier."""
+    reader = PDFReader()
+    texts = [reader.read(str(path))[0] for path in sorted(Path(sample_dir).glob("*.pdf"))]
+    return [text for text in texts if text.strip()]
+
+
+def _measure(model: str, profile: str, texts: List[str], repeats: int) -> Dict:
+    """Mesure un profil (exécuté dans un processus dédié)."""
+    rss_start = current_rss_mb()
+    start = time.perf_counter()
+    nlp = load_pipeline(model, profile)
+    load_s = time.perf_counter() - start
+    rss_loaded = current_rss_mb()
+
+    # Premier passage non mesuré (allocation des buffers)
+    nlp(texts[0])
+    latencies = []
+    for _ in range(repeats):
+        for text in texts:
+            start = time.perf_counter()
+            nlp(text)
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    return {
+        "components": list(nlp.pipe_names),
+        "load_s": round(load_s, 2),
+        "model_rss_mb": round(rss_loaded - rss_start, 1),
+        "rss_mb": round(current_rss_mb(), 1),
+        "latency_ms": round(statistics.mean(latencies), 2),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 2)
+    }
+
+
+def main():
+    """Mesure chaque profil pour chaque modèle et affiche le tableau comparatif."""
+    parser = argparse.ArgumentParser(description="Benchmark des profils d'inférence spaCy")
+    parser.add_argument("sample_dir", help="Dossier contenant des PDF représentatifs")
+    parser.add_argument("--models", nargs="+", default=DEFAULT_MODELS, help="Modèles à mesurer")
+    parser.add_argument("--profiles", nargs="+", default=["complet", "ner"],
+                        choices=sorted(NLP_PROFILES), help="Profils à comparer")
+    parser.add_argument("--repeats", type=int, default=5, help="Passages sur l'ensemble des documents")
+    args = parser.parse_args()
+
+    texts = load_texts(args.sample_dir)
+    if not texts:
+        print(f"❌ Aucun PDF avec du texte dans {args.sample_dir}")
+        return
+    print(f"📄 {len(texts)} document(s), {sum(len(t) for t in texts)} caractères, {args.repeats} passage(s)\n")
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{'modèle':<28} {'profil':<9} {'chargement':>10} {'RSS modèle':>11} {'RSS':>8} {'latence':>9} {'p95':>9}")
+    for model in args.models:
+        for profile in args.profiles:
+            with context.Pool(1) as pool:
+                try:
+                    result = pool.apply(_measure, (model, profile, texts, args.repeats))
+                except Exception as e:
+                    print(f"{model:<28} {profile:<9} ❌ {e}")
+                    continue
+            print(f"{model:<28} {profile:<9} {result['load_s']:>9.2f}s {result['model_rss_mb']:>8.1f} Mo"
+                  f" {result['rss_mb']:>5.0f} Mo {result['latency_ms']:>6.2f} ms {result['p95_ms']:>6.2f} ms"
+                  f"  [{', '.join(result['components'])}]")
+
+
+if __name__ == "__main__":
+    main()
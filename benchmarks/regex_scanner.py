@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Compare le scanner regex en une passe (core/regex_scanner.py) à l'ancienne boucle
+re.search par champ et par pattern, sur des textes courts générés et sur des
+textes d'une centaine de pages, puis au moteur RE2 (google-re2, si installé). Les
+résultats des méthodes sont comparés pour chaque texte. Le dernier cas, une seule
+ligne où le préfixe « nom » revient sans valeur, fait reculer le moteur re à chaque
+occurrence (coût quadratique) mais pas RE2.
+
+    python -m benchmarks.regex_scanner --count 300 --pages 100 --repeated 2000
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Callable, Dict, List, Sequence
+
+from core.fields import REGEX_PATTERNS
+from core.generator_vocab import GENERATORS, generate_texts
+from core.regex_scanner import DEFAULT_REGEX_FLAGS, RegexScanner, re2
+from extraction_enhanced import PATTERNS_REGEX
+
+# Caractères par page des textes longs
+PAGE_CHARS = 3000
+
+FILLER_WORDS = ("le", "patient", "présente", "une", "évolution", "favorable", "du", "traitement",
+                "compte", "rendu", "résultats", "conformes", "aux", "valeurs", "de", "référence",
+                "contrôle", "prévu", "dans", "trois", "mois", "observations", "cliniques")
+
+
+def loop_scan(patterns: Dict[str, Sequence[str]], text: str, fields=None) -> Dict[str, str]:
+    """
+    Ancienne méthode : un re.search par pattern, dans l'ordre des champs (un pattern
+    sans groupe, qui levait une erreur, prend ici toute la correspondance).
+    """
+    results = {}
+    for field, pattern_list in patterns.items():
+        if fields is not None and field not in fields:
+            continue
+        for pattern in pattern_list:
+            match = re.search(pattern, text, DEFAULT_REGEX_FLAGS)
+            if match:
+                value = (match.group(1) if match.re.groups else match.group(0)).strip()
+                if value and len(value) > 1:
+                    results[field] = value
+                    break
+    return results
+
+
+def long_text(rng: random.Random, pages: int, header: str, labelled_last_page: bool) -> str:
+    """Texte de plusieurs pages : en-tête étiqueté sur la première (ou la dernière) page, prose ailleurs."""
+    filler = []
+    for _ in range(pages - 1):
+        words = []
+        while sum(len(word) + 1 for word in words) < PAGE_CHARS:
+            words.append(rng.choice(FILLER_WORDS))
+        filler.append(" ".join(words))
+    parts = filler + [header] if labelled_last_page else [header] + filler
+    return "\n".join(parts)
+
+
+def time_per_text(scan: Callable[[str], Dict], texts: List[str], repeats: int) -> float:
+    """Temps moyen par texte en µs (meilleur de plusieurs passages)."""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for text in texts:
+            scan(text)
+        elapsed = (time.perf_counter() - start) / len(texts) * 1e6
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    """Affiche le temps par texte des deux méthodes et vérifie qu'elles donnent les mêmes champs."""
+    parser = argparse.ArgumentParser(description="Benchmark du scanner regex en une passe")
+    parser.add_argument("--count", type=int, default=300, help="Textes courts générés par domaine")
+    parser.add_argument("--pages", type=int, default=100, help="Pages des textes longs")
+    parser.add_argument("--long-count", type=int, default=5, help="Nombre de textes longs par cas")
+    parser.add_argument("--repeated", type=int, default=2000,
+                        help="Occurrences du préfixe dans le texte d'une ligne sans valeur")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    short = [text for domain in GENERATORS for text in generate_texts(domain, args.count)]
+    cases = {
+        "courts": short,
+        f"{args.pages} p., étiquettes au début": [long_text(rng, args.pages, rng.choice(short), False)
+                                                  for _ in range(args.long_count)],
+        f"{args.pages} p., étiquettes à la fin": [long_text(rng, args.pages, rng.choice(short), True)
+                                                  for _ in range(args.long_count)],
+        f"{args.pages} p., sans étiquette": [long_text(rng, args.pages, "", False) for _ in range(args.long_count)],
+        "une ligne, « nom » répété": [" ".join(["nom"] * args.repeated) + " 1"]
+    }
+    pattern_sets = {"MultiModelExtractor": REGEX_PATTERNS, "PDFExtractor": PATTERNS_REGEX}
+
+    if re2 is None:
+        print("google-re2 non installé : colonne re2 absente")
+    print(f"{'patterns':<20} {'textes':<32} {'boucle µs':>12} {'une passe µs':>13} {'gain':>6}"
+          + (f" {'re2 µs':>10}" if re2 else "") + "  identiques")
+    for name, patterns in pattern_sets.items():
+        scanner = RegexScanner(patterns, engine="re")
+        linear = RegexScanner(patterns, engine="re2") if re2 else None
+        for case, texts in cases.items():
+            same = sum(scanner.scan(text) == loop_scan(patterns, text)
+                       and (linear is None or linear.scan(text) == scanner.scan(text)) for text in texts)
+            repeats = args.repeats if len(texts) > args.long_count else 1
+            loop_us = time_per_text(lambda text: loop_scan(patterns, text), texts, repeats)
+            scan_us = time_per_text(scanner.scan, texts, repeats)
+            line = f"{name:<20} {case:<32} {loop_us:>12.1f} {scan_us:>13.1f} {loop_us / scan_us:>5.1f}x"
+            if linear is not None:
+                line += f" {time_per_text(linear.scan, texts, repeats):>10.1f}"
+            print(f"{line}  {same}/{len(texts)}")
+
+
+if __name__ == "__main__":
+    main()
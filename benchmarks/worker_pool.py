@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Mesure le pool d'extraction pré-forké : débit selon le nombre de workers et
+mémoire propre à chaque worker (pages non partagées avec le parent).
+
+    python -m benchmarks.worker_pool test_files/ --workers 1 2 4 --repeats 10
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from core.extraction_system import extractor
+from core.memory import process_memory_mb
+from core.worker_pool import WorkerPool
+
+
+def main():
+    """Compare l'extraction séquentielle au pool pour chaque nombre de workers."""
+    parser = argparse.ArgumentParser(description="Benchmark du pool d'extraction pré-forké")
+    parser.add_argument("sample_dir", help="Dossier contenant des PDF représentatifs")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Tailles de pool à mesurer")
+    parser.add_argument("--repeats", type=int, default=10, help="Passages sur l'ensemble des documents")
+    args = parser.parse_args()
+
+    # Octets en mémoire : le débit mesuré ne dépend pas du disque
+    documents = [path.read_bytes() for path in sorted(Path(args.sample_dir).glob("*.pdf"))] * args.repeats
+    if not documents:
+        print(f"❌ Aucun PDF dans {args.sample_dir}")
+        return
+
+    start = time.perf_counter()
+    for document in documents:
+        extractor.extract_document(document)
+    sequential = len(documents) / (time.perf_counter() - start)
+    # Après le passage séquentiel : modèles chargés à leur première utilisation
+    parent = process_memory_mb()
+    print(f"📄 {len(documents)} document(s), modèles chargés: {', '.join(extractor.models.loaded()) or 'aucun'}")
+    print(f"{'séquentiel':<12} {sequential:>8.1f} doc/s {'':>9} RSS processus {parent.get('rss', 0):>7.1f} Mo\n")
+
+    print(f"{'workers':<12} {'débit':>12} {'accél.':>8} {'privé/worker':>13} {'PSS total':>10}")
+    for workers in args.workers:
+        with WorkerPool(workers, extractor) as pool:
+            list(pool.map(documents[:workers]))
+            start = time.perf_counter()
+            list(pool.map(documents))
+            throughput = len(documents) / (time.perf_counter() - start)
+            memory = list(pool.memory().values())
+        private = statistics.mean(usage.get("private", 0.0) for usage in memory)
+        pss = sum(usage.get("pss", 0.0) for usage in memory) + process_memory_mb().get("pss", 0.0)
+        print(f"{workers:<12} {throughput:>8.1f} doc/s {throughput / sequential:>7.2f}x "
+              f"{private:>10.1f} Mo {pss:>7.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
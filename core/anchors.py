@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Fenêtres d'ancrage : repère les étiquettes de champs (« Nom : », « Prélevé le : »...)
+et ne garde qu'une courte fenêtre de texte après chacune, pour que le modèle NER
+n'analyse pas les pages de texte libre (conclusions, commentaires...).
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional, Pattern, Tuple
+
+from core.generator_vocab import label_prefixes
+from core.offsets import OffsetMap
+
+# Portées de l'analyse NER : tout le texte ou seulement les fenêtres d'ancrage
+NER_SCOPES = ("full", "anchors")
+
+# Longueur maximale d'une fenêtre après l'étiquette, en caractères
+DEFAULT_WINDOW_CHARS = 160
+
+
+def build_anchor_pattern(prefixes: Iterable[str]) -> Pattern:
+    """Expression unique reconnaissant n'importe quelle étiquette suivie de « : »."""
+    labels = {re.sub(r"\s*:\s*$", "", prefix).strip() for prefix in prefixes}
+    # Les plus longues d'abord : « Date de prélèvement » avant « Date »
+    alternatives = [r"\s+".join(map(re.escape, label.split())) for label in sorted(labels, key=len, reverse=True) if label]
+    return re.compile(r"(?<!\w)(?:" + "|".join(alternatives) + r")\s*:", re.IGNORECASE)
+
+
+@lru_cache(maxsize=None)
+def default_anchor_pattern() -> Pattern:
+    """Étiquettes de tous les générateurs d'entraînement (construit une fois par processus)."""
+    return build_anchor_pattern(prefix for prefixes in label_prefixes().values() for prefix in prefixes)
+
+
+def _value_end(text: str, position: int, window_chars: int) -> int:
+    """Fin de la valeur suivant une étiquette : fin de ligne, ou dernier espace avant la limite."""
+    limit = min(len(text), position + window_chars)
+    # La valeur peut commencer à la ligne suivante (« Nom :\nDUPONT »)
+    start = position
+    while start < limit and text[start].isspace():
+        start += 1
+    end = text.find("\n", start, limit)
+    if end != -1:
+        return end
+    if limit < len(text):
+        # Ne pas couper un mot en fin de fenêtre
+        space = text.rfind(" ", start, limit)
+        if space > start:
+            return space
+    return limit
+
+
+def anchor_spans(text: str, pattern: Optional[Pattern] = None,
+                 window_chars: int = DEFAULT_WINDOW_CHARS) -> List[Tuple[int, int]]:
+    """Intervalles [début, fin) des fenêtres d'ancrage, fusionnés s'ils se chevauchent."""
+    pattern = pattern or default_anchor_pattern()
+    spans: List[Tuple[int, int]] = []
+    for match in pattern.finditer(text):
+        start, end = match.start(), _value_end(text, match.end(), window_chars)
+        if spans and start <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], max(end, spans[-1][1]))
+        else:
+            spans.append((start, end))
+    return spans
+
+
+def anchor_windows(text: str, pattern: Optional[Pattern] = None,
+                   window_chars: int = DEFAULT_WINDOW_CHARS) -> Tuple[str, Optional[OffsetMap], int]:
+    """
+    Réduit un texte aux fenêtres d'ancrage, séparées par des sauts de ligne.
+
+    Returns:
+        Tuple (texte des fenêtres, correspondance vers le texte d'entrée, nombre de fenêtres).
+        Sans étiquette trouvée, le texte est retourné tel quel (correspondance None).
+    """
+    spans = anchor_spans(text, pattern, window_chars)
+    if not spans:
+        return text, None, 0
+
+    parts = []
+    offset_map = OffsetMap()
+    for i, (start, end) in enumerate(spans):
+        parts.append(text[start:end])
+        offset_map.add(start, end - start)
+        if i < len(spans) - 1:
+            # Le séparateur prend la place du caractère qui suit la fenêtre
+            parts.append("\n")
+            offset_map.add(end, 1)
+    return "".join(parts), offset_map, len(spans)
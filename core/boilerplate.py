@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Suppression des lignes répétitives (en-têtes, pieds de page, mentions légales)
+avant l'analyse NER.
+
+Une ligne est considérée comme du « boilerplate » si elle se répète dans le
+document (seule la première occurrence est gardée) ou si elle apparaît dans
+plusieurs des documents traités récemment. Les lignes d'étiquette contenant
+« : » (ex. « Service : Cardiologie ») sont toujours conservées, car elles
+portent les valeurs recherchées, de même que la ligne qui suit une étiquette
+sans valeur (« Service :\nCardiologie »).
+"""
+
+import re
+from collections import Counter, deque
+from typing import Iterable, Set, Tuple
+
+from core.offsets import OffsetMap
+
+# Nombre de documents récents mémorisés
+DEFAULT_WINDOW_DOCUMENTS = 50
+
+# Nombre de documents récents dans lesquels une ligne doit apparaître pour être retirée
+DEFAULT_MIN_DOCUMENTS = 3
+
+_LINE_RE = re.compile(r"[^\n]*\n?")
+_SPACES_RE = re.compile(r"\s+")
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def _fingerprint(line: str) -> str:
+    """Empreinte d'une ligne : casse et espaces normalisés."""
+    return _SPACES_RE.sub(" ", line).strip().casefold()
+
+
+class DocumentFilter:
+    """Filtre d'un document, alimenté page par page."""
+
+    def __init__(self, parent: "BoilerplateFilter"):
+        self.parent = parent
+        # Empreintes (chiffres normalisés : « Page 1/3 » = « Page 2/3 ») déjà vues dans le document
+        self.seen: Set[str] = set()
+        # Empreintes exactes transmises à la fenêtre des documents récents
+        self.fingerprints: Set[str] = set()
+        self.removed_lines = 0
+        # Ligne précédente terminée par « : » : la ligne suivante porte sa valeur
+        self.after_label = False
+
+    def filter(self, text: str, original_start: int = 0) -> Tuple[str, OffsetMap]:
+        """
+        Retire les lignes répétitives d'un texte.
+
+        Args:
+            text: Texte à filtrer (une page ou le document entier)
+            original_start: Position de ce texte dans le texte original du document
+
+        Returns:
+            Tuple (texte filtré, correspondance vers les positions du texte original)
+        """
+        kept = []
+        offset_map = OffsetMap()
+        for match in _LINE_RE.finditer(text):
+            line = match.group()
+            if not line:
+                break
+            if self._keep(line):
+                kept.append(line)
+                offset_map.add(original_start + match.start(), len(line))
+            else:
+                self.removed_lines += 1
+        return "".join(kept), offset_map
+
+    def _keep(self, line: str) -> bool:
+        fingerprint = _fingerprint(line)
+        if not fingerprint:
+            return True
+        after_label, self.after_label = self.after_label, fingerprint.endswith(":")
+        if after_label or ":" in fingerprint:
+            return True
+        self.fingerprints.add(fingerprint)
+        if self.parent.is_common(fingerprint):
+            return False
+        local = _DIGITS_RE.sub("0", fingerprint)
+        if local in self.seen:
+            return False
+        self.seen.add(local)
+        return True
+
+    def close(self):
+        """Enregistre les lignes du document dans la fenêtre des documents récents."""
+        self.parent.remember(self.fingerprints)
+        self.fingerprints = set()
+
+
+class BoilerplateFilter:
+    """Mémoire des lignes vues dans les documents récents et fabrique de filtres par document."""
+
+    def __init__(self, window_documents: int = DEFAULT_WINDOW_DOCUMENTS,
+                 min_documents: int = DEFAULT_MIN_DOCUMENTS):
+        """
+        Initialise le filtre.
+
+        Args:
+            window_documents: Nombre de documents récents mémorisés
+            min_documents: Nombre de documents récents où une ligne doit figurer pour être retirée
+        """
+        self.window = deque()
+        self.window_documents = window_documents
+        self.min_documents = min_documents
+        self.counts = Counter()
+
+    def is_common(self, fingerprint: str) -> bool:
+        """Indique si la ligne figure dans assez de documents récents pour être du boilerplate."""
+        return self.counts[fingerprint] >= self.min_documents
+
+    def remember(self, fingerprints: Iterable[str]):
+        """Ajoute les lignes d'un document à la fenêtre, en oubliant le plus ancien si besoin."""
+        fingerprints = set(fingerprints)
+        self.window.append(fingerprints)
+        self.counts.update(fingerprints)
+        if len(self.window) > self.window_documents:
+            oldest = self.window.popleft()
+            self.counts.subtract(oldest)
+            for fingerprint in oldest:
+                if self.counts[fingerprint] <= 0:
+                    del self.counts[fingerprint]
+
+    def document(self) -> DocumentFilter:
+        """Nouveau filtre pour un document (à fermer avec close() une fois le document traité)."""
+        return DocumentFilter(self)
+
+    def filter_text(self, text: str) -> Tuple[str, OffsetMap, int]:
+        """
+        Filtre un document complet.
+
+        Returns:
+            Tuple (texte filtré, correspondance des positions, nombre de lignes retirées)
+        """
+        document = self.document()
+        filtered, offset_map = document.filter(text)
+        document.close()
+        return filtered, offset_map, document.removed_lines
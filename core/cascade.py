@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Cascade d'extraction par étapes de coût croissant.
+
+Chaque étape (lecture des étiquettes, regex, modèle NER, vote de plusieurs
+modèles...) ne cherche que les champs encore insatisfaits : absents, de score
+sous le seuil de confiance ou de valeur invalide. Une valeur trouvée remplace
+celle, insatisfaisante, d'une étape précédente. Dès que les cinq champs sont
+satisfaits, les étapes suivantes ne sont pas lancées : le modèle NER ne coûte
+que pour les documents qui en ont besoin.
+
+Le temps et les champs trouvés par chaque étape sont mesurés pour les
+métadonnées de l'extraction.
+"""
+
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.fields import FIELDS, validate_field
+from core.ner_confidence import DEFAULT_CONFIDENCE_THRESHOLD, Entity, is_confident
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Étape : (document préparé, champs à chercher) -> entités trouvées, positions dans le texte original
+# (début et fin None pour une valeur sans position)
+Stage = Callable[[Dict, List[str]], Dict[str, Entity]]
+
+# Étapes connues, par coût croissant
+STAGE_NAMES = ("labels", "regex", "model", "multi_head")
+
+# Étapes à règles, sans score : une valeur lue derrière son étiquette ou par un pattern de champ est
+# retenue dès qu'elle est valide (validate_field) ; le seuil de confiance ne s'applique qu'aux modèles
+RULE_STAGES = ("labels", "regex")
+
+# Ordre par coût : le modèle n'est lancé que si les étiquettes et les regex ne suffisent pas
+COST_ORDERED_CASCADE = ("labels", "regex", "model")
+
+# Priorité historique du modèle : étiquettes, modèle, puis regex pour les champs absents ou peu sûrs
+MODEL_FIRST_CASCADE = ("labels", "model", "regex")
+
+DEFAULT_CASCADE = COST_ORDERED_CASCADE
+
+
+class CascadeRun:
+    """État de la cascade sur un document : entités retenues, étape d'origine de chaque champ, mesures."""
+
+    def __init__(self, entities: Optional[Dict[str, Entity]] = None,
+                 sources: Optional[Dict[str, str]] = None):
+        self.entities: Dict[str, Entity] = dict(entities or {})
+        self.sources: Dict[str, str] = dict(sources or {})
+        # Une entrée par étape rencontrée (lancée ou sautée)
+        self.stats: List[Dict] = []
+        # Indice de la prochaine étape
+        self.position = 0
+        # Étape après laquelle tous les champs étaient satisfaits
+        self.stopped_after: Optional[str] = None
+
+
+class ExtractionCascade:
+    """Étapes d'extraction lancées dans l'ordre, chacune pour les seuls champs encore insatisfaits."""
+
+    def __init__(self, stages: Sequence[Tuple[str, Stage]],
+                 confidence_threshold: Optional[float] = DEFAULT_CONFIDENCE_THRESHOLD):
+        """
+        Args:
+            stages: Étapes (nom, fonction) par coût croissant
+            confidence_threshold: Score en dessous duquel un champ trouvé par un modèle reste à chercher
+                (None : modèles sans score, toute valeur valide suffit)
+        """
+        self.stages = list(stages)
+        self.confidence_threshold = confidence_threshold
+
+    @property
+    def names(self) -> List[str]:
+        """Noms des étapes, dans l'ordre."""
+        return [name for name, _ in self.stages]
+
+    def satisfied(self, field: str, entity: Optional[Entity], source: Optional[str] = None) -> bool:
+        """
+        Entité de valeur valide, et sûre si elle vient d'un modèle (source : étape d'origine) :
+        les étapes suivantes ne cherchent plus ce champ.
+        """
+        if entity is None or not validate_field(field, entity[0]):
+            return False
+        return source in RULE_STAGES or is_confident(entity, self.confidence_threshold)
+
+    def pending(self, run: CascadeRun, fields: Iterable[str] = FIELDS) -> List[str]:
+        """Champs encore insatisfaits."""
+        return [field for field in fields
+                if not self.satisfied(field, run.entities.get(field), run.sources.get(field))]
+
+    def finished(self, run: CascadeRun) -> bool:
+        """Toutes les étapes ont été lancées ou sautées."""
+        return run.position >= len(self.stages)
+
+    def run(self, document: Dict, run: Optional[CascadeRun] = None,
+            until: Optional[str] = None) -> CascadeRun:
+        """
+        Lance les étapes restantes sur un document.
+
+        Args:
+            document: Document préparé, transmis à chaque étape
+            run: État à poursuivre (None pour une nouvelle cascade)
+            until: S'arrêter avant cette étape (reprise ultérieure avec le même état)
+
+        Returns:
+            L'état de la cascade
+        """
+        run = run if run is not None else CascadeRun()
+        while run.position < len(self.stages):
+            name, stage = self.stages[run.position]
+            if name == until:
+                break
+            run.position += 1
+            fields = self.pending(run)
+            if not fields:
+                run.stats.append({"stage": name, "skipped": True})
+                continue
+
+            start = time.perf_counter()
+            try:
+                found = stage(document, fields)
+            except Exception as e:
+                logger.warning(f"⚠️ Erreur étape {name}: {e}")
+                found = {}
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            hits = [field for field in fields if found.get(field) and found[field][0]]
+            for field in hits:
+                run.entities[field] = found[field]
+                run.sources[field] = name
+            run.stats.append({
+                "stage": name,
+                "fields": len(fields),
+                "found": len(hits),
+                "satisfied": sum(self.satisfied(field, run.entities.get(field), name) for field in hits),
+                "time_ms": elapsed_ms
+            })
+            if not self.pending(run):
+                run.stopped_after = name
+        return run
+
+    def restart(self, run: CascadeRun) -> CascadeRun:
+        """Reprend toutes les étapes (nouvelle page d'un document) en gardant les entités et les mesures."""
+        run.position = 0
+        run.stopped_after = None
+        return run
+
+    def summary(self, run: CascadeRun) -> Dict:
+        """
+        Mesures par étape, cumulées sur toutes les passes : passes lancées et sautées, champs
+        cherchés, trouvés et satisfaits, taux de réussite et temps total en millisecondes.
+        """
+        stages = {}
+        for name in self.names:
+            entries = [stats for stats in run.stats if stats["stage"] == name]
+            executed = [stats for stats in entries if not stats.get("skipped")]
+            fields = sum(stats["fields"] for stats in executed)
+            satisfied = sum(stats["satisfied"] for stats in executed)
+            stages[name] = {
+                "runs": len(executed),
+                "skipped": len(entries) - len(executed),
+                "fields": fields,
+                "found": sum(stats["found"] for stats in executed),
+                "satisfied": satisfied,
+                "hit_rate": round(satisfied / fields, 3) if fields else None,
+                "time_ms": round(sum(stats["time_ms"] for stats in executed), 3)
+            }
+        return {"order": self.names, "stages": stages, "stopped_after": run.stopped_after}
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Découpage des textes longs en morceaux de taille bornée pour l'analyse NER.
+
+Un Doc spaCy sur un rapport entier fait croître la mémoire avec la taille du
+document (et dépasse nlp.max_length sur les très longs textes) : les morceaux,
+coupés sur les paragraphes ou les lignes, gardent un pic mémoire constant.
+"""
+
+from typing import List, Tuple
+
+# Taille maximale d'un morceau, en caractères
+DEFAULT_CHUNK_CHARS = 20000
+
+# Morceaux analysés ensemble par nlp.pipe (borne la mémoire en vol)
+CHUNK_BATCH_SIZE = 4
+
+
+def split_chunks(text: str, max_chars: int = DEFAULT_CHUNK_CHARS) -> List[Tuple[int, int]]:
+    """
+    Intervalles [début, fin) contigus couvrant le texte, chacun d'au plus max_chars caractères.
+
+    Coupe de préférence après un paragraphe (ligne vide) dans la seconde moitié du morceau,
+    sinon après une fin de ligne, puis après un espace, et en dernier recours au milieu d'un mot.
+    """
+    if max_chars <= 0:
+        raise ValueError("La taille des morceaux doit être positive")
+
+    spans = []
+    start = 0
+    while len(text) - start > max_chars:
+        limit = start + max_chars
+        cut = text.rfind("\n\n", start + max_chars // 2, limit)
+        if cut != -1:
+            cut += 2
+        else:
+            for separator in ("\n", " "):
+                cut = text.rfind(separator, start + 1, limit)
+                if cut != -1:
+                    cut += 1
+                    break
+            else:
+                cut = limit
+        spans.append((start, cut))
+        start = cut
+    spans.append((start, len(text)))
+    return spans
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Routage des documents vers un seul modèle spécialisé (général, médical, juridique).
+
+Le domaine est deviné en quelques microsecondes à partir du début du document
+(la première page suffit : étiquettes, type d'analyse, service ou juridiction),
+avec un index de mots-clés construit depuis le vocabulaire des générateurs
+d'entraînement. Un seul modèle NER est ensuite lancé au lieu de tous les comparer.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from core.generator_vocab import GENERATORS, domain_vocabulary
+
+# Début du document examiné, en caractères (environ une première page)
+ROUTER_MAX_CHARS = 3000
+
+# Part minimale du score total pour retenir un domaine spécialisé
+DEFAULT_MIN_CONFIDENCE = 0.5
+
+# Domaine retenu sans indice suffisant
+FALLBACK_DOMAIN = "general"
+
+_WORD_RE = re.compile(r"[^\W\d_]{3,}")
+
+# Mots trop fréquents pour départager les domaines
+_STOPWORDS = frozenset({
+    "aux", "avec", "dans", "des", "du", "est", "les", "leur", "par", "pour",
+    "que", "qui", "ses", "son", "sur", "une", "entre", "sans"
+})
+
+
+def _keywords(terms: Iterable[str]) -> set:
+    return {word.casefold() for term in terms for word in _WORD_RE.findall(term)} - _STOPWORDS
+
+
+class DomainRouter:
+    """Classe un texte dans un domaine d'après un index de mots-clés pondérés."""
+
+    def __init__(self, domains: Optional[Iterable[str]] = None,
+                 min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+                 max_chars: int = ROUTER_MAX_CHARS):
+        """
+        Args:
+            domains: Domaines candidats (None = tous les générateurs)
+            min_confidence: En dessous, le document est routé vers le domaine général
+            max_chars: Nombre de caractères examinés en début de document
+        """
+        self.domains = list(domains) if domains is not None else list(GENERATORS)
+        self.min_confidence = min_confidence
+        self.max_chars = max_chars
+
+        vocabularies = {domain: _keywords(domain_vocabulary(domain)) for domain in self.domains}
+        document_frequency = Counter(word for words in vocabularies.values() for word in words)
+        # Mot -> {domaine: poids} ; un mot partagé par tous les domaines n'apporte rien
+        self.index: Dict[str, Dict[str, float]] = {}
+        for domain, words in vocabularies.items():
+            for word in words:
+                if document_frequency[word] < len(self.domains):
+                    self.index.setdefault(word, {})[domain] = 1.0 / document_frequency[word]
+
+    def route(self, text: str) -> Dict:
+        """
+        Domaine le plus probable pour le début d'un texte.
+
+        Returns:
+            Dictionnaire {"domain", "confidence" (part du score total, 0 sans indice), "scores"}
+        """
+        scores = Counter()
+        index = self.index
+        for word in _WORD_RE.findall(text[:self.max_chars].casefold()):
+            weights = index.get(word)
+            if weights:
+                for domain, weight in weights.items():
+                    scores[domain] += weight
+
+        total = sum(scores.values())
+        if not total:
+            return {"domain": FALLBACK_DOMAIN, "confidence": 0.0, "scores": {}}
+        domain, best = scores.most_common(1)[0]
+        confidence = best / total
+        if confidence < self.min_confidence:
+            domain = FALLBACK_DOMAIN
+        return {
+            "domain": domain,
+            "confidence": round(confidence, 3),
+            "scores": {name: round(score, 2) for name, score in scores.items()}
+        }
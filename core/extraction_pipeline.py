@@ -0,0 +1,594 @@
+#!/usr/bin/env python3
+"""
+Orchestration commune des extracteurs : lecture du PDF, préparation du texte,
+cascade d'étapes (étiquettes, regex, modèle NER), lecture page par page avec
+arrêt anticipé, traitement par lots et métadonnées.
+
+CascadeExtractor ne connaît pas les modèles : chaque extracteur fournit son
+pipeline (get_model), la surveillance de son vocabulaire (check_vocab) et ses
+métadonnées propres (_model_metadata). MultiModelExtractor
+(core.extraction_system) y ajoute le registre de modèles, le routage et le vote
+multi-têtes ; PDFExtractor (extraction_enhanced) un modèle unique et son API
+historique en français.
+"""
+
+import io
+import logging
+import time
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from spacy.language import Language
+
+from core.anchors import NER_SCOPES, anchor_windows
+from core.boilerplate import BoilerplateFilter
+from core.cascade import DEFAULT_CASCADE, STAGE_NAMES, CascadeRun, ExtractionCascade, Stage
+from core.chunking import CHUNK_BATCH_SIZE, DEFAULT_CHUNK_CHARS, split_chunks
+from core.fields import FIELDS, NER_LABEL_TO_FIELD
+from core.label_parser import default_label_parser
+from core.ner_confidence import (DEFAULT_BEAM_WIDTH, DEFAULT_CONFIDENCE_THRESHOLD, Entity, entity_score,
+                                 is_confident, keep_best, pipe_with_scores)
+from core.nlp_profiles import DEFAULT_BATCH_SIZE, DEFAULT_NLP_PROFILE, NLPProfile
+from core.offsets import OffsetMap, map_span
+from core.pdf_backends import PDFSource, is_pdf_path
+from core.pdf_reader import PDFReader, DEFAULT_MIN_PAGES_PARALLEL
+from core.regex_scanner import DEFAULT_REGEX_BUDGET_S, DEFAULT_REGEX_ENGINE, RegexScanner
+from core.text_cache import TextCache, DEFAULT_CACHE_MAX_MB
+from core.vocab_guard import DEFAULT_MAX_VOCAB_GROWTH
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class CascadeExtractor:
+    """Base des extracteurs : cascade d'étapes sur le texte des PDF, pour un ou plusieurs modèles."""
+
+    # Patterns regex de l'extracteur, et leur scanner compilé une fois pour le processus (moteur par défaut)
+    regex_patterns: Dict[str, Sequence[str]]
+    regex_scanner: RegexScanner
+
+    def __init__(self, workers: Optional[int] = None,
+                 min_pages_parallel: int = DEFAULT_MIN_PAGES_PARALLEL,
+                 streaming: bool = False,
+                 reading_profile: Union[None, str, Dict] = None,
+                 pdf_backend: str = "auto",
+                 cache_dir: Optional[str] = None,
+                 cache_max_mb: int = DEFAULT_CACHE_MAX_MB,
+                 max_memory_mb: Optional[float] = None,
+                 memory_policy: str = "degrade",
+                 drop_boilerplate: bool = False,
+                 nlp_profile: NLPProfile = DEFAULT_NLP_PROFILE,
+                 ner_scope: str = "full",
+                 chunk_chars: int = DEFAULT_CHUNK_CHARS,
+                 beam_width: int = DEFAULT_BEAM_WIDTH,
+                 confidence_threshold: float = DEFAULT_CONFIDENCE_THRESHOLD,
+                 max_vocab_growth: Optional[int] = DEFAULT_MAX_VOCAB_GROWTH,
+                 label_fast_path: bool = True,
+                 cascade: Sequence[str] = DEFAULT_CASCADE,
+                 regex_engine: str = DEFAULT_REGEX_ENGINE,
+                 regex_budget_s: Optional[float] = DEFAULT_REGEX_BUDGET_S):
+        """
+        Initialise l'orchestration commune.
+
+        Args:
+            workers: Nombre de processus pour la lecture parallèle des pages (None = séquentiel, -1 = tous les cœurs)
+            min_pages_parallel: Nombre minimal de pages pour lire en parallèle
+            streaming: Lire page par page et s'arrêter dès que tous les champs sont trouvés
+            reading_profile: Profil de lecture (nom, dictionnaire, "auto" pour le profil du modèle,
+                None pour lire tout le document)
+            pdf_backend: Moteur d'extraction du texte ("pdfplumber", "pdfminer", "pdfium"
+                ou "auto" pour le moteur retenu par la calibration)
+            cache_dir: Dossier du cache de texte extrait (None = pas de cache)
+            cache_max_mb: Taille maximale du cache en Mo
+            max_memory_mb: Croissance mémoire maximale par document en Mo (None = pas de plafond)
+            memory_policy: Au-delà du plafond, "degrade" garde les pages déjà lues, "abort" lève une erreur
+            drop_boilerplate: Retirer les lignes répétitives (en-têtes, pieds de page) avant l'analyse NER
+            nlp_profile: Profil d'inférence des modèles ("ner" = NER et ses dépendances seulement,
+                "complet" = pipeline entier, ou liste des composants à garder)
+            ner_scope: Texte analysé par le modèle : "full" (tout le texte) ou "anchors"
+                (fenêtres courtes après les étiquettes de champs, repli sur tout le texte sans étiquette)
+            chunk_chars: Taille maximale des morceaux de texte analysés par le modèle, en caractères
+            beam_width: Largeur du faisceau du NER, qui donne un score à chaque entité (1 = NER glouton,
+                sans score : option à activer, plus coûteuse)
+            confidence_threshold: Score en dessous duquel un champ trouvé par le modèle reste à chercher
+                par les étapes suivantes de la cascade (avec faisceau seulement)
+            max_vocab_growth: Chaînes ajoutées au vocabulaire d'un modèle au-delà desquelles il est
+                rechargé depuis le disque (None = croissance libre)
+            label_fast_path: Lire les lignes « Étiquette : valeur » (étape "labels" de la cascade)
+            cascade: Étapes d'extraction, dans l'ordre où elles sont lancées (voir _stages) ; chacune
+                ne cherche que les champs encore absents, peu sûrs ou invalides, et les suivantes sont
+                sautées dès que les cinq champs sont satisfaits. Par défaut, ordre par coût
+                (MODEL_FIRST_CASCADE : priorité historique du modèle sur les regex)
+            regex_engine: Moteur des regex ("re", "re2" en temps linéaire si google-re2 est installé,
+                "auto" pour re2 s'il est disponible)
+            regex_budget_s: Temps maximal des regex par document en secondes, au-delà duquel l'analyse
+                est abandonnée (None = sans limite)
+        """
+        if ner_scope not in NER_SCOPES:
+            raise ValueError(f"Portée NER inconnue: {ner_scope}")
+        stages = self._stages()
+        for name in cascade:
+            if name not in stages:
+                raise ValueError(f"Étape de cascade inconnue: {name}")
+        self.nlp_profile = nlp_profile
+        self.max_vocab_growth = max_vocab_growth
+        self.ner_scope = ner_scope
+        self.chunk_chars = chunk_chars
+        self.beam_width = beam_width
+        # Seuil sans objet en glouton : aucun score n'est calculé
+        self.confidence_threshold = confidence_threshold if beam_width > 1 else None
+        self.streaming = streaming
+        self.boilerplate = BoilerplateFilter() if drop_boilerplate else None
+        self.label_parser = default_label_parser() if label_fast_path else None
+        if regex_engine != DEFAULT_REGEX_ENGINE:
+            self.regex_scanner = RegexScanner(self.regex_patterns, engine=regex_engine)
+        self.regex_budget_s = regex_budget_s
+        self.cascade = ExtractionCascade(
+            [(name, stages[name]) for name in cascade if name != "labels" or self.label_parser is not None],
+            self.confidence_threshold)
+        self.reading_profile = reading_profile
+        self.pdf_reader = PDFReader(workers=workers, min_pages_parallel=min_pages_parallel,
+                                    backend=pdf_backend,
+                                    cache=TextCache(cache_dir, cache_max_mb) if cache_dir else None,
+                                    max_memory_mb=max_memory_mb, memory_policy=memory_policy)
+
+    # --- Points d'extension des extracteurs ---
+
+    def _stages(self) -> Dict[str, Stage]:
+        """Étapes de cascade proposées par l'extracteur, par nom (STAGE_NAMES)."""
+        return {"labels": self._labels_stage, "regex": self._regex_stage, "model": self._model_stage}
+
+    def get_model(self, model_id: Optional[str] = None) -> Tuple[Optional[str], Optional[Language]]:
+        """
+        Pipeline d'un modèle (par défaut le modèle de l'extracteur).
+
+        Returns:
+            Tuple (modèle utilisé, pipeline), (None, None) sans modèle utilisable
+        """
+        raise NotImplementedError
+
+    def check_vocab(self):
+        """Recharge en arrière-plan les modèles dont le vocabulaire a trop grossi (appelé après chaque document)."""
+
+    def _model_metadata(self, model_id: Optional[str]) -> Dict:
+        """Métadonnées du modèle d'un document (aucune par défaut)."""
+        return {}
+
+    def _route(self, text: str) -> Tuple[Optional[str], Optional[Dict]]:
+        """Modèle choisi d'après le texte d'un document et décision de routage ((None, None) : pas de routage)."""
+        return None, None
+
+    def _clean_regex_results(self, results: Dict[str, str]) -> Dict[str, str]:
+        """Post-traitement des valeurs trouvées par les regex (aucun par défaut)."""
+        return results
+
+    def get_reading_profile(self) -> Union[None, str, Dict]:
+        """Retourne le profil de lecture à appliquer."""
+        return self.reading_profile
+
+    def _profile_name(self) -> str:
+        """Nom du profil de lecture actif, pour les métadonnées."""
+        profile = self.get_reading_profile()
+        if profile is None:
+            return "complet"
+        return profile if isinstance(profile, str) else "personnalisé"
+
+    # --- Modèle NER ---
+
+    def extract_with_model(self, text: str) -> Dict[str, Optional[str]]:
+        """Extrait avec le modèle NER actuel."""
+        return {field: value for field, (value, *_) in self.extract_entities_with_model(text).items()}
+
+    def extract_entities_with_model(self, text: str, model_id: Optional[str] = None,
+                                    fields: Optional[Iterable[str]] = None) -> Dict[str, Entity]:
+        """
+        Extrait avec un modèle NER (par défaut le modèle actuel) : valeur, position (début, fin) dans text et score.
+
+        L'analyse des morceaux d'un texte long s'arrête dès que les champs cherchés (fields, None pour tous)
+        sont trouvés et sûrs.
+        """
+        wanted = FIELDS if fields is None else list(fields)
+        try:
+            model_id, nlp = self.get_model(model_id)
+            if nlp is None:
+                return {}
+
+            # Texte long : morceaux bornés analysés par lots, positions recalées sur le texte
+            chunks = split_chunks(text, self.chunk_chars)
+            docs = pipe_with_scores(nlp, ((text[start:end], start) for start, end in chunks),
+                                    self.beam_width, batch_size=CHUNK_BATCH_SIZE)
+            results = {}
+            for doc, scores, start in docs:
+                keep_best(results, self._entities_from_doc(doc, start, scores))
+                if all(is_confident(results.get(field), self.confidence_threshold) for field in wanted):
+                    # Champs cherchés trouvés et sûrs : les morceaux suivants ne changeraient rien
+                    break
+
+            logger.info(f"✅ Extraction modèle {model_id}: {len(results)} champs")
+            return results
+
+        except Exception as e:
+            logger.warning(f"⚠️ Erreur extraction modèle: {e}")
+            return {}
+
+    def _entities_from_doc(self, doc, offset: int = 0, scores=None) -> Dict[str, Entity]:
+        """
+        Entité de chaque champ dans un Doc analysé, avec sa position (décalée de offset) et son score.
+
+        Avec les scores du faisceau, l'entité la plus sûre de chaque champ est retenue, sinon la première.
+        """
+        results = {}
+        for ent in doc.ents:
+            if ent.label_ in NER_LABEL_TO_FIELD:
+                entity = (ent.text.strip(), ent.start_char + offset, ent.end_char + offset, entity_score(scores, ent))
+                keep_best(results, {NER_LABEL_TO_FIELD[ent.label_]: entity})
+        return results
+
+    def _to_original(self, entities: Dict[str, Entity], offset_maps: Sequence[Optional[OffsetMap]]) -> Dict[str, Entity]:
+        """Entités du texte analysé (ner_text) avec leurs positions ramenées au texte original."""
+        return {field: (value, *map_span((start, end), offset_maps), score)
+                for field, (value, start, end, score) in entities.items()}
+
+    # --- Étapes de la cascade ---
+
+    def _labels_stage(self, document: Dict, fields: List[str]) -> Dict[str, Entity]:
+        """
+        Étape "labels" : lignes « Étiquette : valeur » du texte original (sans retrait du boilerplate
+        ni restriction aux ancres, qui pourraient séparer une étiquette de sa valeur).
+        """
+        return self._to_original(self.label_parser.parse(document["label_text"], fields), document["label_maps"])
+
+    def _regex_stage(self, document: Dict, fields: List[str]) -> Dict[str, Entity]:
+        """Étape "regex" : patterns sur le texte original (valeurs sans position ni score), dans le budget du document."""
+        return {field: (value, None, None, None)
+                for field, value in self.extract_with_regex(document["text"], fields, document["regex_budget"]).items()}
+
+    def _model_stage(self, document: Dict, fields: List[str]) -> Dict[str, Entity]:
+        """Étape "model" : NER du modèle du document (entités déjà calculées par lot s'il y en a)."""
+        entities = document.pop("piped_entities", None)
+        if entities is None:
+            # Modèle effectivement utilisé (repli si celui du document ne se charge pas), pour les métadonnées
+            document["model_id"], _ = self.get_model(document["model_id"])
+            entities = self.extract_entities_with_model(document["ner_text"], document["model_id"], fields)
+        return self._to_original(entities, document["offset_maps"])
+
+    def _regex_budget(self) -> Dict:
+        """Budget de temps des regex d'un document, partagé par ses passes successives (pages du streaming)."""
+        return {"remaining_s": self.regex_budget_s, "timed_out": False}
+
+    def extract_with_regex(self, text: str, fields: Optional[Iterable[str]] = None,
+                           budget: Optional[Dict] = None) -> Dict[str, Optional[str]]:
+        """
+        Extraction de fallback avec regex (fields : champs à chercher, None pour tous), en une passe sur le texte.
+
+        budget : budget du document (voir _regex_budget), décompté du temps passé ; une fois dépassé,
+        les passes suivantes ne cherchent plus rien. None pour le budget regex_budget_s de l'extracteur.
+        """
+        budget = budget if budget is not None else self._regex_budget()
+        if budget["timed_out"]:
+            return {}
+        start = time.perf_counter()
+        results, budget["timed_out"] = self.regex_scanner.scan_with_budget(text, fields, budget["remaining_s"])
+        if budget["remaining_s"] is not None:
+            budget["remaining_s"] -= time.perf_counter() - start
+        results = self._clean_regex_results(results)
+
+        logger.info(f"✅ Extraction regex: {len(results)} champs")
+        return results
+
+    # --- Lecture et préparation du texte ---
+
+    def read_pdf(self, file_path: PDFSource) -> str:
+        """Lit le contenu d'un PDF."""
+        text, _ = self._read_pdf_with_info(file_path)
+        return text
+
+    def _read_pdf_with_info(self, file_path: PDFSource):
+        """Lit le contenu d'un PDF et retourne aussi les informations de lecture."""
+        try:
+            text, info = self.pdf_reader.read(file_path, self.get_reading_profile())
+            logger.info(f"✅ PDF lu: {len(text)} caractères ({info['pages']} pages)")
+            return text, info
+        except Exception as e:
+            logger.error(f"❌ Erreur lecture PDF: {e}")
+            raise
+
+    def _remove_boilerplate(self, text: str) -> Tuple[str, Optional[OffsetMap], int]:
+        """Texte soumis au modèle : sans les lignes répétitives si le filtre est activé."""
+        if self.boilerplate is None:
+            return text, None, 0
+        ner_text, offset_map, removed_lines = self.boilerplate.filter_text(text)
+        logger.info(f"🧹 Boilerplate: {removed_lines} ligne(s) retirée(s), {len(text) - len(ner_text)} caractères en moins")
+        return ner_text, offset_map, removed_lines
+
+    def _restrict_to_anchors(self, text: str) -> Tuple[str, Optional[OffsetMap], int]:
+        """Texte soumis au modèle : fenêtres d'ancrage si la portée "anchors" est choisie."""
+        if self.ner_scope != "anchors":
+            return text, None, 0
+        ner_text, offset_map, windows = anchor_windows(text)
+        if windows:
+            logger.info(f"⚓ Fenêtres d'ancrage: {windows} fenêtre(s), {len(text)} -> {len(ner_text)} caractères")
+        else:
+            logger.info("⚓ Aucune étiquette trouvée, analyse du texte complet")
+        return ner_text, offset_map, windows
+
+    def _prepare_text(self, text: str, read_info: Optional[Dict] = None, route: bool = True) -> Dict:
+        """Prépare un texte pour l'analyse : détection du texte exploitable, retrait du boilerplate et routage."""
+        # PDF scanné ou vide : inutile de lancer le modèle et les regex
+        has_text = (read_info is None or read_info.get("text_layer", True)) and bool(text.strip())
+        if has_text:
+            ner_text, offset_map, removed_lines = self._remove_boilerplate(text)
+            ner_text, window_map, windows = self._restrict_to_anchors(ner_text)
+        else:
+            logger.warning("⚠️ Aucun texte exploitable dans le PDF (document scanné ?)")
+            ner_text, offset_map, removed_lines = "", None, 0
+            window_map, windows = None, 0
+        model_id, routing = self._route(text) if route and has_text else (None, None)
+        return {
+            "text": text,
+            "read_info": read_info,
+            "has_text": has_text,
+            "ner_text": ner_text,
+            # Transformations successives du texte original vers ner_text
+            "offset_maps": [offset_map, window_map],
+            # Texte lu par l'étape "labels" (texte original)
+            "label_text": text,
+            "label_maps": [None],
+            "removed_lines": removed_lines,
+            "anchor_windows": windows,
+            "regex_budget": self._regex_budget(),
+            # Modèle choisi par le routeur (None = modèle actuel)
+            "model_id": model_id,
+            "routing": routing
+        }
+
+    def _prepare_pdf(self, file_path: PDFSource, route: bool = True) -> Dict:
+        """Lit un PDF et prépare son texte pour l'analyse."""
+        text, read_info = self._read_pdf_with_info(file_path)
+        return self._prepare_text(text, read_info, route)
+
+    # --- Résultats et métadonnées ---
+
+    def merge_results(self, model_results: Dict, regex_results: Dict) -> Dict[str, Optional[str]]:
+        """Fusionne les résultats du modèle et du regex en privilégiant le modèle."""
+        final_results = {}
+        for field in FIELDS:
+            if field in model_results and model_results[field]:
+                final_results[field] = model_results[field]
+            elif field in regex_results and regex_results[field]:
+                final_results[field] = regex_results[field]
+            else:
+                final_results[field] = None
+        return final_results
+
+    def _cascade_results(self, run: CascadeRun) -> Dict[str, Optional[str]]:
+        """Valeur retenue par la cascade pour chaque champ (None si absent)."""
+        return {field: run.entities[field][0] if field in run.entities else None for field in FIELDS}
+
+    def _cascade_metadata(self, run: CascadeRun, cascade: ExtractionCascade) -> Dict:
+        """Métadonnées communes : origine des champs, positions, scores et mesures de chaque étape."""
+        sources = {field: run.sources[field] for field in FIELDS if field in run.sources}
+        # Champs retenus par étape, d'après leur origine
+        fields_by_stage = {name: sum(source == name for source in sources.values()) for name in STAGE_NAMES}
+        # Étape la plus coûteuse ayant fourni un champ, hors regex
+        methods = [name for name in STAGE_NAMES if name != "regex" and name in sources.values()]
+        summary = cascade.summary(run)
+        return {
+            "extraction_method": methods[-1] if methods else "regex",
+            "model_fields": fields_by_stage["model"],
+            "regex_fields": fields_by_stage["regex"],
+            "fields_by_stage": fields_by_stage,
+            "entity_spans": {field: [start, end] for field, (_, start, end, _) in run.entities.items()
+                             if start is not None},
+            "confidences": {field: entity[3] for field, entity in run.entities.items() if entity[3] is not None},
+            "regex_fields_searched": summary["stages"].get("regex", {}).get("fields", 0),
+            "field_sources": sources,
+            "cascade": summary
+        }
+
+    def _finish_document(self, document: Dict, run: Optional[CascadeRun] = None,
+                         model_id: Optional[str] = None,
+                         cascade: Optional[ExtractionCascade] = None) -> Dict[str, Optional[str]]:
+        """
+        Lance les étapes restantes de la cascade (par défaut celle de l'extracteur) sur un document
+        préparé et ajoute les métadonnées. model_id : modèle du document, par défaut celui du routeur
+        ou le modèle actuel.
+        """
+        if "error" in document:
+            final_results = self.merge_results({}, {})
+            final_results["_metadata"] = {
+                "status": "error",
+                "error": document["error"],
+                **self._model_metadata(model_id)
+            }
+            self.check_vocab()
+            return final_results
+
+        cascade = cascade or self.cascade
+        run = cascade.run(document, run) if document["has_text"] else CascadeRun()
+        final_results = self._cascade_results(run)
+
+        # Métadonnées ; l'étape "model" a pu se replier sur un autre modèle
+        metadata = {
+            "status": "ok" if document["has_text"] else "no_text_layer",
+            **self._model_metadata(model_id or document.get("model_id")),
+            **self._cascade_metadata(run, cascade),
+            "text_length": len(document["text"]),
+            "ner_text_length": len(document["ner_text"]),
+            "ner_scope": "anchors" if document["anchor_windows"] else "full",
+            "boilerplate_lines_removed": document["removed_lines"],
+            "regex_engine": self.regex_scanner.engine,
+            "regex_timeout": document["regex_budget"]["timed_out"]
+        }
+        if document["routing"] is not None:
+            metadata["routing"] = document["routing"]
+        if "votes" in document:
+            metadata["votes"] = document["votes"]
+        read_info = document["read_info"]
+        if read_info is not None:
+            metadata.update({
+                "pdf_pages": read_info["pages"],
+                "pdf_pages_read": read_info["pages_read"],
+                "pdf_workers": read_info["workers"],
+                "pdf_backend": read_info["backend"],
+                "pdf_cache": read_info["cache"],
+                "peak_memory_mb": read_info["peak_memory_mb"],
+                "memory_truncated": read_info["truncated"],
+                "reading_profile": self._profile_name()
+            })
+        final_results["_metadata"] = metadata
+        self.check_vocab()
+
+        logger.info(f"✅ Extraction terminée: {sum(1 for v in final_results.values() if v and not isinstance(v, dict))} champs")
+        return final_results
+
+    # --- Points d'entrée ---
+
+    def extract_from_pdf(self, file_path: PDFSource) -> Dict[str, Optional[str]]:
+        """Extraction complète depuis un PDF (chemin, octets ou flux binaire)."""
+        if self.streaming:
+            return self.extract_from_pdf_streaming(file_path)
+
+        return self._finish_document(self._prepare_pdf(file_path))
+
+    def extract_document(self, item: Union[str, PDFSource]) -> Dict[str, Optional[str]]:
+        """
+        Extraction d'un texte ou d'un PDF (chemin .pdf ou fichier existant, octets, flux binaire).
+
+        Une erreur donne des champs vides avec le statut "error" au lieu d'être levée.
+        """
+        try:
+            if isinstance(item, str) and not is_pdf_path(item):
+                return self._finish_document(self._prepare_text(item))
+            return self.extract_from_pdf(item)
+        except Exception as e:
+            logger.error(f"❌ Document ignoré: {e}")
+            return self._finish_document({"error": str(e)})
+
+    def extract_from_bytes(self, data: bytes) -> Dict[str, Optional[str]]:
+        """Extraction complète depuis le contenu d'un PDF en mémoire, sans fichier temporaire."""
+        return self.extract_from_pdf(data)
+
+    def extract_from_stream(self, stream: BinaryIO) -> Dict[str, Optional[str]]:
+        """Extraction complète depuis un flux binaire (BytesIO, fichier ouvert, upload...)."""
+        if not stream.seekable():
+            stream = io.BytesIO(stream.read())
+        return self.extract_from_pdf(stream)
+
+    def extract_many(self, items: Iterable[Union[str, PDFSource]],
+                     batch_size: int = DEFAULT_BATCH_SIZE,
+                     n_process: int = 1) -> Iterator[Dict[str, Optional[str]]]:
+        """
+        Extraction par lots : les textes passent dans nlp.pipe au lieu d'un appel nlp() par document.
+
+        Args:
+            items: Textes ou PDF (chemins .pdf ou fichiers existants, octets, flux binaires)
+            batch_size: Nombre de documents par lot pour le modèle
+            n_process: Nombre de processus pour le modèle (1 = processus courant)
+
+        Yields:
+            Les résultats de chaque document, dans l'ordre des entrées. Un document illisible
+            donne des champs vides avec le statut "error" au lieu d'interrompre le lot.
+            Le mode streaming ne s'applique pas : chaque document est lu en entier.
+            Les documents longs sont découpés en morceaux de chunk_chars caractères au plus.
+            Tout le lot passe par le modèle actuel : le routage par document ne s'applique pas.
+            Un modèle rechargé pour borner son vocabulaire ne sert qu'aux lots suivants.
+            Les étapes de la cascade placées avant le modèle sont lancées à la lecture de chaque document :
+            un document qu'elles suffisent à remplir ne passe pas par le modèle.
+        """
+        pending = {}
+
+        def prepared():
+            for index, item in enumerate(items):
+                try:
+                    if isinstance(item, str) and not is_pdf_path(item):
+                        document = self._prepare_text(item, route=False)
+                    else:
+                        document = self._prepare_pdf(item, route=False)
+                except Exception as e:
+                    logger.error(f"❌ Document {index} ignoré: {e}")
+                    document = {"error": str(e), "ner_text": ""}
+                pending[index] = document
+                if document.get("has_text"):
+                    # Le modèle du lot reprend ensuite la cascade là où elle s'est arrêtée
+                    run = document["cascade_run"] = self.cascade.run(document, until="model")
+                    if self.cascade.finished(run) or not self.cascade.pending(run):
+                        # Morceau vide : garde l'ordre des résultats sans analyse du texte
+                        yield "", (index, 0, True)
+                        continue
+                chunks = split_chunks(document["ner_text"], self.chunk_chars)
+                for i, (start, end) in enumerate(chunks):
+                    yield document["ner_text"][start:end], (index, start, i == len(chunks) - 1)
+
+        _, nlp = self.get_model()
+        if nlp is None:
+            for _, (index, _, last) in prepared():
+                if last:
+                    document = pending.pop(index)
+                    yield self._finish_document(document, document.get("cascade_run"))
+            return
+
+        entities = {}
+        for doc, scores, (index, start, last) in pipe_with_scores(nlp, prepared(), self.beam_width,
+                                                                  batch_size=batch_size, n_process=n_process):
+            keep_best(entities, self._entities_from_doc(doc, start, scores))
+            if last:
+                document = pending.pop(index)
+                document["piped_entities"] = entities
+                yield self._finish_document(document, document.get("cascade_run"))
+                entities = {}
+
+    def extract_from_pdf_streaming(self, file_path: PDFSource) -> Dict[str, Optional[str]]:
+        """
+        Extraction page par page avec arrêt anticipé, de mêmes résultats que l'extraction complète.
+
+        L'étape "labels", si elle ouvre la cascade, est lancée sur chaque nouvelle page pour les
+        champs encore absents : elle retient la première valeur valide du document, donc la même
+        que sur le texte complet. La lecture s'arrête dès qu'elle a rempli les cinq champs. Sinon,
+        les étapes suivantes (regex, modèle) sont lancées une fois sur le texte lu, comme par
+        extract_from_pdf : une valeur trouvée par les regex sur une page ne masque pas une
+        étiquette d'une page suivante.
+        """
+        pages_text = []
+        complete = False
+        read_stats = {}
+        # Entités retenues, positions dans le texte complet
+        run = CascadeRun()
+        next_page_start = 0
+        # Étiquettes lancées page par page si elles ouvrent la cascade, jusqu'à l'étape suivante
+        labels_first = self.cascade.names[:1] == ["labels"]
+        document_stage = next((name for name in self.cascade.names if name != "labels"), None)
+
+        try:
+            for page_text in self.pdf_reader.iter_pages(file_path, self.get_reading_profile(), read_stats):
+                # Position de la page dans le texte complet (pages jointes par des sauts de ligne)
+                page_start = next_page_start
+                next_page_start += len(page_text) + 1
+                pages_text.append(page_text)
+                if not page_text.strip() or not labels_first:
+                    continue
+
+                page = {"label_text": page_text, "label_maps": [OffsetMap.shifted(page_start, len(page_text))]}
+                self.cascade.run(page, self.cascade.restart(run), until=document_stage)
+                if not self.cascade.pending(run):
+                    complete = True
+                    break
+        except Exception as e:
+            logger.error(f"❌ Erreur lecture PDF: {e}")
+            raise
+
+        read_info = {
+            "pages": read_stats.get("pages"),
+            "pages_read": len(pages_text),
+            "workers": read_stats.get("workers", 1),
+            "backend": read_stats.get("backend"),
+            "cache": read_stats.get("cache", "off"),
+            "text_layer": read_stats.get("text_layer", True),
+            "peak_memory_mb": round(read_stats.get("peak_memory_mb", 0.0), 1),
+            "truncated": read_stats.get("truncated", False)
+        }
+        # Étapes restantes (sautées si les étiquettes ont tout rempli) sur le texte lu
+        final_results = self._finish_document(self._prepare_text("\n".join(pages_text), read_info), run)
+        final_results["_metadata"]["early_stop"] = complete
+
+        logger.info(f"✅ Extraction streaming terminée: {len(pages_text)} page(s) lue(s), arrêt anticipé: {complete}")
+        return final_results
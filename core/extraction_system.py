@@ -3,29 +3,88 @@
 Système d'extraction avancé avec support multi-modèles.
 """
 
-import pdfplumber
-import spacy
-import re
 import os
-import json
+import time
 import logging
-from typing import Dict, Optional, List
-from pathlib import Path
+from collections import Counter
+from typing import Dict, Optional, List, Sequence, Tuple, Union
+
+from spacy.language import Language
+from spacy.tokens import Doc
+
+from core.cascade import CascadeRun, ExtractionCascade, Stage
+from core.domain_router import DomainRouter
+from core.chunking import split_chunks
+from core.extraction_pipeline import CascadeExtractor
+from core.fields import FIELDS, REGEX_PATTERNS
+from core.model_registry import DEFAULT_MAX_MODELS_MB, ModelLoadError, ModelRegistry, model_available
+from core.ner_confidence import Entity
+from core.nlp_profiles import load_pipeline
+from core.pdf_backends import PDFSource
+from core.pdf_reader import READING_PROFILES
+from core.regex_scanner import RegexScanner
+from core.vocab_guard import VocabGuard, vocab_size
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class MultiModelExtractor:
+# Patterns regex compilés une fois pour le processus, appliqués en une passe
+REGEX_SCANNER = RegexScanner(REGEX_PATTERNS)
+
+def vote_entities(per_model: Dict[str, Dict[str, Entity]]) -> Tuple[Dict[str, Entity], Dict[str, str]]:
+    """
+    Vote majoritaire par champ entre les résultats de plusieurs modèles.
+    
+    Les valeurs sont comparées sans tenir compte de la casse ni des espaces ; à égalité,
+    la valeur du modèle listé en premier l'emporte.
+    
+    Returns:
+        Tuple (entité retenue par champ, score "voix/modèles" par champ)
+    """
+    winners, votes = {}, {}
+    for field in FIELDS:
+        candidates = [entities[field] for entities in per_model.values() if field in entities]
+        if not candidates:
+            continue
+        counts = Counter(" ".join(value.split()).casefold() for value, *_ in candidates)
+        best, count = counts.most_common(1)[0]
+        winners[field] = next(entity for entity in candidates if " ".join(entity[0].split()).casefold() == best)
+        votes[field] = f"{count}/{len(per_model)}"
+    return winners, votes
+
+class MultiModelExtractor(CascadeExtractor):
     """Extracteur PDF avec support de multiples modèles spécialisés."""
     
-    def __init__(self):
-        self.models = {}
+    regex_patterns = REGEX_PATTERNS
+    regex_scanner = REGEX_SCANNER
+    
+    def __init__(self, auto_route: bool = False,
+                 max_models_mb: Optional[float] = DEFAULT_MAX_MODELS_MB,
+                 **options):
+        """
+        Initialise l'extracteur.
+
+        Args:
+            auto_route: Choisir le modèle de chaque document (général, médical, juridique) d'après
+                le début de son texte, au lieu du modèle actuel
+            max_models_mb: Taille totale des modèles chargés en Mo au-delà de laquelle les moins
+                récemment utilisés sont déchargés (None = pas de limite). Les modèles sont chargés
+                à leur première utilisation
+            **options: Options communes de CascadeExtractor (lecture des PDF, boilerplate, portée NER,
+                faisceau, cascade, regex...) ; la cascade accepte aussi l'étape "multi_head"
+                (vote majoritaire des modèles entraînés). reading_profile="auto" suit le modèle actuel
+        """
+        super().__init__(**options)
+        self.router = DomainRouter() if auto_route else None
+        self.models = ModelRegistry(lambda path: load_pipeline(path, self.nlp_profile), max_models_mb,
+                                    on_load=self._watch_vocab, on_evict=self._forget_vocab)
         self.current_model = None
         self.model_info = {}
+        self.vocab_guards = {}
         self.load_available_models()
     
     def load_available_models(self):
-        """Charge tous les modèles disponibles."""
+        """Recense les modèles présents sur le disque, chargés à leur première utilisation."""
         model_configs = {
             "spacy_default": {
                 "path": "fr_core_news_md",
@@ -52,23 +111,24 @@ class MultiModelExtractor:
                 "type": "trained"
             }
         }
+        # Élèves compacts distillés depuis les modèles entraînés (training/distill.py)
+        for domain, label in (("general", "général"), ("medical", "médical"), ("legal", "juridique")):
+            model_configs[f"{domain}_compact"] = {
+                "path": f"models/{domain}_compact_model",
+                "name": f"Modèle {label} compact",
+                "description": f"Modèle {label} distillé, plus rapide (NER seul, sans vecteurs)",
+                "type": "distilled"
+            }
         
         for model_id, config in model_configs.items():
-            try:
-                if config["type"] == "default":
-                    nlp = spacy.load(config["path"])
-                    self.models[model_id] = nlp
-                    self.model_info[model_id] = config
-                    logger.info(f"✅ Modèle par défaut chargé: {model_id}")
-                elif os.path.exists(config["path"]):
-                    nlp = spacy.load(config["path"])
-                    self.models[model_id] = nlp
-                    self.model_info[model_id] = config
-                    logger.info(f"✅ Modèle entraîné chargé: {model_id}")
-                else:
-                    logger.info(f"⚠️ Modèle non trouvé: {config['path']}")
-            except Exception as e:
-                logger.warning(f"❌ Erreur chargement {model_id}: {e}")
+            # Modèle par défaut : package installé ; modèles entraînés : dossier
+            available = model_available(config["path"]) if config["type"] == "default" else os.path.exists(config["path"])
+            if available:
+                self.models.register(model_id, config["path"])
+                self.model_info[model_id] = config
+                logger.info(f"📦 Modèle disponible: {model_id}")
+            else:
+                logger.info(f"⚠️ Modèle non trouvé: {config['path']}")
         
         # Définir le modèle par défaut
         if "general" in self.models:
@@ -79,137 +139,240 @@ class MultiModelExtractor:
             self.current_model = list(self.models.keys())[0] if self.models else None
     
     def get_available_models(self) -> Dict[str, Dict]:
-        """Retourne la liste des modèles disponibles avec leurs infos."""
+        """
+        Retourne la liste des modèles disponibles avec leurs infos (d'après le disque, sans les charger).
+        Un modèle dont le chargement a échoué n'est plus disponible et garde son erreur ("error").
+        """
+        loaded = self.models.loaded()
         return {
             model_id: {
                 "name": info["name"],
                 "description": info["description"],
                 "type": info["type"],
-                "available": model_id in self.models
+                "available": model_id in self.models and model_id not in self.models.errors,
+                "loaded": model_id in loaded,
+                "error": self.models.errors.get(model_id)
             }
             for model_id, info in self.model_info.items()
         }
     
+    def preload_models(self, model_ids: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Charge des modèles à l'avance (par défaut le modèle actuel, et ceux des domaines du routeur),
+        par exemple avant de forker des workers qui les partageront.
+        
+        Returns:
+            Les modèles chargés
+        """
+        if model_ids is None:
+            model_ids = [self.current_model] + (list(self.router.domains) if self.router is not None else [])
+        loaded = []
+        for model_id in dict.fromkeys(model_ids):
+            if model_id in self.models and self.models.get(model_id) is not None:
+                loaded.append(model_id)
+        return loaded
+    
     def set_model(self, model_id: str) -> bool:
         """Change le modèle actuel."""
-        if model_id in self.models:
+        if model_id in self.models and model_id not in self.models.errors:
             self.current_model = model_id
             logger.info(f"🔄 Modèle changé vers: {self.model_info[model_id]['name']}")
             return True
+        elif model_id in self.models:
+            logger.error(f"❌ Modèle non disponible: {model_id} ({self.models.errors[model_id]})")
+            return False
         else:
             logger.error(f"❌ Modèle non disponible: {model_id}")
             return False
     
-    def extract_with_model(self, text: str) -> Dict[str, Optional[str]]:
-        """Extrait avec le modèle NER actuel."""
-        if not self.current_model or self.current_model not in self.models:
-            return {}
-        
-        try:
-            nlp = self.models[self.current_model]
-            doc = nlp(text)
-            
-            # Mapping des labels
-            label_mapping = {
-                "nom_personne": "nom_prenom",
-                "reference_dossier": "reference_dossier",
-                "type_analyse": "type_prelevement", 
-                "date_prelevement": "date_prelevement",
-                "service_demandeur": "service_demandeur"
-            }
-            
-            results = {}
-            for ent in doc.ents:
-                if ent.label_ in label_mapping:
-                    key = label_mapping[ent.label_]
-                    if key not in results:
-                        results[key] = ent.text.strip()
-            
-            logger.info(f"✅ Extraction modèle {self.current_model}: {len(results)} champs")
-            return results
-            
-        except Exception as e:
-            logger.warning(f"⚠️ Erreur extraction modèle: {e}")
-            return {}
-    
-    def extract_with_regex(self, text: str) -> Dict[str, Optional[str]]:
-        """Extraction de fallback avec regex."""
-        patterns = {
-            "reference_dossier": [
-                r"(?:Référence|Réf\.?|Reference|N°\s*dossier|IPP|Dossier)\s*:?\s*([\w\d\-\/]+)",
-            ],
-            "type_prelevement": [
-                r"(?:Objet|Type\s*d'analyse|Analyse|Examen|Diagnostic|Test|Bilan)\s*:?\s*(.+?)(?:\n|$)",
-            ],
-            "date_prelevement": [
-                r"(?:Date|Réalisé|Effectué|Prélevé)\s*[:\s]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{4})",
-            ],
-            "service_demandeur": [
-                r"(?:Service|Demandeur|Prescripteur|Unité|Département)\s*:?\s*([^:\n]+?)(?:\n|$)",
-            ],
-            "nom_prenom": [
-                r"(?:Nom|Patient|Identité|Malade)\s*[:\s]*([A-Z][A-Z\s\-]+?)(?:\n|$)",
-            ]
+    def get_model(self, model_id: Optional[str] = None) -> Tuple[Optional[str], Optional[Language]]:
+        """
+        Pipeline d'un modèle (par défaut le modèle actuel), chargé si besoin. Si le modèle ne se charge
+        pas, repli sur un autre modèle disponible (général, spaCy par défaut, puis les autres), qui
+        devient le modèle actuel si le modèle en échec l'était.
+        
+        Returns:
+            Tuple (modèle utilisé, pipeline), (None, None) si aucun modèle ne se charge
+        """
+        model_id = model_id or self.current_model
+        candidates = [model_id, "general", "spacy_default", *self.models]
+        for candidate in dict.fromkeys(candidates):
+            if candidate not in self.models:
+                continue
+            try:
+                nlp = self.models[candidate]
+            except ModelLoadError:
+                continue
+            if candidate != model_id:
+                logger.warning(f"⚠️ Modèle {model_id} indisponible ({self.models.errors.get(model_id)}), "
+                               f"repli sur {candidate}")
+                if self.current_model == model_id:
+                    self.current_model = candidate
+            return candidate, nlp
+        if len(self.models):
+            logger.error(f"❌ Aucun modèle ne se charge (demandé: {model_id})")
+        return None, None
+    
+    def _stages(self) -> Dict[str, Stage]:
+        """Étapes communes et vote multi-têtes."""
+        return {**super()._stages(), "multi_head": self._multi_head_stage}
+    
+    def _model_metadata(self, model_id: Optional[str]) -> Dict:
+        """Modèle du document (par défaut le modèle actuel), pour les métadonnées."""
+        model_id = model_id or self.current_model
+        return {"model_used": self.model_info.get(model_id, {}).get("name", "Inconnu"), "model_id": model_id}
+    
+    def _multi_head_stage(self, document: Dict, fields: List[str]) -> Dict[str, Entity]:
+        """Étape "multi_head" : vote majoritaire des modèles entraînés."""
+        entities, document["votes"] = vote_entities(self.extract_entities_multi_head(document["ner_text"]))
+        return self._to_original(entities, document["offset_maps"])
+    
+    def get_reading_profile(self) -> Union[None, str, Dict]:
+        """Retourne le profil de lecture à appliquer pour le modèle actuel."""
+        if self.reading_profile == "auto":
+            # Un modèle compact lit comme le modèle de son domaine
+            domain = (self.current_model or "").replace("_compact", "")
+            return domain if domain in READING_PROFILES else "complet"
+        return self.reading_profile
+    
+    def route_document(self, text: str) -> Tuple[str, Dict]:
+        """
+        Choisit le modèle d'un document d'après le début de son texte.
+        
+        Returns:
+            Tuple (modèle retenu, décision du routeur avec sa durée en microsecondes).
+            Le modèle actuel est gardé si le modèle du domaine n'est pas disponible.
+        """
+        start = time.perf_counter()
+        routing = self.router.route(text)
+        routing["time_us"] = round((time.perf_counter() - start) * 1e6, 1)
+        available = routing["domain"] in self.models and routing["domain"] not in self.models.errors
+        model_id = routing["domain"] if available else self.current_model
+        logger.info(f"🧭 Routage: {routing['domain']} (confiance {routing['confidence']:.2f}) -> {model_id}")
+        return model_id, routing
+    
+    def _route(self, text: str) -> Tuple[Optional[str], Optional[Dict]]:
+        """Modèle du document choisi par le routeur, s'il est activé."""
+        return self.route_document(text) if self.router is not None else (None, None)
+    
+    def _watch_vocab(self, model_id: str, nlp):
+        """Surveille le vocabulaire d'un modèle qui vient d'être chargé."""
+        if self.max_vocab_growth is not None:
+            self.vocab_guards[model_id] = VocabGuard(
+                lambda path=self.model_info[model_id]["path"]: load_pipeline(path, self.nlp_profile),
+                nlp, self.max_vocab_growth, model_id)
+    
+    def _forget_vocab(self, model_id: str):
+        """Modèle déchargé : sa surveillance ne doit plus garder le pipeline en mémoire."""
+        self.vocab_guards.pop(model_id, None)
+    
+    def check_vocab(self):
+        """
+        Lance en arrière-plan le rechargement des modèles dont le vocabulaire a dépassé la croissance
+        maximale (appelé après chaque document) ; le registre prend le nouveau pipeline une fois chargé.
+        """
+        for model_id, guard in list(self.vocab_guards.items()):
+            current = self.models.peek(model_id)
+            if current is not None:
+                guard.check(current, lambda old, nlp, model_id=model_id: self.models.replace(model_id, old, nlp))
+    
+    def get_vocab_stats(self) -> Dict[str, Dict]:
+        """Taille du vocabulaire de chaque modèle chargé (et croissance, rechargements s'il est surveillé)."""
+        return {
+            model_id: self.vocab_guards[model_id].stats() if model_id in self.vocab_guards else vocab_size(nlp)
+            for model_id, nlp in self.models.loaded().items()
         }
+    
+    def _head_ids(self, model_ids: Optional[Sequence[str]]) -> List[str]:
+        """Modèles à utiliser comme têtes NER (par défaut : les modèles entraînés, le modèle actuel en premier)."""
+        if model_ids is None:
+            model_ids = [model_id for model_id in self.models
+                         if self.model_info.get(model_id, {}).get("type") == "trained"]
+            model_ids.sort(key=lambda model_id: model_id != self.current_model)
+        return [model_id for model_id in model_ids if model_id in self.models]
+    
+    def extract_entities_multi_head(self, text: str,
+                                    model_ids: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, Entity]]:
+        """
+        Analyse un texte avec plusieurs modèles en ne le tokenisant qu'une fois.
+        
+        Les modèles dérivent tous de fr_core_news_md et partagent la même tokenisation :
+        chaque morceau est tokenisé par le premier modèle, puis le Doc est recréé dans le
+        vocabulaire de chaque modèle (mots et espaces) et passé à ses composants.
         
-        results = {}
-        for field, pattern_list in patterns.items():
-            for pattern in pattern_list:
-                match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-                if match:
-                    value = match.group(1).strip()
-                    if value and len(value) > 1:
-                        results[field] = value
-                        break
-        
-        logger.info(f"✅ Extraction regex: {len(results)} champs")
+        Returns:
+            Entités (valeur, début, fin, score None : pas de faisceau ici) par modèle
+        """
+        model_ids = self._head_ids(model_ids)
+        results = {model_id: {} for model_id in model_ids}
+        if not model_ids:
+            return results
+        
+        # Pipelines pris une fois pour tout le texte : un budget mémoire trop petit pour toutes
+        # les têtes les décharge ensuite, sans rechargement entre deux morceaux
+        heads = {}
+        for model_id in model_ids:
+            nlp = self.models.get(model_id)
+            if nlp is not None:
+                heads[model_id] = nlp
+        if not heads:
+            return results
+        
+        tokenizer = next(iter(heads.values())).tokenizer
+        for start, end in split_chunks(text, self.chunk_chars):
+            tokens = tokenizer(text[start:end])
+            words = [token.text for token in tokens]
+            spaces = [bool(token.whitespace_) for token in tokens]
+            for model_id, nlp in heads.items():
+                try:
+                    doc = nlp(Doc(nlp.vocab, words=words, spaces=spaces))
+                except Exception as e:
+                    logger.warning(f"⚠️ Erreur extraction modèle {model_id}: {e}")
+                    continue
+                for field, entity in self._entities_from_doc(doc, start).items():
+                    results[model_id].setdefault(field, entity)
+        
+        logger.info(f"✅ Extraction multi-têtes ({', '.join(model_ids)}): "
+                    f"{sum(len(entities) for entities in results.values())} entités")
         return results
     
-    def read_pdf(self, file_path: str) -> str:
-        """Lit le contenu d'un PDF."""
-        try:
-            with pdfplumber.open(file_path) as pdf:
-                text = "\n".join([page.extract_text() or "" for page in pdf.pages])
-            logger.info(f"✅ PDF lu: {len(text)} caractères")
-            return text
-        except Exception as e:
-            logger.error(f"❌ Erreur lecture PDF: {e}")
-            raise
-    
-    def extract_from_pdf(self, file_path: str) -> Dict[str, Optional[str]]:
-        """Extraction complète depuis un PDF."""
-        # Lire le PDF
-        text = self.read_pdf(file_path)
-        
-        # Extraction avec modèle
-        model_results = self.extract_with_model(text)
-        
-        # Extraction avec regex (fallback)
-        regex_results = self.extract_with_regex(text)
-        
-        # Fusionner les résultats (privilégier le modèle)
-        final_results = {}
-        fields = {"nom_prenom", "reference_dossier", "type_prelevement", "date_prelevement", "service_demandeur"}
-        
-        for field in fields:
-            if field in model_results and model_results[field]:
-                final_results[field] = model_results[field]
-            elif field in regex_results and regex_results[field]:
-                final_results[field] = regex_results[field]
-            else:
-                final_results[field] = None
-        
-        # Métadonnées
-        final_results["_metadata"] = {
-            "model_used": self.model_info.get(self.current_model, {}).get("name", "Inconnu"),
-            "model_id": self.current_model,
-            "extraction_method": "model" if model_results else "regex",
-            "model_fields": len(model_results),
-            "regex_fields": len(regex_results),
-            "text_length": len(text)
+    def extract_multi_head(self, file_path: PDFSource, model_ids: Optional[Sequence[str]] = None,
+                           vote: bool = True) -> Dict:
+        """
+        Extraction d'un PDF avec plusieurs modèles pour un seul coût de lecture et de tokenisation.
+        
+        Args:
+            file_path: Chemin du PDF, ses octets ou un flux binaire
+            model_ids: Modèles à comparer (None = tous les modèles entraînés)
+            vote: Fusionner les modèles par vote majoritaire (sinon un résultat par modèle)
+        
+        Returns:
+            Résultats fusionnés (détail par modèle et votes dans _metadata), ou dictionnaire
+            modèle -> résultats si vote est False
+        """
+        document = self._prepare_pdf(file_path, route=False)
+        per_model = self.extract_entities_multi_head(document["ner_text"], model_ids) if document["has_text"] else {
+            model_id: {} for model_id in self._head_ids(model_ids)
         }
         
-        logger.info(f"✅ Extraction terminée: {sum(1 for v in final_results.values() if v and not isinstance(v, dict))} champs")
+        # Les têtes remplacent les étapes NER de la cascade : seules les regex complètent
+        fallback = ExtractionCascade([("regex", self._regex_stage)], self.confidence_threshold)
+        
+        def finish(entities: Dict[str, Entity], model_id: Optional[str] = None) -> Dict:
+            run = CascadeRun(self._to_original(entities, document["offset_maps"]), {field: "model" for field in entities})
+            return self._finish_document(document, run, model_id, fallback)
+        
+        if not vote:
+            return {model_id: finish(entities, model_id) for model_id, entities in per_model.items()}
+        
+        entities, votes = vote_entities(per_model)
+        final_results = finish(entities)
+        final_results["_metadata"].update({
+            "extraction_method": "multi_head_vote",
+            "heads": {model_id: {field: value for field, (value, *_) in head.items()}
+                      for model_id, head in per_model.items()},
+            "votes": votes
+        })
         return final_results
     
     def get_model_performance(self) -> Dict:
@@ -217,7 +380,9 @@ class MultiModelExtractor:
         return {
             "current_model": self.current_model,
             "available_models": len(self.models),
-            "model_info": self.model_info.get(self.current_model, {})
+            "loaded_models": self.models.stats(),
+            "model_info": self.model_info.get(self.current_model, {}),
+            "vocab": self.get_vocab_stats()
         }
 
 # Instance globale
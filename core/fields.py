@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Champs de sortie de l'extraction et validation légère de leurs valeurs.
+"""
+
+import re
+from typing import Dict, Optional
+
+# Champs retournés par les extracteurs
+FIELDS = ("nom_prenom", "reference_dossier", "type_prelevement", "date_prelevement", "service_demandeur")
+
+# Labels des modèles NER -> champs de sortie
+NER_LABEL_TO_FIELD = {
+    "nom_personne": "nom_prenom",
+    "reference_dossier": "reference_dossier",
+    "type_analyse": "type_prelevement",
+    "date_prelevement": "date_prelevement",
+    "service_demandeur": "service_demandeur"
+}
+
+# Patterns regex de fallback par champ, par ordre de priorité (valeur : groupe 1)
+REGEX_PATTERNS = {
+    "reference_dossier": [
+        r"(?:Référence|Réf\.?|Reference|N°\s*dossier|IPP|Dossier)\s*:?\s*([\w\d\-\/]+)",
+    ],
+    "type_prelevement": [
+        r"(?:Objet|Type\s*d'analyse|Analyse|Examen|Diagnostic|Test|Bilan)\s*:?\s*(.+?)(?:\n|$)",
+    ],
+    "date_prelevement": [
+        r"(?:Date|Réalisé|Effectué|Prélevé)\s*[:\s]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{4})",
+    ],
+    "service_demandeur": [
+        r"(?:Service|Demandeur|Prescripteur|Unité|Département)\s*:?\s*([^:\n]+?)(?:\n|$)",
+    ],
+    "nom_prenom": [
+        r"(?:Nom|Patient|Identité|Malade)\s*[:\s]*([A-Z][A-Z\s\-]+?)(?:\n|$)",
+    ]
+}
+
+_VALIDATORS = {
+    "nom_prenom": re.compile(r"^[^\W\d_][^\d:]{1,80}$"),
+    # Références juridiques avec espaces : « N° 795686/2021 », « RG 2025/9513 »
+    "reference_dossier": re.compile(r"^(?=.{3,40}$)(?=.*\d)[\w\-\/\.°]+(?: [\w\-\/\.°]+){0,2}$"),
+    "type_prelevement": re.compile(r"^(?=.*[^\W\d_]).{3,150}$"),
+    "date_prelevement": re.compile(r"^\d{1,2}[\/\-\. ]\d{1,2}[\/\-\. ]\d{2,4}$"),
+    "service_demandeur": re.compile(r"^(?=.*[^\W\d_]).{3,150}$"),
+}
+
+
+def validate_field(field: str, value: Optional[str]) -> bool:
+    """Vérifie qu'une valeur a la forme attendue pour son champ."""
+    if not value:
+        return False
+    validator = _VALIDATORS.get(field)
+    if validator is None:
+        return True
+    return bool(validator.match(value.strip()))
+
+
+def all_fields_valid(results: Dict[str, Optional[str]]) -> bool:
+    """Indique si les cinq champs sont remplis avec des valeurs valides."""
+    return all(validate_field(field, results.get(field)) for field in FIELDS)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Vocabulaire des générateurs de données d'entraînement (training/scripts).
+
+Les préfixes d'étiquettes (« Nom : », « Prélevé le : »...) utilisés pour
+générer les données d'entraînement sont relus ici pour que l'extraction
+reconnaisse les mêmes formulations que celles vues par les modèles.
+"""
+
+import importlib.util
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "training" / "scripts"
+
+# Domaine -> (script, classe du générateur, méthode créant un exemple)
+GENERATORS = {
+    "general": ("generate_synthetic_data.py", "SyntheticDataGenerator", "create_training_example"),
+    "medical": ("generate_medical_data.py", "MedicalDataGenerator", "create_medical_example"),
+    "legal": ("generate_legal_data.py", "LegalDataGenerator", "create_legal_example")
+}
+
+# Attributs de préfixes du générateur général -> label NER
+_GENERAL_PREFIXES = {
+    "prefixes_nom": "nom_personne",
+    "prefixes_reference": "reference_dossier",
+    "prefixes_analyse": "type_analyse",
+    "prefixes_date": "date_prelevement",
+    "prefixes_service": "service_demandeur"
+}
+
+# Attribut des préfixes (dictionnaire par label NER) des générateurs spécialisés
+_DOMAIN_PREFIXES = {
+    "medical": "prefixes_medicaux",
+    "legal": "prefixes_juridiques"
+}
+
+# Listes de valeurs propres à chaque domaine (types d'analyse ou d'affaire, services, juridictions)
+_DOMAIN_TERMS = {
+    "general": ("types_analyse", "services"),
+    "medical": ("analyses_medicales", "services_medicaux"),
+    "legal": ("affaires_juridiques", "juridictions")
+}
+
+
+@lru_cache(maxsize=None)
+def load_generator(domain: str):
+    """Instancie le générateur d'un domaine depuis training/scripts."""
+    if domain not in GENERATORS:
+        raise ValueError(f"Domaine inconnu: {domain}")
+    script, class_name, _ = GENERATORS[domain]
+    spec = importlib.util.spec_from_file_location(f"_generator_{domain}", SCRIPTS_DIR / script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, class_name)()
+
+
+@lru_cache(maxsize=None)
+def _domain_label_prefixes(domain: str) -> Dict[str, tuple]:
+    generator = load_generator(domain)
+    if domain in _DOMAIN_PREFIXES:
+        prefixes = getattr(generator, _DOMAIN_PREFIXES[domain])
+        return {label: tuple(values) for label, values in prefixes.items()}
+    return {label: tuple(getattr(generator, attribute)) for attribute, label in _GENERAL_PREFIXES.items()}
+
+
+def label_prefixes(domain: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Préfixes d'étiquettes par label NER.
+
+    Args:
+        domain: "general", "medical", "legal", ou None pour l'union de tous les domaines
+    """
+    domains = [domain] if domain is not None else list(GENERATORS)
+    merged: Dict[str, List[str]] = {}
+    for name in domains:
+        for label, prefixes in _domain_label_prefixes(name).items():
+            values = merged.setdefault(label, [])
+            values.extend(prefix for prefix in prefixes if prefix not in values)
+    return merged
+
+
+def domain_vocabulary(domain: str) -> List[str]:
+    """Préfixes et valeurs caractéristiques d'un domaine (sans les noms de personnes)."""
+    generator = load_generator(domain)
+    terms = [prefix for prefixes in _domain_label_prefixes(domain).values() for prefix in prefixes]
+    for attribute in _DOMAIN_TERMS[domain]:
+        terms.extend(getattr(generator, attribute))
+    return terms
+
+
+def generate_examples(domain: str, count: int) -> List[Tuple[str, Dict]]:
+    """Exemples annotés (texte, {"entities": [(début, fin, label)]}) produits par le générateur d'un domaine."""
+    generator = load_generator(domain)
+    create_example = getattr(generator, GENERATORS[domain][2])
+    return [create_example() for _ in range(count)]
+
+
+def generate_texts(domain: str, count: int) -> List[str]:
+    """Textes d'exemple produits par le générateur d'un domaine."""
+    return [text for text, _ in generate_examples(domain, count)]
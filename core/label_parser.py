@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Analyse « Étiquette : valeur » sans NLP.
+
+Les étiquettes des générateurs d'entraînement des trois domaines (« Nom : »,
+« Prélevé le : », « N° RG : »...) sont rangées dans un trie, traduit en une
+expression dont chaque niveau est une alternance de caractères. Sur le texte en
+minuscules (sans IGNORECASE, le moteur re saute directement aux positions dont
+le caractère commence une étiquette), chaque position ne suit qu'une branche du
+trie : le texte est parcouru une fois, quel que soit le nombre d'étiquettes.
+
+La valeur d'une étiquette va jusqu'à la fin de sa ligne ou jusqu'à l'étiquette
+suivante (« Nom : X | Date : Y »). Seules les valeurs valides (core/fields.py)
+sont gardées : quand les cinq champs sont remplis, le modèle NER est inutile.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+from core.fields import FIELDS, NER_LABEL_TO_FIELD, validate_field
+from core.generator_vocab import label_prefixes
+from core.ner_confidence import Entity
+
+# Marque de fin d'étiquette dans un nœud du trie
+_END = ""
+
+# Caractères retirés en fin de valeur (séparateurs « | », « ; », « - » entre champs d'une même ligne)
+_TRAILING_SEPARATORS = "|;"
+_TRAILING_DASHES = "-–"
+
+
+def normalize_label(prefix: str) -> str:
+    """Étiquette sans « : » final, en minuscules, espaces réduits."""
+    return " ".join(re.sub(r"\s*:\s*$", "", prefix).lower().split())
+
+
+def build_trie(labels: Iterable[str]) -> Dict:
+    """Trie des étiquettes : caractère -> sous-trie, _END marque la fin d'une étiquette."""
+    trie: Dict = {}
+    for label in labels:
+        node = trie
+        for char in label:
+            node = node.setdefault(char, {})
+        node[_END] = True
+    return trie
+
+
+def trie_pattern(node: Dict) -> str:
+    """Expression équivalente au trie ; les suites les plus longues sont essayées d'abord."""
+    branches = [(r"\s+" if char == " " else re.escape(char)) + trie_pattern(child)
+                for char, child in sorted(node.items()) if char != _END]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return f"(?:{body})?" if _END in node else body
+
+
+class LabelParser:
+    """Extraction des couples étiquette/valeur d'un texte, en une passe."""
+
+    def __init__(self, prefixes: Optional[Dict[str, Iterable[str]]] = None):
+        """
+        Args:
+            prefixes: Préfixes d'étiquettes par label NER (None = générateurs des trois domaines)
+        """
+        prefixes = prefixes if prefixes is not None else label_prefixes()
+        # Étiquette normalisée -> champ de sortie
+        self.label_fields = {
+            normalize_label(prefix): NER_LABEL_TO_FIELD[label]
+            for label, label_prefix_list in prefixes.items() if label in NER_LABEL_TO_FIELD
+            for prefix in label_prefix_list
+        }
+        self.label_fields.pop("", None)
+        trie = trie_pattern(build_trie(self.label_fields))
+        # Étiquette (groupe 1) suivie de « : »
+        self.pattern = re.compile(f"({trie})" + r"\s*:")
+        # Texte dont les minuscules changent de longueur (rare) : même expression sur le texte original
+        self._pattern_ignorecase = re.compile(self.pattern.pattern, re.IGNORECASE)
+
+    def _value_span(self, text: str, start: int, limit: int):
+        """Valeur après une étiquette : reste de la ligne (ou ligne suivante si vide), sans séparateurs finaux."""
+        while start < limit and text[start] in " \t":
+            start += 1
+        if start < limit and text[start] == "\n":
+            # « Nom :\nDUPONT »
+            start += 1
+            while start < limit and text[start] in " \t":
+                start += 1
+        end = text.find("\n", start, limit)
+        end = limit if end == -1 else end
+        while end > start:
+            char = text[end - 1]
+            if char.isspace() or char in _TRAILING_SEPARATORS:
+                end -= 1
+            elif char in _TRAILING_DASHES and (end - 1 == start or text[end - 2].isspace()):
+                end -= 1
+            else:
+                break
+        return start, end
+
+    def parse(self, text: str, fields: Optional[Iterable[str]] = None) -> Dict[str, Entity]:
+        """
+        Première valeur valide de chaque champ : (valeur, début, fin, score None).
+
+        Args:
+            text: Texte à analyser
+            fields: Champs à chercher (None pour tous)
+        """
+        wanted = set(FIELDS if fields is None else fields)
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            matches = self.pattern.finditer(lowered)
+        else:
+            matches = self._pattern_ignorecase.finditer(text)
+        # Étiquette en début de mot seulement (« prénom : » ne contient pas l'étiquette « nom »)
+        labels = [match for match in matches if match.start() == 0 or not (text[match.start() - 1].isalnum()
+                                                                            or text[match.start() - 1] == "_")]
+
+        results: Dict[str, Entity] = {}
+        for i, match in enumerate(labels):
+            field = self.label_fields.get(" ".join(match.group(1).lower().split()))
+            if field is None or field not in wanted or field in results:
+                continue
+            limit = labels[i + 1].start() if i + 1 < len(labels) else len(text)
+            start, end = self._value_span(text, match.end(), limit)
+            value = text[start:end]
+            if validate_field(field, value):
+                results[field] = (value, start, end, None)
+                if len(results) == len(wanted):
+                    break
+        return results
+
+    def complete(self, entities: Dict[str, Entity]) -> bool:
+        """Les cinq champs ont une valeur valide : l'analyse NER peut être évitée."""
+        return all(field in entities for field in FIELDS)
+
+
+@lru_cache(maxsize=None)
+def default_label_parser() -> LabelParser:
+    """Étiquettes de tous les générateurs d'entraînement (construit une fois par processus)."""
+    return LabelParser()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Mesure de la mémoire résidente (RSS) du processus courant ou d'un autre processus.
+"""
+
+import os
+import sys
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_mb() -> float:
+    """RSS actuelle en Mo (repli sur le pic si /proc n'est pas disponible)."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """Pic de RSS du processus depuis son démarrage, en Mo."""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sur macOS, en Ko ailleurs
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def process_memory_mb(pid: Optional[int] = None) -> Dict[str, float]:
+    """
+    Mémoire d'un processus (par défaut le processus courant) en Mo : "rss", "pss"
+    (pages partagées divisées entre les processus) et "private" (pages propres au processus).
+
+    Dictionnaire vide si /proc/<pid>/smaps_rollup n'est pas disponible (hors Linux).
+    """
+    fields = {"Rss": "rss", "Pss": "pss", "Private_Clean": "private", "Private_Dirty": "private"}
+    usage = {"rss": 0.0, "pss": 0.0, "private": 0.0}
+    try:
+        with open(f"/proc/{pid or 'self'}/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in fields:
+                    usage[fields[name]] += int(value.split()[0]) / 1024
+    except (OSError, ValueError, IndexError):
+        return {}
+    return {key: round(value, 1) for key, value in usage.items()}
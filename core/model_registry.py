@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Modèles spaCy chargés à la première utilisation, sous un budget mémoire.
+
+Les modèles sont recensés d'après le disque (dossier ou package installé) sans
+être chargés : un worker qui ne sert qu'un domaine ne garde qu'un pipeline en
+mémoire. La taille de chaque modèle chargé est estimée d'après ses poids, ses
+vecteurs et ses chaînes (la hausse de la RSS au chargement est trop bruitée :
+ramasse-miettes, autres threads). Au-delà du budget, les modèles utilisés le
+moins récemment sont déchargés : une analyse en cours garde sa référence et se
+termine normalement, la mémoire est rendue ensuite.
+
+Les chargements ont lieu un par un et une seule fois par modèle : un thread qui
+demande un modèle en cours de chargement attend ce chargement au lieu d'en
+lancer un second. Un modèle déjà chargé est rendu sans attendre.
+
+Un modèle qui ne se charge pas reste recensé avec son erreur (errors) : les
+demandes suivantes échouent aussitôt avec ModelLoadError, sans nouvel essai,
+jusqu'à ce qu'il soit enregistré à nouveau.
+"""
+
+import gc
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from spacy.language import Language
+from spacy.util import get_package_path, is_package
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Mémoire maximale des modèles chargés en Mo (None = pas de limite)
+DEFAULT_MAX_MODELS_MB = None
+
+# Octets par chaîne du vocabulaire (StringStore, lexème, table des vecteurs), ordre de grandeur mesuré
+_BYTES_PER_STRING = 200
+
+
+class ModelLoadError(KeyError):
+    """Modèle recensé dont le chargement a échoué (KeyError : registry.get(id) rend None)."""
+
+    def __init__(self, model_id: str, error: str):
+        super().__init__(model_id)
+        self.model_id = model_id
+        self.error = error
+
+    def __str__(self) -> str:
+        return f"Modèle {self.model_id} impossible à charger: {self.error}"
+
+
+def model_available(name_or_path: str) -> bool:
+    """Modèle présent sur le disque (dossier ou package installé), sans le charger."""
+    return Path(name_or_path).exists() or is_package(name_or_path)
+
+
+def disk_size_mb(name_or_path: str) -> float:
+    """Taille des fichiers d'un modèle en Mo (0 s'il est introuvable)."""
+    root = Path(name_or_path)
+    if not root.exists() and is_package(name_or_path):
+        root = get_package_path(name_or_path)
+    if not root.exists():
+        return 0.0
+    return sum(path.stat().st_size for path in root.rglob("*") if path.is_file()) / (1024 * 1024)
+
+
+def pipeline_size_mb(nlp: Language) -> float:
+    """Taille résidente approximative d'un pipeline en Mo : poids des composants, vecteurs et vocabulaire."""
+    size = nlp.vocab.vectors.data.nbytes + len(nlp.vocab.strings) * _BYTES_PER_STRING
+    seen = set()
+    for _, component in nlp.pipeline:
+        model = getattr(component, "model", None)
+        if model is None or not hasattr(model, "walk"):
+            continue
+        for node in model.walk():
+            # Couches partagées (tok2vec) comptées une fois
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            size += sum(node.get_param(name).nbytes for name in node.param_names if node.has_param(name))
+    return size / (1024 * 1024)
+
+
+class ModelRegistry(MutableMapping):
+    """
+    Modèles par identifiant : les clés sont les modèles disponibles, model[id] charge le pipeline si besoin.
+
+    Un pipeline ajouté directement (registry[id] = nlp) sans chemin enregistré n'est jamais déchargé.
+    """
+
+    def __init__(self, loader: Callable[[str], Language], max_memory_mb: Optional[float] = DEFAULT_MAX_MODELS_MB,
+                 on_load: Optional[Callable[[str, Language], None]] = None,
+                 on_evict: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            loader: Charge un pipeline depuis son dossier ou son package (ex. load_pipeline avec un profil)
+            max_memory_mb: Taille totale des modèles chargés au-delà de laquelle les moins récemment
+                utilisés sont déchargés (None = pas de limite)
+            on_load: Appelé avec (identifiant, pipeline) après chaque chargement
+            on_evict: Appelé avec l'identifiant d'un modèle déchargé
+        """
+        self.loader = loader
+        self.max_memory_mb = max_memory_mb
+        self.on_load = on_load
+        self.on_evict = on_evict
+        # Chemin de chaque modèle disponible (None : pipeline ajouté directement)
+        self._paths: Dict[str, Optional[str]] = {}
+        # Modèles chargés, du moins au plus récemment utilisé
+        self._loaded: "OrderedDict[str, Language]" = OrderedDict()
+        self._sizes: Dict[str, float] = {}
+        self.loads = 0
+        self.evictions = 0
+        self.last_load_s: Dict[str, float] = {}
+        # Erreur du dernier chargement échoué de chaque modèle
+        self.errors: Dict[str, str] = {}
+        # Table des modèles chargés
+        self._lock = threading.Lock()
+        # Un chargement à la fois
+        self._load_lock = threading.Lock()
+
+    def register(self, model_id: str, path: str):
+        """Ajoute un modèle disponible, chargé à sa première utilisation (efface une erreur de chargement)."""
+        with self._lock:
+            self._paths[model_id] = path
+            self.errors.pop(model_id, None)
+
+    def __contains__(self, model_id) -> bool:
+        return model_id in self._paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._paths))
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __getitem__(self, model_id: str) -> Language:
+        with self._lock:
+            if model_id in self._loaded:
+                self._loaded.move_to_end(model_id)
+                return self._loaded[model_id]
+            if model_id not in self._paths:
+                raise KeyError(model_id)
+        return self._load(model_id)
+
+    def __setitem__(self, model_id: str, nlp: Language):
+        """Ajoute ou remplace un pipeline chargé (rechargement du vocabulaire, modèle construit en mémoire)."""
+        size = pipeline_size_mb(nlp)
+        with self._lock:
+            self._paths.setdefault(model_id, None)
+            self.errors.pop(model_id, None)
+            self._loaded[model_id] = nlp
+            self._loaded.move_to_end(model_id)
+            self._sizes[model_id] = size
+            evicted = self._make_room(keep=model_id)
+        self._notify_evicted(evicted)
+
+    def replace(self, model_id: str, old: Language, nlp: Language) -> bool:
+        """
+        Remplace le pipeline old par nlp (rechargement en arrière-plan), sans changer l'ordre d'éviction.
+
+        Returns:
+            False si old n'est plus chargé (déchargé ou déjà remplacé entre-temps) : nlp est ignoré
+        """
+        size = pipeline_size_mb(nlp)
+        with self._lock:
+            if self._loaded.get(model_id) is not old:
+                return False
+            self._loaded[model_id] = nlp
+            self._sizes[model_id] = size
+            evicted = self._make_room(keep=model_id)
+        self._notify_evicted(evicted)
+        return True
+
+    def __delitem__(self, model_id: str):
+        """Décharge un modèle et le retire des modèles disponibles."""
+        with self._lock:
+            del self._paths[model_id]
+            self.errors.pop(model_id, None)
+            loaded = self._loaded.pop(model_id, None) is not None
+            self._sizes.pop(model_id, None)
+        if loaded:
+            self._notify_evicted([model_id])
+
+    def peek(self, model_id: str) -> Optional[Language]:
+        """Pipeline s'il est déjà chargé, sans le charger ni changer l'ordre d'éviction."""
+        return self._loaded.get(model_id)
+
+    def loaded(self) -> Dict[str, Language]:
+        """Modèles actuellement chargés, du moins au plus récemment utilisé."""
+        with self._lock:
+            return dict(self._loaded)
+
+    def memory_mb(self) -> float:
+        """Taille estimée des modèles chargés en Mo."""
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def _load(self, model_id: str) -> Language:
+        """Charge un modèle (un seul chargement à la fois, une seule fois par modèle)."""
+        with self._load_lock:
+            with self._lock:
+                # Chargé par un autre thread pendant l'attente
+                if model_id in self._loaded:
+                    self._loaded.move_to_end(model_id)
+                    return self._loaded[model_id]
+                if model_id not in self._paths:
+                    raise KeyError(model_id)
+                if model_id in self.errors:
+                    raise ModelLoadError(model_id, self.errors[model_id])
+                path = self._paths[model_id]
+                # Place libérée avant le chargement, d'après la taille sur le disque
+                evicted = self._make_room(extra_mb=disk_size_mb(path))
+            self._notify_evicted(evicted)
+
+            start = time.perf_counter()
+            try:
+                nlp = self.loader(path)
+            except Exception as e:
+                logger.warning(f"❌ Erreur chargement {model_id}: {e}")
+                # Modèle gardé avec son erreur : l'appelant peut la signaler ou se replier sur un autre
+                with self._lock:
+                    self.errors[model_id] = str(e)
+                raise ModelLoadError(model_id, str(e)) from e
+            self.last_load_s[model_id] = round(time.perf_counter() - start, 2)
+            size = pipeline_size_mb(nlp)
+
+            with self._lock:
+                self._loaded[model_id] = nlp
+                self._sizes[model_id] = size
+                self.loads += 1
+                evicted = self._make_room(keep=model_id)
+            logger.info(f"✅ Modèle chargé: {model_id} (~{size:.0f} Mo, {self.last_load_s[model_id]} s)")
+            self._notify_evicted(evicted)
+            if self.on_load is not None:
+                self.on_load(model_id, nlp)
+            return nlp
+
+    def _make_room(self, extra_mb: float = 0.0, keep: Optional[str] = None) -> List[str]:
+        """
+        Décharge les modèles les moins récemment utilisés jusqu'à repasser sous le budget
+        (verrou de la table tenu par l'appelant).
+
+        Args:
+            extra_mb: Place à réserver pour un modèle sur le point d'être chargé
+            keep: Modèle à ne pas décharger (celui qui vient d'être chargé)
+
+        Returns:
+            Les modèles déchargés
+        """
+        evicted = []
+        if self.max_memory_mb is None:
+            return evicted
+        for model_id in list(self._loaded):
+            if sum(self._sizes.values()) + extra_mb <= self.max_memory_mb:
+                break
+            if model_id == keep or self._paths.get(model_id) is None:
+                # Modèle ajouté directement : impossible à recharger
+                continue
+            del self._loaded[model_id]
+            self._sizes.pop(model_id, None)
+            self.evictions += 1
+            evicted.append(model_id)
+        return evicted
+
+    def _notify_evicted(self, evicted: List[str]):
+        if not evicted:
+            return
+        logger.info(f"♻️ Modèle(s) déchargé(s) (budget {self.max_memory_mb} Mo): {', '.join(evicted)}")
+        if self.on_evict is not None:
+            for model_id in evicted:
+                self.on_evict(model_id)
+        # Les pipelines ont des références circulaires : mémoire rendue dès maintenant
+        gc.collect()
+
+    def stats(self) -> Dict:
+        """Modèles chargés (taille estimée en Mo), budget, chargements, déchargements et erreurs."""
+        with self._lock:
+            return {
+                "loaded": {model_id: round(self._sizes.get(model_id, 0.0), 1) for model_id in self._loaded},
+                "memory_mb": round(sum(self._sizes.values()), 1),
+                "max_memory_mb": self.max_memory_mb,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "last_load_s": dict(self.last_load_s),
+                "errors": dict(self.errors)
+            }
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Confiance des entités NER par recherche en faisceau (beam search).
+
+Le NER glouton ne donne aucun score : ici le composant "ner" est retiré de
+nlp.pipe puis appliqué par lots avec beam_parse. Les analyses du faisceau
+donnent la probabilité de chaque entité (scored_ents), et la meilleure analyse
+annote le Doc comme le ferait le NER glouton.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from spacy.language import Language
+from spacy.util import minibatch
+
+from core.nlp_profiles import DEFAULT_BATCH_SIZE
+
+# Largeur du faisceau (1 = NER glouton, sans score). Les modèles sont entraînés et décodés en
+# glouton : le faisceau, plus coûteux, n'est lancé que si des scores sont demandés
+DEFAULT_BEAM_WIDTH = 1
+
+# Largeur du faisceau en service (application) : scores affichés, champs peu sûrs relayés aux étapes suivantes
+SERVING_BEAM_WIDTH = 4
+
+# En dessous de ce score, le champ est aussi cherché par les étapes suivantes (avec faisceau seulement)
+DEFAULT_CONFIDENCE_THRESHOLD = 0.8
+
+# Entité extraite : (valeur, début, fin, score ou None sans faisceau)
+Entity = Tuple[str, int, int, Optional[float]]
+
+# Scores d'un Doc : (début, fin, label) en tokens -> probabilité
+EntityScores = Dict[Tuple[int, int, str], float]
+
+
+def supports_scores(nlp: Language, beam_width: int) -> bool:
+    """Le NER peut être scoré : faisceau demandé et composant "ner" en fin de pipeline."""
+    return beam_width > 1 and bool(nlp.pipe_names) and nlp.pipe_names[-1] == "ner"
+
+
+def pipe_with_scores(nlp: Language, items: Iterable[Tuple[str, Any]],
+                     beam_width: int = DEFAULT_BEAM_WIDTH,
+                     batch_size: int = DEFAULT_BATCH_SIZE,
+                     n_process: int = 1) -> Iterator[Tuple[Any, Optional[EntityScores], Any]]:
+    """
+    nlp.pipe sur des couples (texte, contexte), avec le score des entités.
+
+    Yields:
+        Tuples (doc, scores des entités ou None, contexte). Sans faisceau, ou si le NER
+        n'est pas le dernier composant, le pipeline est appliqué tel quel (scores None).
+    """
+    if not supports_scores(nlp, beam_width):
+        for doc, context in nlp.pipe(items, as_tuples=True, batch_size=batch_size, n_process=n_process):
+            yield doc, None, context
+        return
+
+    ner = nlp.get_pipe("ner")
+    docs = nlp.pipe(items, as_tuples=True, batch_size=batch_size, n_process=n_process, disable=["ner"])
+    for batch in minibatch(docs, batch_size):
+        batch_docs = [doc for doc, _ in batch]
+        beams = ner.beam_parse(batch_docs, beam_width)
+        ner.set_annotations(batch_docs, beams)
+        for (doc, context), scores in zip(batch, ner.scored_ents(beams)):
+            yield doc, dict(scores), context
+
+
+def entity_score(scores: Optional[EntityScores], ent) -> Optional[float]:
+    """Score d'une entité du Doc (None sans faisceau)."""
+    if scores is None:
+        return None
+    return round(min(scores.get((ent.start, ent.end, ent.label_), 0.0), 1.0), 3)
+
+
+def is_confident(entity: Optional[Entity], threshold: Optional[float]) -> bool:
+    """
+    Entité présente et de score suffisant. Sans seuil (None : pas de scores demandés), toute entité
+    présente suffit ; avec un seuil, une entité sans score n'est pas considérée sûre.
+    """
+    if entity is None:
+        return False
+    return threshold is None or (entity[3] is not None and entity[3] >= threshold)
+
+
+def keep_best(results: Dict[str, Entity], candidates: Dict[str, Entity]) -> Dict[str, Entity]:
+    """Ajoute les entités candidates à results : un champ déjà rempli n'est remplacé que par un meilleur score."""
+    for field, entity in candidates.items():
+        current = results.get(field)
+        if current is None or (entity[3] is not None and current[3] is not None and entity[3] > current[3]):
+            results[field] = entity
+    return results
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Profils d'inférence des pipelines spaCy.
+
+L'extraction ne lit que doc.ents : le profil "ner" ne charge que le composant
+NER et ceux dont il dépend (tok2vec partagé écouté via un listener), au lieu
+du pipeline complet (morphologizer, parser, lemmatizer...).
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Union
+
+import spacy
+from spacy.language import Language
+from spacy.util import get_package_path, is_package, load_config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Profils : composants à garder (None = pipeline complet)
+NLP_PROFILES = {
+    "ner": ("ner",),
+    "complet": None
+}
+
+DEFAULT_NLP_PROFILE = "ner"
+
+# Nombre de documents par lot pour nlp.pipe
+DEFAULT_BATCH_SIZE = 64
+
+NLPProfile = Union[None, str, Sequence[str]]
+
+
+def resolve_nlp_profile(profile: NLPProfile) -> Optional[Sequence[str]]:
+    """Composants à garder pour un profil (nom ou liste de composants), None pour tout garder."""
+    if profile is None:
+        return None
+    if isinstance(profile, str):
+        if profile not in NLP_PROFILES:
+            raise ValueError(f"Profil d'inférence inconnu: {profile}")
+        return NLP_PROFILES[profile]
+    return tuple(profile)
+
+
+def model_config(name_or_path: str):
+    """Configuration d'un pipeline (dossier de modèle ou package installé)."""
+    path = Path(name_or_path)
+    if not path.exists() and is_package(name_or_path):
+        # Les packages rangent le modèle dans un sous-dossier <nom>-<version>
+        package_path = get_package_path(name_or_path)
+        path = next((p.parent for p in package_path.glob("*/config.cfg")), package_path)
+    return load_config(path / "config.cfg")
+
+
+def _listened_upstreams(node) -> Set[str]:
+    """Noms des composants écoutés (Tok2VecListener, TransformerListener...) dans un bloc de configuration."""
+    upstreams = set()
+    if isinstance(node, dict):
+        if "Listener" in str(node.get("@architectures", "")):
+            upstreams.add(node.get("upstream", "*"))
+        for value in node.values():
+            upstreams |= _listened_upstreams(value)
+    return upstreams
+
+
+def excluded_components(config, keep: Sequence[str]) -> List[str]:
+    """Composants du pipeline inutiles aux composants à garder et à leurs dépendances."""
+    pipeline = list(config["nlp"]["pipeline"])
+    components: Dict = config["components"]
+    needed = set()
+    pending = [name for name in keep if name in pipeline]
+    while pending:
+        name = pending.pop()
+        if name in needed:
+            continue
+        needed.add(name)
+        for upstream in _listened_upstreams(components.get(name, {})):
+            if upstream == "*":
+                # Listener sans nom : n'importe quel composant d'embedding du pipeline
+                pending.extend(n for n in pipeline
+                               if components.get(n, {}).get("factory") in ("tok2vec", "transformer"))
+            else:
+                pending.append(upstream)
+    return [name for name in pipeline if name not in needed]
+
+
+def load_pipeline(name_or_path: str, profile: NLPProfile = DEFAULT_NLP_PROFILE) -> Language:
+    """
+    Charge un pipeline spaCy selon un profil d'inférence.
+
+    Args:
+        name_or_path: Dossier du modèle ou nom du package
+        profile: "ner" (NER et ses dépendances), "complet", None ou liste de composants à garder
+    """
+    keep = resolve_nlp_profile(profile)
+    if keep is None or not (Path(name_or_path).exists() or is_package(name_or_path)):
+        # Profil complet, ou modèle introuvable : spacy.load lève alors son erreur habituelle
+        return spacy.load(name_or_path)
+
+    exclude = excluded_components(model_config(name_or_path), keep)
+    nlp = spacy.load(name_or_path, exclude=exclude)
+    logger.info(f"🧩 Pipeline {name_or_path}: {', '.join(nlp.pipe_names) or 'aucun composant'}"
+                f" ({len(exclude)} composant(s) exclu(s))")
+    return nlp
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Correspondance des positions entre un texte dérivé (lignes retirées, fenêtres,
+morceaux...) et le texte original dont il est issu.
+"""
+
+from bisect import bisect_right
+from typing import List, Optional, Sequence, Tuple
+
+
+class OffsetMap:
+    """Table de segments (début dérivé, début original) pour ramener une position au texte original."""
+
+    def __init__(self):
+        self._derived: List[int] = []
+        self._original: List[int] = []
+        self.length = 0
+
+    def add(self, original_start: int, length: int):
+        """Ajoute à la suite du texte dérivé un segment copié depuis original_start."""
+        if length <= 0:
+            return
+        derived_start = self.length
+        # Segment contigu au précédent dans les deux textes : on prolonge
+        if self._derived and self._original[-1] + (derived_start - self._derived[-1]) == original_start:
+            self.length += length
+            return
+        self._derived.append(derived_start)
+        self._original.append(original_start)
+        self.length += length
+
+    def extend(self, other: "OffsetMap"):
+        """Ajoute les segments d'une autre table à la suite de celle-ci."""
+        bounds = other._derived[1:] + [other.length]
+        for derived_start, original_start, end in zip(other._derived, other._original, bounds):
+            self.add(original_start, end - derived_start)
+
+    def to_original(self, offset: int) -> int:
+        """Position dans le texte original du caractère à la position offset du texte dérivé."""
+        if not self._derived:
+            return offset
+        i = max(bisect_right(self._derived, offset) - 1, 0)
+        return self._original[i] + offset - self._derived[i]
+
+    def span(self, start: int, end: int) -> Tuple[int, int]:
+        """Ramène un intervalle [start, end) du texte dérivé au texte original."""
+        if end <= start:
+            position = self.to_original(start)
+            return position, position
+        return self.to_original(start), self.to_original(end - 1) + 1
+
+    @classmethod
+    def shifted(cls, original_start: int, length: int) -> "OffsetMap":
+        """Table d'un extrait contigu du texte original commençant à original_start."""
+        offset_map = cls()
+        offset_map.add(original_start, length)
+        return offset_map
+
+
+def map_span(span: Tuple[int, int], offset_maps: Sequence[Optional[OffsetMap]]) -> Tuple[int, int]:
+    """Ramène un intervalle au texte original à travers des transformations successives (None = identité)."""
+    start, end = span
+    for offset_map in reversed(offset_maps):
+        if offset_map is not None:
+            start, end = offset_map.span(start, end)
+    return start, end
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Moteurs d'extraction de texte PDF interchangeables.
+
+- pdfplumber : mise en page complète (moteur historique)
+- pdfminer : texte brut avec une analyse de mise en page minimale
+- pdfium : extraction native via pypdfium2, la plus rapide
+
+Usage de la calibration :
+    python -m core.pdf_backends test_files/
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+import pdfplumber
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LAParams
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fichier où la calibration enregistre le moteur choisi
+CALIBRATION_FILE = "models/pdf_backend.json"
+
+# Moteur utilisé sans calibration
+FALLBACK_BACKEND = "pdfplumber"
+
+Crop = Tuple[float, float, float, float]
+
+# Un PDF peut être fourni par son chemin, ses octets ou un flux binaire
+PDFSource = Union[str, os.PathLike, bytes, BinaryIO]
+
+
+def is_path(source: PDFSource) -> bool:
+    """Indique si la source est un chemin de fichier."""
+    return isinstance(source, (str, os.PathLike))
+
+
+def is_pdf_path(item: str) -> bool:
+    """Indique si une chaîne désigne un PDF (extension .pdf ou fichier existant) plutôt qu'un texte."""
+    return item.lower().endswith(".pdf") or os.path.isfile(item)
+
+
+def as_stream(source: PDFSource) -> BinaryIO:
+    """Retourne un flux binaire positionné au début pour des octets ou un flux."""
+    if isinstance(source, bytes):
+        return io.BytesIO(source)
+    source.seek(0)
+    return source
+
+
+def _normalize_lines(text: str) -> str:
+    """Retire les lignes vides et les sauts de page pour obtenir un texte ligne à ligne."""
+    lines = (line.rstrip() for line in text.replace("\r\n", "\n").replace("\x0c", "\n").split("\n"))
+    return "\n".join(line for line in lines if line.strip())
+
+
+def _drop_object_cache(document: PDFDocument):
+    """Vide le cache d'objets pdfminer (flux de contenu décodés) entre deux pages."""
+    cached = getattr(document, "_cached_objs", None)
+    if cached is not None:
+        cached.clear()
+
+
+# Opérateur de début de bloc texte dans un flux de contenu PDF
+_TEXT_OBJECT_RE = re.compile(rb"(?:^|\s)BT(?:\s|$)")
+
+
+def _content_has_text_operators(page: PDFPage) -> bool:
+    """Cherche un bloc texte (BT ... ET) dans les flux de contenu bruts de la page."""
+    for content in page.contents or []:
+        stream = resolve1(content)
+        try:
+            if _TEXT_OBJECT_RE.search(stream.get_data()):
+                return True
+        except Exception:
+            # Flux illisible : on laisse la vérification complète trancher
+            return False
+    return False
+
+
+class BackendDocument:
+    """
+    Document ouvert par un moteur : nombre de pages et texte page par page.
+
+    Les objets d'une page sont libérés dès que son texte est extrait, pour que
+    la mémoire ne croisse pas avec le nombre de pages.
+    """
+
+    page_count = 0
+
+    def page_text(self, index: int, crop: Optional[Crop] = None) -> str:
+        raise NotImplementedError
+
+    def page_has_text(self, index: int) -> bool:
+        """Indique, sans mise en page, si la page contient au moins un caractère."""
+        raise NotImplementedError
+
+    def has_text_layer(self, page_indices: List[int]) -> bool:
+        """Vrai dès qu'une des pages contient du texte (s'arrête à la première trouvée)."""
+        return any(self.page_has_text(i) for i in page_indices)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PDFBackend:
+    """Interface d'un moteur d'extraction de texte."""
+
+    name = ""
+    supports_crop = False
+
+    def open(self, source: PDFSource) -> BackendDocument:
+        raise NotImplementedError
+
+
+class _PdfplumberDocument(BackendDocument):
+
+    def __init__(self, source: PDFSource):
+        self.pdf = pdfplumber.open(source if is_path(source) else as_stream(source))
+        self.page_count = len(self.pdf.pages)
+
+    def page_text(self, index: int, crop: Optional[Crop] = None) -> str:
+        page = self.pdf.pages[index]
+        region = page
+        if crop is not None:
+            # Les caractères hors zone sont filtrés avant la mise en page
+            x0, top, x1, bottom = page.bbox
+            width, height = x1 - x0, bottom - top
+            region = page.crop((
+                x0 + crop[0] * width,
+                top + crop[1] * height,
+                x0 + crop[2] * width,
+                top + crop[3] * height
+            ))
+        try:
+            return region.extract_text() or ""
+        finally:
+            region.close()
+            page.close()
+            _drop_object_cache(self.pdf.doc)
+
+    def page_has_text(self, index: int) -> bool:
+        page = self.pdf.pages[index]
+        try:
+            # Les opérateurs texte dans le flux de la page suffisent ; sinon on vérifie les
+            # caractères (texte dans des XObjects), ce qui reste bien moins cher que la mise en page
+            return _content_has_text_operators(page.page_obj) or len(page.chars) > 0
+        finally:
+            page.close()
+            _drop_object_cache(self.pdf.doc)
+
+    def close(self):
+        self.pdf.close()
+
+
+class PdfplumberBackend(PDFBackend):
+    """Moteur historique : mise en page complète de pdfplumber."""
+
+    name = "pdfplumber"
+    supports_crop = True
+
+    def open(self, source: PDFSource) -> BackendDocument:
+        return _PdfplumberDocument(source)
+
+
+class _PdfminerDocument(BackendDocument):
+
+    # Pas d'ordonnancement des blocs (boxes_flow=None) ni de texte vertical
+    LAPARAMS = LAParams(boxes_flow=None, detect_vertical=False, all_texts=False)
+
+    def __init__(self, source: PDFSource):
+        # Le fichier n'est fermé ici que s'il a été ouvert par ce document
+        self.owns_file = is_path(source)
+        self.file = open(source, "rb") if self.owns_file else as_stream(source)
+        try:
+            self.document = PDFDocument(PDFParser(self.file))
+            self.pages = list(PDFPage.create_pages(self.document))
+        except Exception:
+            # PDF illisible : close() ne sera pas appelé
+            self.close()
+            raise
+        self.page_count = len(self.pages)
+        self.resources = PDFResourceManager(caching=True)
+
+    def page_text(self, index: int, crop: Optional[Crop] = None) -> str:
+        buffer = io.StringIO()
+        device = TextConverter(self.resources, buffer, laparams=self.LAPARAMS)
+        try:
+            PDFPageInterpreter(self.resources, device).process_page(self.pages[index])
+        finally:
+            device.close()
+            _drop_object_cache(self.document)
+        return _normalize_lines(buffer.getvalue())
+
+    def page_has_text(self, index: int) -> bool:
+        if _content_has_text_operators(self.pages[index]):
+            return True
+        # Sans laparams, le convertisseur écrit les caractères sans mise en page
+        buffer = io.StringIO()
+        device = TextConverter(self.resources, buffer, laparams=None)
+        try:
+            PDFPageInterpreter(self.resources, device).process_page(self.pages[index])
+        finally:
+            device.close()
+            _drop_object_cache(self.document)
+        return bool(buffer.getvalue().strip())
+
+    def close(self):
+        if self.owns_file:
+            self.file.close()
+
+
+class PdfminerBackend(PDFBackend):
+    """Texte brut via pdfminer avec des paramètres de mise en page minimaux."""
+
+    name = "pdfminer"
+    supports_crop = False
+
+    def open(self, source: PDFSource) -> BackendDocument:
+        return _PdfminerDocument(source)
+
+
+class _PdfiumDocument(BackendDocument):
+
+    def __init__(self, source: PDFSource):
+        self.pdf = pdfium.PdfDocument(source if is_path(source) else as_stream(source))
+        self.page_count = len(self.pdf)
+
+    def page_text(self, index: int, crop: Optional[Crop] = None) -> str:
+        page = self.pdf[index]
+        textpage = page.get_textpage()
+        try:
+            if crop is None:
+                text = textpage.get_text_range()
+            else:
+                # Coordonnées PDF : origine en bas à gauche
+                left, bottom, right, top = page.get_bbox()
+                width, height = right - left, top - bottom
+                text = textpage.get_text_bounded(
+                    left=left + crop[0] * width,
+                    bottom=top - crop[3] * height,
+                    right=left + crop[2] * width,
+                    top=top - crop[1] * height
+                )
+        finally:
+            textpage.close()
+            page.close()
+        return _normalize_lines(text)
+
+    def page_has_text(self, index: int) -> bool:
+        page = self.pdf[index]
+        textpage = page.get_textpage()
+        try:
+            return textpage.count_chars() > 0
+        finally:
+            textpage.close()
+            page.close()
+
+    def close(self):
+        self.pdf.close()
+
+
+class PdfiumBackend(PDFBackend):
+    """Extraction native via pypdfium2."""
+
+    name = "pdfium"
+    supports_crop = True
+
+    def open(self, source: PDFSource) -> BackendDocument:
+        return _PdfiumDocument(source)
+
+
+BACKENDS = {
+    PdfplumberBackend.name: PdfplumberBackend,
+    PdfminerBackend.name: PdfminerBackend
+}
+if pdfium is not None:
+    BACKENDS[PdfiumBackend.name] = PdfiumBackend
+
+
+def load_calibrated_backend() -> str:
+    """Nom du moteur retenu par la dernière calibration, ou le moteur par défaut."""
+    if os.path.exists(CALIBRATION_FILE):
+        try:
+            with open(CALIBRATION_FILE, 'r', encoding='utf-8') as f:
+                name = json.load(f).get("default_backend")
+            if name in BACKENDS:
+                return name
+            logger.warning(f"⚠️ Moteur calibré indisponible: {name}")
+        except Exception as e:
+            logger.warning(f"⚠️ Lecture de la calibration impossible: {e}")
+    return FALLBACK_BACKEND
+
+
+def get_backend(name: str = "auto") -> PDFBackend:
+    """Instancie un moteur par son nom ("auto" = moteur calibré)."""
+    if name == "auto":
+        name = load_calibrated_backend()
+    if name not in BACKENDS:
+        raise ValueError(f"Moteur PDF inconnu: {name} (disponibles: {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
+
+
+def _read_all(backend: PDFBackend, source: PDFSource) -> str:
+    with backend.open(source) as document:
+        return "\n".join(document.page_text(i) for i in range(document.page_count))
+
+
+def _line_recall(reference: str, candidate: str) -> float:
+    """Part des lignes de référence retrouvées à l'identique (espaces normalisés)."""
+    def lines(text):
+        return {re.sub(r"\s+", " ", line).strip() for line in text.split("\n") if line.strip()}
+    reference_lines = lines(reference)
+    if not reference_lines:
+        return 1.0
+    return len(reference_lines & lines(candidate)) / len(reference_lines)
+
+
+def calibrate(sample_dir: str, repeats: int = 3, min_line_recall: float = 0.95) -> Dict:
+    """
+    Mesure chaque moteur sur les PDF d'un dossier et choisit le plus rapide
+    dont le texte reste fidèle (lignes) à celui de pdfplumber.
+    """
+    files = sorted(str(p) for p in Path(sample_dir).glob("*.pdf"))
+    if not files:
+        raise ValueError(f"Aucun PDF trouvé dans {sample_dir}")
+
+    reference_backend = PdfplumberBackend()
+    references = {f: _read_all(reference_backend, f) for f in files}
+
+    results = {}
+    for name, backend_cls in BACKENDS.items():
+        backend = backend_cls()
+        best_time = None
+        recalls = []
+        for f in files:
+            text = _read_all(backend, f)
+            recalls.append(_line_recall(references[f], text))
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for f in files:
+                _read_all(backend, f)
+            elapsed = time.perf_counter() - start
+            best_time = elapsed if best_time is None else min(best_time, elapsed)
+        results[name] = {
+            "seconds": round(best_time, 4),
+            "line_recall": round(min(recalls), 4)
+        }
+        logger.info(f"⏱️ {name}: {best_time:.3f}s, fidélité min {min(recalls):.1%}")
+
+    eligible = [n for n, r in results.items() if r["line_recall"] >= min_line_recall]
+    chosen = min(eligible, key=lambda n: results[n]["seconds"]) if eligible else FALLBACK_BACKEND
+
+    return {
+        "default_backend": chosen,
+        "calibrated_at": datetime.now().isoformat(),
+        "sample_dir": str(sample_dir),
+        "files": len(files),
+        "min_line_recall": min_line_recall,
+        "results": results
+    }
+
+
+def main():
+    """Calibre les moteurs sur un dossier d'exemples et enregistre le choix."""
+    parser = argparse.ArgumentParser(description="Calibration des moteurs d'extraction PDF")
+    parser.add_argument("sample_dir", help="Dossier contenant des PDF représentatifs")
+    parser.add_argument("--repeats", type=int, default=3, help="Nombre de mesures par moteur")
+    parser.add_argument("--min-line-recall", type=float, default=0.95,
+                        help="Fidélité minimale des lignes par rapport à pdfplumber")
+    parser.add_argument("--output", default=CALIBRATION_FILE, help="Fichier de calibration")
+    args = parser.parse_args()
+
+    try:
+        report = calibrate(args.sample_dir, args.repeats, args.min_line_recall)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"✅ Moteur retenu: {report['default_backend']} (enregistré dans {args.output})")
+
+
+if __name__ == "__main__":
+    main()
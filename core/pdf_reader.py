@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Lecture du texte des PDF, partagée par les extracteurs.
+Supporte un mode parallèle qui répartit les plages de pages sur plusieurs processus,
+des profils de lecture qui limitent les pages et la zone analysées, et plusieurs
+moteurs d'extraction (voir core/pdf_backends.py).
+"""
+
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from core.memory import current_rss_mb
+from core.pdf_backends import BackendDocument, PDFBackend, PDFSource, PdfplumberBackend, as_stream, get_backend, is_path
+from core.text_cache import TextCache, source_sha256
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# En dessous de ce nombre de pages, le coût de distribution dépasse le gain
+DEFAULT_MIN_PAGES_PARALLEL = 16
+
+# Profils de lecture :
+# - first_pages / last_pages : nombre de pages lues au début et à la fin (None = toutes)
+# - crop : zone conservée sur chaque page (x0, haut, x1, bas) en fractions de la page
+READING_PROFILES = {
+    "complet": {
+        "first_pages": None,
+        "last_pages": None,
+        "crop": None
+    },
+    "entete": {
+        "first_pages": 1,
+        "last_pages": 0,
+        "crop": (0.0, 0.0, 1.0, 0.4)
+    },
+    "general": {
+        "first_pages": 2,
+        "last_pages": 1,
+        "crop": None
+    },
+    "medical": {
+        "first_pages": 2,
+        "last_pages": 1,
+        "crop": None
+    },
+    "legal": {
+        "first_pages": 3,
+        "last_pages": 1,
+        "crop": None
+    }
+}
+
+
+def resolve_profile(profile: Union[None, str, Dict]) -> Dict:
+    """Retourne la définition complète d'un profil à partir de son nom ou d'un dictionnaire."""
+    if profile is None:
+        return READING_PROFILES["complet"]
+    if isinstance(profile, str):
+        if profile not in READING_PROFILES:
+            raise ValueError(f"Profil de lecture inconnu: {profile}")
+        return READING_PROFILES[profile]
+    return {**READING_PROFILES["complet"], **profile}
+
+
+def select_pages(num_pages: int, profile: Dict) -> List[int]:
+    """Indices des pages à lire selon le profil, dans l'ordre du document."""
+    first = profile.get("first_pages")
+    if first is None:
+        return list(range(num_pages))
+    last = profile.get("last_pages") or 0
+    indices = set(range(min(first, num_pages)))
+    indices.update(range(max(0, num_pages - last), num_pages))
+    return sorted(indices)
+
+
+MEMORY_POLICIES = ("degrade", "abort")
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """Levée quand la lecture d'un document dépasse le plafond mémoire (politique "abort")."""
+
+
+def _iter_page_texts(document: BackendDocument, page_indices: List[int],
+                     crop: Optional[Tuple[float, float, float, float]],
+                     max_memory_mb: Optional[float], memory_policy: str,
+                     stats: Dict) -> Iterator[str]:
+    """
+    Produit le texte des pages en surveillant la mémoire résidente.
+
+    Met à jour stats (peak_memory_mb, truncated). Au-delà de max_memory_mb de croissance
+    depuis stats["baseline_mb"], lève MemoryBudgetExceeded ou s'arrête selon la politique.
+    """
+    baseline = stats.setdefault("baseline_mb", current_rss_mb())
+    stats.setdefault("peak_memory_mb", baseline)
+    stats.setdefault("truncated", False)
+    for i in page_indices:
+        yield document.page_text(i, crop)
+        rss = current_rss_mb()
+        stats["peak_memory_mb"] = max(stats["peak_memory_mb"], rss)
+        if max_memory_mb is not None and rss - baseline > max_memory_mb:
+            message = f"plafond mémoire dépassé (+{rss - baseline:.0f} Mo > {max_memory_mb} Mo) après la page {i + 1}"
+            if memory_policy == "abort":
+                raise MemoryBudgetExceeded(message)
+            logger.warning(f"⚠️ Lecture interrompue: {message}")
+            stats["truncated"] = True
+            return
+
+
+def _extract_pages(backend_name: str, source: Union[str, bytes], page_indices: List[int],
+                   crop: Optional[Tuple[float, float, float, float]] = None,
+                   max_memory_mb: Optional[float] = None,
+                   memory_policy: str = "degrade") -> Tuple[List[str], Dict]:
+    """Extrait le texte des pages indiquées dans un processus worker."""
+    stats = {}
+    with get_backend(backend_name).open(source) as document:
+        pages = list(_iter_page_texts(document, page_indices, crop, max_memory_mb, memory_policy, stats))
+    return pages, stats
+
+
+def split_page_ranges(num_pages: int, num_chunks: int) -> List[Tuple[int, int]]:
+    """Découpe [0, num_pages) en plages contiguës de tailles équilibrées."""
+    num_chunks = max(1, min(num_chunks, num_pages))
+    base, extra = divmod(num_pages, num_chunks)
+    ranges = []
+    start = 0
+    for i in range(num_chunks):
+        end = start + base + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+class PDFReader:
+    """Lecteur de texte PDF avec mode parallèle, profils de lecture et moteur configurable."""
+
+    def __init__(self, workers: Optional[int] = None,
+                 min_pages_parallel: int = DEFAULT_MIN_PAGES_PARALLEL,
+                 backend: str = "auto",
+                 cache: Optional[TextCache] = None,
+                 max_memory_mb: Optional[float] = None,
+                 memory_policy: str = "degrade"):
+        """
+        Initialise le lecteur.
+
+        Args:
+            workers: Nombre de processus pour la lecture parallèle.
+                None, 0 ou 1 désactivent le mode parallèle, -1 utilise tous les cœurs.
+            min_pages_parallel: Nombre minimal de pages lues pour passer en parallèle.
+            backend: Moteur d'extraction ("pdfplumber", "pdfminer", "pdfium"
+                ou "auto" pour le moteur retenu par la calibration).
+            cache: Cache disque du texte extrait (None = pas de cache).
+            max_memory_mb: Croissance maximale de la mémoire résidente par document, en Mo
+                (None = pas de plafond).
+            memory_policy: Au-delà du plafond, "degrade" arrête la lecture et garde les pages lues,
+                "abort" lève MemoryBudgetExceeded.
+        """
+        if memory_policy not in MEMORY_POLICIES:
+            raise ValueError(f"Politique mémoire inconnue: {memory_policy}")
+        self.backend = get_backend(backend)
+        self.cache = cache
+        self.max_memory_mb = max_memory_mb
+        self.memory_policy = memory_policy
+        if workers is not None and workers < 0:
+            workers = os.cpu_count() or 1
+        self.workers = workers or 1
+        self.min_pages_parallel = min_pages_parallel
+        self._executor = None
+
+    def _backend_for(self, crop) -> PDFBackend:
+        """Moteur à utiliser : repli sur pdfplumber si le recadrage n'est pas supporté."""
+        if crop is not None and not self.backend.supports_crop:
+            logger.debug(f"Recadrage non supporté par {self.backend.name}, utilisation de pdfplumber")
+            return PdfplumberBackend()
+        return self.backend
+
+    def _cache_key(self, source: PDFSource, backend: PDFBackend, profile: Dict) -> Optional[str]:
+        """Clé de cache du document pour ce moteur et ce profil (None sans cache)."""
+        if self.cache is None:
+            return None
+        settings = {
+            "backend": backend.name,
+            "profile": {key: profile.get(key) for key in ("first_pages", "last_pages", "crop")}
+        }
+        return self.cache.make_key(source_sha256(source), settings)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Crée le pool de processus à la première utilisation puis le réutilise."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def read_pages(self, source: PDFSource, profile: Union[None, str, Dict] = None) -> Tuple[List[str], Dict]:
+        """
+        Lit le texte des pages retenues par le profil, dans l'ordre des pages.
+
+        Args:
+            source: Chemin du PDF, ses octets ou un flux binaire
+            profile: Nom ou définition du profil de lecture (None = document complet)
+
+        Returns:
+            Tuple (textes des pages, informations de lecture)
+        """
+        profile = resolve_profile(profile)
+        crop = profile.get("crop")
+        backend = self._backend_for(crop)
+
+        cache_key = self._cache_key(source, backend, profile)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                pages, info = cached
+                return pages, {**info, "workers": 0, "cache": "hit", "peak_memory_mb": round(current_rss_mb(), 1)}
+
+        stats = {"baseline_mb": current_rss_mb()}
+        with backend.open(source) as document:
+            num_pages = document.page_count
+            indices = select_pages(num_pages, profile)
+            # PDF scanné ou vide : rien à extraire, on évite la mise en page de chaque page
+            text_layer = document.has_text_layer(indices)
+            if not text_layer:
+                logger.info("🖼️ Aucune couche texte détectée, extraction ignorée")
+                indices = []
+            parallel = self.workers > 1 and len(indices) >= self.min_pages_parallel
+            if not parallel:
+                pages = list(_iter_page_texts(document, indices, crop,
+                                              self.max_memory_mb, self.memory_policy, stats))
+
+        if parallel:
+            ranges = split_page_ranges(len(indices), self.workers)
+            logger.info(f"⚡ Lecture parallèle: {len(indices)} pages sur {len(ranges)} processus")
+            # Les flux ne sont pas transmissibles aux processus : on envoie leurs octets
+            if not is_path(source) and not isinstance(source, bytes):
+                source = as_stream(source).read()
+            executor = self._get_executor()
+            futures = [
+                executor.submit(_extract_pages, backend.name, source, indices[start:end], crop,
+                                self.max_memory_mb, self.memory_policy)
+                for start, end in ranges
+            ]
+            pages = []
+            stats["truncated"] = False
+            for future in futures:
+                chunk_pages, chunk_stats = future.result()
+                # Chaque worker mesure sa propre mémoire : on retient le pic le plus haut
+                stats["peak_memory_mb"] = max(stats.get("peak_memory_mb", 0.0), chunk_stats["peak_memory_mb"])
+                if not stats["truncated"]:
+                    # Après une plage tronquée, on ne garde pas les pages suivantes pour rester contigu
+                    pages.extend(chunk_pages)
+                    stats["truncated"] = chunk_stats["truncated"]
+
+        info = {
+            "pages": num_pages,
+            "pages_read": len(pages),
+            "workers": min(self.workers, len(indices)) if parallel else 1,
+            "backend": backend.name,
+            "text_layer": text_layer,
+            "peak_memory_mb": round(stats.get("peak_memory_mb", stats["baseline_mb"]), 1),
+            "truncated": stats.get("truncated", False)
+        }
+        if cache_key is not None and not info["truncated"]:
+            self.cache.put(cache_key, pages, info)
+        info["cache"] = "miss" if cache_key is not None else "off"
+        return pages, info
+
+    def iter_pages(self, source: PDFSource, profile: Union[None, str, Dict] = None,
+                   stats: Optional[Dict] = None) -> Iterator[str]:
+        """
+        Produit le texte des pages retenues par le profil, une par une.
+
+        Les pages suivantes ne sont pas analysées si le consommateur s'arrête avant la fin.
+        Si stats est fourni, il reçoit le pic mémoire (peak_memory_mb), l'indicateur truncated,
+        text_layer (False si aucune page retenue ne contient de texte) et, comme les informations
+        de read, pages, backend, workers et cache (le texte lu page par page n'est pas mis en cache).
+        """
+        stats = {} if stats is None else stats
+        profile = resolve_profile(profile)
+        crop = profile.get("crop")
+        backend = self._backend_for(crop)
+
+        cache_key = self._cache_key(source, backend, profile)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                pages, info = cached
+                stats.update(peak_memory_mb=current_rss_mb(), truncated=False,
+                             text_layer=info.get("text_layer", True), pages=info["pages"],
+                             backend=info["backend"], workers=0, cache="hit")
+                yield from pages
+                return
+
+        stats["baseline_mb"] = current_rss_mb()
+        stats.update(peak_memory_mb=stats["baseline_mb"], truncated=False, backend=backend.name, workers=1,
+                     cache="miss" if cache_key is not None else "off")
+        with backend.open(source) as document:
+            stats["pages"] = document.page_count
+            indices = select_pages(document.page_count, profile)
+            stats["text_layer"] = document.has_text_layer(indices)
+            if not stats["text_layer"]:
+                logger.info("🖼️ Aucune couche texte détectée, extraction ignorée")
+                return
+            yield from _iter_page_texts(document, indices, crop,
+                                        self.max_memory_mb, self.memory_policy, stats)
+
+    def read(self, source: PDFSource, profile: Union[None, str, Dict] = None) -> Tuple[str, Dict]:
+        """Lit le texte du PDF, pages jointes par des sauts de ligne."""
+        pages, info = self.read_pages(source, profile)
+        return "\n".join(pages), info
+
+    def close(self):
+        """Arrête le pool de processus s'il a été créé."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
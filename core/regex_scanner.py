@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Scanner regex en une passe pour l'extraction de fallback.
+
+Au lieu d'un re.search par pattern sur tout le texte (IGNORECASE empêche le
+moteur re de sauter rapidement les positions sans correspondance), le texte est
+réduit une fois à sa casse de base (voir fold_case : str.casefold rapproche aussi
+« ſ » de « s », comme IGNORECASE) puis parcouru une seule fois par une alternance
+des préfixes littéraux des patterns (« référence », « date »...), sensible à la
+casse. À chaque préfixe trouvé, les patterns concernés sont testés par .match à
+cette position sur le texte original : chacun obtient la même première occurrence
+qu'avec re.search, puis sort de l'alternance. Si la casse de base change la
+longueur du texte (« İ », « ß »...), les positions ne correspondent plus : chaque
+pattern est alors cherché à part.
+
+Un champ prend la valeur de son premier pattern (dans l'ordre de la liste) qui
+trouve une valeur valide, même si un pattern suivant apparaît plus tôt dans le
+texte. Les patterns sans préfixe littéral (date seule, ^...) sont cherchés à
+part, seulement si leur champ n'est pas déjà décidé.
+
+Les quantificateurs paresseux jusqu'à la fin de ligne (« (.+?) » suivi d'un
+saut de ligne ou de $) font reculer le moteur re à chaque occurrence d'un
+préfixe : sur une très longue ligne (PDF extrait d'un bloc), le coût devient
+quadratique. Avec google-re2 installé, les patterns qu'il accepte sont cherchés
+par RE2 dans les textes d'au moins RE2_MIN_CHARS caractères, en temps linéaire
+(classes de mots, d'espaces et de chiffres traduites en classes Unicode pour
+garder les résultats de re) ; les textes courts gardent le passage unique, plus
+rapide à cette taille.
+Pour les patterns laissés au moteur re (sans RE2, ou refusés par RE2), les lignes
+de plus de LONG_LINE_CHARS caractères sont coupées, seulement à un blanc remplacé
+par un saut de ligne : chaque recherche du moteur re est bornée par la longueur
+d'une ligne, et le budget de temps, vérifié entre deux recherches, interrompt
+l'analyse à temps. Le texte coupé garde la longueur de l'original : les patterns
+RE2 cherchent dans le texte original, aux mêmes positions.
+L'analyse dans un sous-processus arrêté à l'échéance est possible sur demande
+(isolate=True) ; il est démarré par forkserver ou spawn, jamais par fork d'un
+processus qui a des threads et des modèles chargés.
+"""
+
+import logging
+import multiprocessing
+import re
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_constants, sre_parse
+
+try:
+    import re2  # google-re2 (optionnel) : moteur en temps linéaire
+except ImportError:
+    re2 = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Flags appliqués à tous les patterns
+DEFAULT_REGEX_FLAGS = re.IGNORECASE | re.MULTILINE
+
+# Longueur minimale d'une valeur (les captures plus courtes sont ignorées)
+MIN_VALUE_LENGTH = 2
+
+# Moteurs : "re" (bibliothèque standard), "re2" (google-re2, repli sur re s'il n'est pas installé
+# ou refuse un pattern), "auto" (re2 s'il est installé)
+REGEX_ENGINES = ("re", "re2", "auto")
+DEFAULT_REGEX_ENGINE = "auto"
+
+# Budget de temps des regex par document, en secondes
+DEFAULT_REGEX_BUDGET_S = 2.0
+
+# Longueur de ligne maximale pour le moteur re : au-delà, une seule recherche peut dépasser le budget
+LONG_LINE_CHARS = 5000
+
+# Longueur de texte à partir de laquelle RE2 est plus rapide que le passage unique du moteur re
+RE2_MIN_CHARS = 1000
+
+# Classes Unicode de re pour RE2, dont \w, \s et \d ne couvrent que l'ASCII
+_RE2_CLASSES = {"w": r"\pL\pN_", "d": r"\p{Nd}", "s": r"\t-\r\x{1c}-\x{1f}\x{85}\p{Z}"}
+_RE2_FLAGS = {re.IGNORECASE: "i", re.MULTILINE: "m", re.DOTALL: "s"}
+
+# Seule paire que IGNORECASE rapproche et que str.casefold laisse distincte (à longueur égale) : « ı » et « i »
+_FOLD_EXTRA = str.maketrans({"ı": "i"})
+
+# Blanc où une ligne trop longue peut être coupée
+_BLANK = re.compile(r"[^\S\n]")
+
+
+class RegexTimeout(TimeoutError):
+    """Analyse regex interrompue : budget de temps dépassé."""
+
+
+def fold_case(text: str) -> str:
+    """Casse de base de text : deux caractères que IGNORECASE rapproche ont la même (ou une autre longueur)."""
+    return text.casefold().translate(_FOLD_EXTRA)
+
+
+def _literal_prefixes(items) -> Tuple[List[str], bool]:
+    """Débuts littéraux possibles d'une séquence analysée par sre_parse, et si la séquence est entièrement littérale."""
+    prefixes = [""]
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            prefixes = [prefix + chr(av) for prefix in prefixes]
+            continue
+        if op is sre_constants.SUBPATTERN and not av[1] and not av[2]:
+            suffixes, complete = _literal_prefixes(av[3])
+        elif op is sre_constants.BRANCH:
+            branches = [_literal_prefixes(branch) for branch in av[1]]
+            suffixes = [suffix for branch_suffixes, _ in branches for suffix in branch_suffixes]
+            complete = all(branch_complete for _, branch_complete in branches)
+        else:
+            return prefixes, False
+        prefixes = [prefix + suffix for prefix in prefixes for suffix in suffixes]
+        if not complete:
+            return prefixes, False
+    return prefixes, True
+
+
+def pattern_prefixes(pattern: str, flags: int = DEFAULT_REGEX_FLAGS) -> Optional[Tuple[str, ...]]:
+    """Préfixes littéraux (casefold) par lesquels commence toute correspondance, None s'il n'y en a pas."""
+    try:
+        prefixes, _ = _literal_prefixes(sre_parse.parse(pattern, flags))
+    except Exception:
+        return None
+    if not prefixes or "" in prefixes:
+        return None
+    return tuple(sorted({fold_case(prefix) for prefix in prefixes}))
+
+
+def re2_pattern(pattern: str, flags: int = DEFAULT_REGEX_FLAGS) -> Optional[str]:
+    """Pattern équivalent pour RE2 (flags en ligne, classes Unicode), None s'il n'a pas d'équivalent sûr."""
+    inline = ""
+    for flag, letter in _RE2_FLAGS.items():
+        if flags & flag:
+            inline += letter
+            flags &= ~flag
+    if flags & ~re.UNICODE:
+        return None
+    out = [f"(?{inline})" if inline else ""]
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            escape = pattern[i + 1]
+            i += 2
+            if escape in _RE2_CLASSES:
+                out.append(_RE2_CLASSES[escape] if in_class else f"[{_RE2_CLASSES[escape]}]")
+            elif escape in "WSDbBAZ" or escape.isdigit():
+                # Classes négées, frontières de mot ASCII, ancres et références arrière : laissés à re
+                return None
+            else:
+                out.append(char + escape)
+            continue
+        if char == "[" and not in_class:
+            in_class = True
+            # « ] » juste après « [ » ou « [^ » est littéral
+            start = i + 2 if pattern.startswith("[^", i) else i + 1
+            if pattern.startswith("]", start):
+                out.append(pattern[i:start + 1])
+                i = start + 1
+                continue
+        elif char == "]" and in_class:
+            in_class = False
+        out.append(char)
+        i += 1
+    return "".join(out)
+
+
+def longest_line(text: str) -> int:
+    """Longueur de la plus longue ligne du texte."""
+    longest, start = 0, 0
+    while True:
+        end = text.find("\n", start)
+        if end == -1:
+            return max(longest, len(text) - start)
+        longest = max(longest, end - start)
+        start = end + 1
+
+
+def _break_position(line: str, start: int, max_chars: int) -> Optional[int]:
+    """Blanc où couper line après start : le dernier avant start + max_chars, sinon le premier après."""
+    for index in range(min(start + max_chars, len(line) - 1), start, -1):
+        if line[index].isspace():
+            return index
+    match = _BLANK.search(line, start + max_chars)
+    return match.start() if match else None
+
+
+def cap_lines(text: str, max_chars: int = LONG_LINE_CHARS) -> str:
+    """
+    Texte dont les lignes de plus de max_chars caractères sont coupées à un blanc, remplacé par un saut
+    de ligne (même longueur que text). Un mot plus long que max_chars n'est jamais coupé.
+    """
+    if longest_line(text) <= max_chars:
+        return text
+    lines = []
+    for line in text.split("\n"):
+        start = 0
+        while len(line) - start > max_chars:
+            cut = _break_position(line, start, max_chars)
+            if cut is None:
+                break
+            lines.append(line[start:cut])
+            start = cut + 1
+        lines.append(line[start:])
+    return "\n".join(lines)
+
+
+def _scan_in_child(connection, spec, text: str, fields):
+    """Sous-processus : scanner reconstruit depuis ses paramètres, résultats renvoyés au parent."""
+    scanner = RegexScanner(*spec)
+    connection.send(scanner.scan(text, fields, re_text=scanner.bounded_text(text)))
+    connection.close()
+
+
+class RegexScanner:
+    """Patterns regex par champ, compilés une fois et appliqués en une seule passe sur le texte."""
+
+    def __init__(self, patterns: Dict[str, Sequence[str]], flags: int = DEFAULT_REGEX_FLAGS,
+                 min_length: int = MIN_VALUE_LENGTH, engine: str = DEFAULT_REGEX_ENGINE):
+        """
+        Args:
+            patterns: Patterns de chaque champ, par ordre de priorité. La valeur est le groupe 1,
+                ou toute la correspondance pour un pattern sans groupe
+            flags: Flags re communs
+            min_length: Longueur minimale d'une valeur valide
+            engine: Moteur regex ("re", "re2" ou "auto", voir REGEX_ENGINES)
+        """
+        if engine not in REGEX_ENGINES:
+            raise ValueError(f"Moteur regex inconnu: {engine}")
+        if engine == "re2" and re2 is None:
+            logger.warning("⚠️ google-re2 non installé, moteur re utilisé")
+        self._spec = (patterns, flags, min_length, engine)
+        self.fields = list(patterns)
+        self.min_length = min_length
+        self._patterns: List[Tuple[str, re.Pattern]] = [
+            (field, re.compile(pattern, flags)) for field, field_patterns in patterns.items() for pattern in field_patterns
+        ]
+        # Même pattern compilé par RE2 (None : re seulement)
+        self._linear = [self._compile_re2(pattern.pattern, flags) if engine != "re" else None
+                        for _, pattern in self._patterns]
+        self.engine = "re2" if any(pattern is not None for pattern in self._linear) else "re"
+        self._no_linear = [None] * len(self._patterns)
+        self._prefixes = [pattern_prefixes(pattern.pattern, flags) for _, pattern in self._patterns]
+        self._field_patterns = {
+            field: [index for index, (pattern_field, _) in enumerate(self._patterns) if pattern_field == field]
+            for field in self.fields
+        }
+        # Préfixe trouvé -> patterns qui peuvent commencer à cette position (l'alternance essaie les
+        # préfixes les plus longs d'abord : les autres préfixes présents à la même position en sont des débuts)
+        keywords = {prefix for prefixes in self._prefixes if prefixes for prefix in prefixes}
+        self._keyword_patterns = {
+            keyword: [index for index, prefixes in enumerate(self._prefixes)
+                      if prefixes and any(keyword.startswith(prefix) for prefix in prefixes)]
+            for keyword in keywords
+        }
+        # Alternance des préfixes compilée par ensemble de patterns encore actifs
+        self._keywords = lru_cache(maxsize=256)(self._compile_keywords)
+
+    @staticmethod
+    def _compile_re2(pattern: str, flags: int):
+        """Pattern compilé par RE2, None si google-re2 est absent ou refuse le pattern."""
+        if re2 is None:
+            return None
+        translated = re2_pattern(pattern, flags)
+        if translated is None:
+            return None
+        try:
+            return re2.compile(translated)
+        except Exception:
+            return None
+
+    def _compile_keywords(self, indexes: Tuple[int, ...]) -> re.Pattern:
+        keywords = sorted({prefix for index in indexes for prefix in self._prefixes[index]}, key=len, reverse=True)
+        return re.compile("|".join(map(re.escape, keywords)))
+
+    def _value(self, index: int, match) -> Optional[str]:
+        if match is None:
+            return None
+        value = (match.group(1) if self._patterns[index][1].groups else match.group(0)).strip()
+        return value if len(value) >= self.min_length else None
+
+    def _decided(self, field: str, found: Dict[int, Optional[str]]) -> bool:
+        """Le champ a une valeur d'un pattern dont tous les patterns prioritaires ont échoué."""
+        for index in self._field_patterns[field]:
+            if index not in found:
+                return False
+            if found[index] is not None:
+                return True
+        return True
+
+    def scan(self, text: str, fields: Optional[Iterable[str]] = None,
+             deadline: Optional[float] = None, re_text: Optional[str] = None) -> Dict[str, str]:
+        """
+        Valeur de chaque champ trouvé dans text.
+
+        Args:
+            text: Texte à analyser
+            fields: Champs à chercher (None pour tous)
+            deadline: Échéance (time.perf_counter()) vérifiée entre deux recherches
+            re_text: Texte de même longueur pour les patterns du moteur re (voir bounded_text),
+                None pour text
+
+        Raises:
+            RegexTimeout: Échéance dépassée
+        """
+        wanted = [field for field in self.fields if fields is None or field in fields]
+        if re_text is None or len(re_text) != len(text):
+            re_text = text
+        # Pattern -> valeur de sa première occurrence (None : aucune, ou trop courte)
+        found: Dict[int, Optional[str]] = {}
+        # Texte long : patterns RE2 cherchés à part, en temps linéaire
+        linear = self._linear if len(text) >= RE2_MIN_CHARS else self._no_linear
+        folded = fold_case(text)
+        if len(folded) == len(text):
+            active = sorted(index for field in wanted for index in self._field_patterns[field]
+                            if self._prefixes[index] and linear[index] is None)
+        else:
+            # Casse de base de longueur différente (rare) : positions décalées, chaque pattern est cherché à part
+            active = []
+
+        pos = 0
+        while active:
+            if deadline is not None and time.perf_counter() > deadline:
+                raise RegexTimeout("budget de temps des regex dépassé")
+            match = self._keywords(tuple(active)).search(folded, pos)
+            if match is None:
+                # Plus aucun préfixe : les patterns restants n'ont pas de correspondance
+                found.update((index, None) for index in active)
+                break
+            pos = match.start()
+            for index in self._keyword_patterns[match.group()]:
+                if index in active:
+                    pattern_match = self._patterns[index][1].match(re_text, pos)
+                    if pattern_match is not None:
+                        found[index] = self._value(index, pattern_match)
+            decided = {field for field in wanted if self._decided(field, found)}
+            active = [index for index in active
+                      if index not in found and self._patterns[index][0] not in decided]
+            pos += 1
+
+        results = {}
+        for field in wanted:
+            for index in self._field_patterns[field]:
+                if index not in found:
+                    if deadline is not None and time.perf_counter() > deadline:
+                        raise RegexTimeout("budget de temps des regex dépassé")
+                    if linear[index] is not None:
+                        match = linear[index].search(text)
+                    else:
+                        match = self._patterns[index][1].search(re_text)
+                    found[index] = self._value(index, match)
+                if found[index] is not None:
+                    results[field] = found[index]
+                    break
+        return results
+
+    def bounded_text(self, text: str) -> str:
+        """Texte des patterns du moteur re : lignes trop longues coupées (voir cap_lines)."""
+        if len(text) >= RE2_MIN_CHARS and all(pattern is not None for pattern in self._linear):
+            return text
+        return cap_lines(text)
+
+    def scan_with_budget(self, text: str, fields: Optional[Iterable[str]] = None,
+                         budget_s: Optional[float] = DEFAULT_REGEX_BUDGET_S,
+                         isolate: bool = False) -> Tuple[Dict[str, str], bool]:
+        """
+        Comme scan, abandonné au-delà de budget_s secondes (None = sans limite), les patterns
+        du moteur re cherchant dans le texte aux lignes bornées (voir bounded_text).
+
+        Args:
+            isolate: Analyser dans un sous-processus (forkserver ou spawn) arrêté à l'échéance,
+                au prix de son démarrage
+
+        Returns:
+            Tuple (valeurs trouvées, True si l'analyse a été interrompue : aucune valeur alors)
+        """
+        if budget_s is None:
+            return self.scan(text, fields, re_text=self.bounded_text(text)), False
+        if budget_s <= 0:
+            return {}, True
+        deadline = time.perf_counter() + budget_s
+        try:
+            if isolate:
+                return self._scan_in_process(text, fields, budget_s)
+            return self.scan(text, fields, deadline, self.bounded_text(text)), False
+        except RegexTimeout:
+            logger.warning(f"⏱️ Regex interrompues après {budget_s} s ({len(text)} caractères)")
+            return {}, True
+
+    def _scan_in_process(self, text: str, fields: Optional[Iterable[str]],
+                         budget_s: float) -> Tuple[Dict[str, str], bool]:
+        """Analyse dans un sous-processus, arrêté s'il dépasse le budget (jamais par fork : threads, modèles)."""
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=_scan_in_child,
+                                  args=(sender, self._spec, text, None if fields is None else list(fields)),
+                                  daemon=True)
+        process.start()
+        sender.close()
+        try:
+            if receiver.poll(budget_s):
+                return receiver.recv(), False
+            raise RegexTimeout("budget de temps des regex dépassé")
+        except EOFError:
+            raise RegexTimeout("sous-processus regex arrêté sans résultat")
+        finally:
+            receiver.close()
+            if process.is_alive():
+                process.kill()
+            process.join()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Cache disque du texte extrait des PDF, adressé par contenu.
+
+La clé combine le SHA-256 des octets du PDF et les paramètres de lecture
+(moteur, profil). Les entrées sont compressées, écrites de façon atomique
+(plusieurs processus peuvent partager le même dossier) et évincées par
+ordre d'utilisation (LRU) au-delà d'une taille maximale.
+"""
+
+import os
+import json
+import zlib
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from core.pdf_backends import PDFSource, as_stream, is_path
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# À incrémenter si le format du texte extrait change
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_MAX_MB = 512
+
+_ENTRY_SUFFIX = ".json.z"
+
+
+def source_sha256(source: PDFSource, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 du contenu d'un PDF (chemin, octets ou flux), lu par blocs."""
+    if isinstance(source, bytes):
+        return hashlib.sha256(source).hexdigest()
+
+    digest = hashlib.sha256()
+    stream = open(source, "rb") if is_path(source) else as_stream(source)
+    try:
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            digest.update(chunk)
+    finally:
+        if is_path(source):
+            stream.close()
+        else:
+            stream.seek(0)
+    return digest.hexdigest()
+
+
+class TextCache:
+    """Cache LRU du texte des pages, partagé entre processus via le disque."""
+
+    def __init__(self, cache_dir: str, max_mb: int = DEFAULT_CACHE_MAX_MB):
+        """
+        Initialise le cache.
+
+        Args:
+            cache_dir: Dossier des entrées (créé si besoin)
+            max_mb: Taille maximale du dossier en Mo avant éviction
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_mb * 1024 * 1024
+
+    def make_key(self, content_hash: str, settings: Dict) -> str:
+        """Clé d'une entrée : hash du PDF + paramètres de lecture."""
+        digest = hashlib.sha256(content_hash.encode("ascii"))
+        digest.update(json.dumps({"version": CACHE_VERSION, **settings}, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{_ENTRY_SUFFIX}"
+
+    def get(self, key: str) -> Optional[Tuple[List[str], Dict]]:
+        """Retourne (pages, informations) si l'entrée existe, sinon None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = json.loads(zlib.decompress(f.read()).decode("utf-8"))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ Entrée de cache illisible, ignorée: {e}")
+            return None
+
+        # La date de modification sert d'horodatage d'accès pour l'éviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry["pages"], entry["info"]
+
+    def put(self, key: str, pages: List[str], info: Dict):
+        """Enregistre une entrée de façon atomique puis applique la limite de taille."""
+        data = zlib.compress(json.dumps({"pages": pages, "info": info}, ensure_ascii=False).encode("utf-8"))
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            logger.warning(f"⚠️ Écriture du cache impossible: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
+        self.evict()
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de la taille maximale."""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith(_ENTRY_SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            try:
+                os.unlink(path)
+                total -= size
+            except FileNotFoundError:
+                # Déjà supprimée par un autre processus
+                pass
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        """Vide le cache."""
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(_ENTRY_SUFFIX):
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
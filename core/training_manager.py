@@ -10,7 +10,7 @@ import subprocess
 import sys
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -102,8 +102,18 @@ class TrainingManager:
             logger.error(f"❌ Erreur lors de la conversion: {e}")
             return False
     
-    def train_model(self, model_type: str, epochs: int = 50) -> bool:
-        """Entraîne un nouveau modèle."""
+    def train_model(self, model_type: str, epochs: int = 50, prune_vectors: bool = False,
+                    vectors_top_k: Optional[int] = None) -> bool:
+        """
+        Entraîne un nouveau modèle.
+        
+        Args:
+            model_type: Type de modèle ("general", "medical", "legal")
+            epochs: Nombre d'époques
+            prune_vectors: Étape finale optionnelle : réduire la table de vecteurs aux mots du
+                domaine et retirer les tables de lemmatisation (training/scripts/prune_vectors.py)
+            vectors_top_k: Lignes de vecteurs les plus fréquentes à garder en plus des mots du domaine
+        """
         try:
             logger.info(f"🚀 Entraînement du modèle {model_type}...")
             
@@ -136,6 +146,10 @@ class TrainingManager:
                     self.create_model_metadata(model_type, target_path)
                     
                     logger.info(f"✅ Modèle déplacé vers: {target_path}")
+                    
+                    if prune_vectors:
+                        # Un échec de la réduction laisse le modèle entraîné intact
+                        self.prune_model_vectors(target_path, vectors_top_k)
                     return True
                 else:
                     logger.error("❌ Modèle entraîné non trouvé")
@@ -148,6 +162,41 @@ class TrainingManager:
             logger.error(f"❌ Erreur lors de l'entraînement: {e}")
             return False
     
+    def prune_model_vectors(self, model_path: Path, top_k: Optional[int] = None) -> bool:
+        """Réduit la table de vecteurs d'un modèle et ajoute le rapport à ses métadonnées."""
+        try:
+            logger.info(f"✂️ Réduction des vecteurs de {model_path}...")
+            command = [sys.executable, "-m", "training.scripts.prune_vectors", str(model_path), "--in-place"]
+            if top_k:
+                command += ["--top-k", str(top_k)]
+            result = subprocess.run(command, capture_output=True, text=True, cwd=str(self.training_dir.parent))
+            
+            if result.returncode != 0:
+                logger.error(f"❌ Erreur réduction des vecteurs: {result.stderr}")
+                return False
+            
+            with open(model_path / "pruning_report.json", 'r', encoding='utf-8') as f:
+                report = json.load(f)
+            metadata_path = model_path / "model_info.json"
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            metadata["pruning"] = {
+                "vectors_rows": [report["vectors"]["rows_before"], report["vectors"]["rows_after"]],
+                "lookups_removed": report["lookups_removed"],
+                "size_mb": [report["before"]["size_mb"], report["after"]["size_mb"]],
+                "load_s": [report["before"]["load_s"], report["after"]["load_s"]],
+                "rss_mb": [report["before"]["rss_mb"], report["after"]["rss_mb"]]
+            }
+            with open(metadata_path, 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            
+            logger.info(f"✅ Vecteurs réduits: {report['before']['size_mb']} -> {report['after']['size_mb']} Mo sur disque")
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ Erreur lors de la réduction des vecteurs: {e}")
+            return False
+    
     def create_model_metadata(self, model_type: str, model_path: Path):
         """Crée les métadonnées du modèle."""
         metadata = {
@@ -171,7 +220,8 @@ class TrainingManager:
         except Exception as e:
             logger.warning(f"⚠️ Erreur création métadonnées: {e}")
     
-    def train_new_model(self, model_type: str, num_examples: int = 500, epochs: int = 50) -> bool:
+    def train_new_model(self, model_type: str, num_examples: int = 500, epochs: int = 50,
+                        prune_vectors: bool = False) -> bool:
         """Pipeline complet d'entraînement d'un nouveau modèle."""
         logger.info(f"🚀 Démarrage entraînement complet pour {model_type}")
         
@@ -184,7 +234,7 @@ class TrainingManager:
             return False
         
         # 3. Entraîner le modèle
-        if not self.train_model(model_type, epochs):
+        if not self.train_model(model_type, epochs, prune_vectors=prune_vectors):
             return False
         
         logger.info(f"🎉 Entraînement complet terminé pour {model_type}")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Croissance bornée du vocabulaire des pipelines spaCy.
+
+Chaque mot inconnu analysé (références, noms, dates...) est ajouté au StringStore
+et au vocabulaire du modèle, qui grossissent sans limite dans un processus de
+longue durée (instance globale, extracteur en cache Streamlit). VocabGuard compare
+le nombre de chaînes à celui mesuré au chargement et, au-delà d'une croissance
+maximale, recharge le modèle depuis le disque dans un thread : l'extraction qui a
+constaté le dépassement n'attend pas le chargement. Une fois le nouveau pipeline
+prêt, l'appelant le substitue à l'ancien (on_reload, par exemple
+ModelRegistry.replace) ; les analyses en cours terminent avec l'ancien pipeline.
+
+nlp.memory_zone() ne convient pas ici : les zones ne s'imbriquent pas, alors que
+le même pipeline sert plusieurs requêtes simultanées.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from spacy.language import Language
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Chaînes ajoutées au StringStore depuis le chargement avant rechargement du modèle
+DEFAULT_MAX_VOCAB_GROWTH = 200000
+
+
+def vocab_size(nlp: Language) -> Dict[str, int]:
+    """Taille du vocabulaire : chaînes du StringStore et lexèmes."""
+    return {"strings": len(nlp.vocab.strings), "lexemes": len(nlp.vocab)}
+
+
+class VocabGuard:
+    """Surveille la croissance du vocabulaire d'un pipeline et le recharge au-delà d'un seuil."""
+
+    def __init__(self, loader: Callable[[], Language], nlp: Language,
+                 max_growth: int = DEFAULT_MAX_VOCAB_GROWTH, name: str = ""):
+        """
+        Args:
+            loader: Recharge le pipeline tel qu'au démarrage (ex. load_pipeline(chemin, profil))
+            nlp: Pipeline chargé, dont la taille sert de référence
+            max_growth: Nombre de chaînes ajoutées au-delà duquel le pipeline est rechargé
+            name: Nom du modèle pour les logs
+        """
+        self.loader = loader
+        self.max_growth = max_growth
+        self.name = name
+        self.nlp = nlp
+        self.baseline = len(nlp.vocab.strings)
+        self.reloads = 0
+        self.last_reload_s = None
+        self._lock = threading.Lock()
+        self._reload_thread: Optional[threading.Thread] = None
+
+    def growth(self, nlp: Optional[Language] = None) -> int:
+        """Chaînes ajoutées depuis le chargement."""
+        return len((self.nlp if nlp is None else nlp).vocab.strings) - self.baseline
+
+    def check(self, nlp: Optional[Language] = None,
+              on_reload: Optional[Callable[[Language, Language], None]] = None) -> bool:
+        """
+        Lance le rechargement du pipeline en arrière-plan si son vocabulaire a dépassé la croissance maximale.
+
+        Args:
+            nlp: Pipeline utilisé par l'appelant (None = le dernier chargé)
+            on_reload: Appelé depuis le thread de rechargement avec (ancien, nouveau pipeline),
+                pour substituer le nouveau à l'ancien
+
+        Returns:
+            True si un rechargement a été lancé (False : pas de dépassement, rechargement
+            déjà en cours ou nlp déjà remplacé)
+        """
+        nlp = self.nlp if nlp is None else nlp
+        if self.growth(nlp) <= self.max_growth:
+            return False
+        # Un seul rechargement à la fois ; les requêtes continuent sans attendre
+        if not self._lock.acquire(blocking=False):
+            return False
+        if nlp is not self.nlp:
+            # Déjà remplacé par un rechargement précédent
+            self._lock.release()
+            return False
+        self._reload_thread = threading.Thread(target=self._reload, args=(nlp, on_reload),
+                                               name=f"vocab-reload-{self.name}", daemon=True)
+        self._reload_thread.start()
+        return True
+
+    def _reload(self, nlp: Language, on_reload: Optional[Callable[[Language, Language], None]]):
+        """Thread de rechargement (verrou tenu depuis check)."""
+        try:
+            growth = self.growth(nlp)
+            start = time.perf_counter()
+            new_nlp = self.loader()
+            self.last_reload_s = round(time.perf_counter() - start, 2)
+            if on_reload is not None:
+                on_reload(nlp, new_nlp)
+            self.nlp = new_nlp
+            self.baseline = len(new_nlp.vocab.strings)
+            self.reloads += 1
+            logger.info(f"♻️ Vocabulaire {self.name}: +{growth} chaînes depuis le chargement, "
+                        f"modèle rechargé en {self.last_reload_s} s (arrière-plan)")
+        except Exception as e:
+            logger.error(f"❌ Erreur rechargement du modèle {self.name}: {e}")
+            # Nouvel essai seulement après une nouvelle croissance complète
+            self.baseline = len(nlp.vocab.strings)
+        finally:
+            self._lock.release()
+
+    def wait(self, timeout: Optional[float] = None):
+        """Attend la fin du rechargement en cours (arrêt du processus, tests)."""
+        if self._reload_thread is not None:
+            self._reload_thread.join(timeout)
+
+    def stats(self) -> Dict:
+        """Métriques du vocabulaire, pour le suivi et les alertes."""
+        return {
+            **vocab_size(self.nlp),
+            "baseline_strings": self.baseline,
+            "growth": self.growth(),
+            "max_growth": self.max_growth,
+            "reloads": self.reloads,
+            "last_reload_s": self.last_reload_s
+        }
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Pool de processus d'extraction pré-forkés partageant les modèles en copie sur écriture.
+
+Les modèles sont chargés une seule fois dans le processus parent (le modèle actuel
+et ceux du routeur, ou la liste donnée ; les autres sont chargés par chaque worker
+à leur première utilisation), puis N workers
+sont créés par fork : les poids et vecteurs restent dans les pages du parent tant
+qu'ils ne sont pas modifiés. Comme le recommande la documentation de gc, le
+ramasse-miettes est désactivé puis gelé (gc.freeze()) juste avant le fork : ses
+passages dans les workers n'écrivent pas dans ces pages (et ne les dupliquent
+pas). Il est réactivé dans chaque worker, et dans le parent dès les workers créés.
+Les documents sont distribués par une file locale ; chaque worker traite un
+document à la fois.
+
+Ce fork a lieu à la création du pool, avant le démarrage de tout thread du pool.
+Ensuite, le thread de collecte et les threads d'alimentation des files tournent :
+un fork pourrait bloquer l'enfant sur un verrou tenu par l'un d'eux. Un worker
+arrêté est donc remplacé par un processus démarré par le forkserver
+(core.extraction_system préchargé), qui recrée son extracteur avec factory et
+charge ses modèles à leur première utilisation, sans partage avec le parent.
+"""
+
+import gc
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from core.memory import process_memory_mb
+from core.pdf_backends import PDFSource
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Documents en attente par worker lors d'un map (borne la mémoire des files)
+DEFAULT_PREFETCH = 2
+
+# Intervalle de surveillance des workers, en secondes
+_POLL_SECONDS = 1.0
+
+
+def default_extractor():
+    """Extracteur du module core.extraction_system (factory par défaut des workers remplacés)."""
+    from core.extraction_system import extractor
+    return extractor
+
+
+def _replacement_loop(factory, tasks, results):
+    """Worker de remplacement (forkserver) : extracteur recréé, puis même boucle que les workers forkés."""
+    _worker_loop(factory(), tasks, results)
+
+
+def _worker_loop(extractor, tasks, results):
+    """Boucle d'un worker : extrait les documents de la file jusqu'au signal d'arrêt (None)."""
+    # Désactivé par le parent le temps du fork : objets hérités gelés, nouveaux objets suivis
+    gc.enable()
+    pid = os.getpid()
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        task_id, item = task
+        results.put(("start", pid, task_id, None))
+        results.put(("done", pid, task_id, extractor.extract_document(item)))
+
+
+class WorkerPool:
+    """Pool de workers forkés depuis un extracteur déjà chargé."""
+
+    def __init__(self, workers: Optional[int] = None, extractor=None, preload: Optional[Sequence[str]] = None,
+                 factory: Optional[Callable] = None):
+        """
+        Args:
+            workers: Nombre de workers (None = nombre de cœurs)
+            extractor: MultiModelExtractor à partager (None = extracteur du module core.extraction_system)
+            preload: Modèles chargés avant le fork (None = voir MultiModelExtractor.preload_models)
+            factory: Fonction importable qui recrée l'extracteur dans un worker de remplacement
+                (None = default_extractor, l'extracteur du module core.extraction_system)
+        """
+        if not {"fork", "forkserver"} <= set(multiprocessing.get_all_start_methods()):
+            raise RuntimeError("Le pool pré-forké nécessite fork (Linux, macOS) : utilisez extract_many")
+        if extractor is None:
+            extractor = default_extractor()
+        elif factory is None:
+            logger.warning("⚠️ Extracteur sans factory : un worker remplacé utilisera l'extracteur "
+                           "du module core.extraction_system")
+        self.extractor = extractor
+        self.factory = factory or default_extractor
+        self.workers = workers or os.cpu_count() or 1
+        self._context = multiprocessing.get_context("fork")
+        # Remplacements sans fork du parent ; files de ce contexte, transmissibles aux deux sortes de workers
+        self._respawn_context = multiprocessing.get_context("forkserver")
+        self._respawn_context.set_forkserver_preload(["core.extraction_system"])
+        self._tasks = self._respawn_context.Queue()
+        self._results = self._respawn_context.Queue()
+        self._processes: List = []
+        self._futures: Dict[int, Future] = {}
+        self._running: Dict[int, int] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+        shared = self.extractor.preload_models(preload)
+        self._spawn(self.workers)
+        self._collector = threading.Thread(target=self._collect, name="worker-pool-results", daemon=True)
+        self._collector.start()
+        logger.info(f"🚀 Pool d'extraction: {self.workers} worker(s) forké(s) "
+                    f"({len(shared)} modèle(s) partagé(s))")
+
+    def _spawn(self, count: int):
+        """Forke les workers, avant le démarrage des threads du pool."""
+        # Objets du parent (modèles compris) hors du ramasse-miettes pendant le fork
+        gc.disable()
+        gc.collect()
+        gc.freeze()
+        try:
+            for _ in range(count):
+                process = self._context.Process(target=_worker_loop,
+                                                args=(self.extractor, self._tasks, self._results), daemon=True)
+                process.start()
+                self._processes.append(process)
+        finally:
+            gc.unfreeze()
+            gc.enable()
+
+    def _respawn(self):
+        """Démarre un worker de remplacement par le forkserver (sans fork du parent, qui a des threads)."""
+        process = self._respawn_context.Process(target=_replacement_loop,
+                                                args=(self.factory, self._tasks, self._results), daemon=True)
+        process.start()
+        with self._lock:
+            self._processes.append(process)
+        logger.info(f"🔁 Worker {process.pid} démarré en remplacement")
+
+    def _collect(self):
+        """Transmet les résultats aux futures et remplace les workers morts (thread du parent)."""
+        while not (self._closed and not self._futures):
+            try:
+                kind, pid, task_id, result = self._results.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            with self._lock:
+                if kind == "start":
+                    self._running[pid] = task_id
+                    continue
+                self._running.pop(pid, None)
+                future = self._futures.pop(task_id, None)
+            if future is not None:
+                future.set_result(result)
+
+    def _check_workers(self):
+        """Retire les workers arrêtés et les remplace (thread de collecte)."""
+        with self._lock:
+            dead = [process for process in self._processes if not process.is_alive()]
+        for process in dead:
+            with self._lock:
+                self._processes.remove(process)
+                task_id = self._running.pop(process.pid, None)
+                future = self._futures.pop(task_id, None) if task_id is not None else None
+            if future is not None:
+                future.set_exception(RuntimeError(f"Worker {process.pid} arrêté (code {process.exitcode})"))
+            if not self._closed:
+                logger.warning(f"⚠️ Worker {process.pid} arrêté (code {process.exitcode}), remplacement")
+                self._respawn()
+
+    def submit(self, item: Union[str, PDFSource]) -> Future:
+        """
+        Envoie un document (texte, chemin, octets ou flux binaire) à un worker.
+
+        Returns:
+            Future dont le résultat est celui de MultiModelExtractor.extract_document
+        """
+        if self._closed:
+            raise RuntimeError("Pool d'extraction fermé")
+        if hasattr(item, "read"):
+            # Les flux ne passent pas d'un processus à l'autre : on transmet leur contenu
+            item = item.read()
+        future = Future()
+        with self._lock:
+            task_id = self._next_id
+            self._next_id += 1
+            self._futures[task_id] = future
+        self._tasks.put((task_id, item))
+        return future
+
+    def extract(self, item: Union[str, PDFSource]) -> Dict[str, Optional[str]]:
+        """Extrait un document et attend son résultat."""
+        return self.submit(item).result()
+
+    def map(self, items: Iterable[Union[str, PDFSource]],
+            prefetch: int = DEFAULT_PREFETCH) -> Iterator[Dict[str, Optional[str]]]:
+        """Extrait des documents en parallèle ; résultats dans l'ordre des entrées."""
+        pending = []
+        for item in items:
+            pending.append(self.submit(item))
+            if len(pending) >= self.workers * prefetch:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+    def memory(self) -> Dict[int, Dict[str, float]]:
+        """Mémoire de chaque worker (rss, pss, private en Mo), par pid."""
+        return {process.pid: process_memory_mb(process.pid) for process in self._processes}
+
+    def close(self, timeout: Optional[float] = None):
+        """Arrête les workers après les documents déjà envoyés."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        if any(process.exitcode != 0 for process in self._processes):
+            # Workers interrompus : leurs documents n'auront pas de résultat
+            with self._lock:
+                abandoned, self._futures = self._futures, {}
+            for future in abandoned.values():
+                future.set_exception(RuntimeError("Pool d'extraction arrêté avant la fin du document"))
+        self._collector.join(timeout)
+        logger.info("🛑 Pool d'extraction arrêté")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -4,35 +4,84 @@ Module d'extraction amélioré avec support pour les modèles entraînés.
 Combine l'extraction par modèle NER et les méthodes de fallback par regex.
 """
 
-import pdfplumber
 import spacy
-import re
 import os
 import logging
-from typing import Dict, Optional, Tuple, List
+from typing import Dict, Iterable, Optional, Tuple, List
 from pathlib import Path
 
+from spacy.language import Language
+
+from core.extraction_pipeline import CascadeExtractor
+from core.ner_confidence import Entity
+from core.nlp_profiles import load_pipeline
+from core.pdf_backends import PDFSource
+from core.pdf_reader import READING_PROFILES
+from core.regex_scanner import RegexScanner
+from core.vocab_guard import VocabGuard, vocab_size
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class PDFExtractor:
+# Patterns regex améliorés, par ordre de priorité (valeur : groupe 1, ou toute la correspondance sans groupe)
+PATTERNS_REGEX = {
+    "reference_dossier": [
+        r"(?:Référence|Réf\.?|Reference|N°\s*dossier)\s*:?\s*([\w\d\-\/]+)",
+        r"Dossier\s*:?\s*([\w\d\-\/]+)"
+    ],
+    "type_prelevement": [
+        r"(?:Objet|Type\s*d'analyse|Analyse|Examen)\s*:?\s*(.+?)(?:\n|$)",
+        r"(?:Prélèvement|Échantillon)\s*:?\s*(.+?)(?:\n|$)"
+    ],
+    "date_prelevement": [
+        r"(?:Date\s*de\s*prélèvement|Date\s*prélèvement|Prélevé\s*le|Date)\s*:?\s*(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})",
+        r"(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})"
+    ],
+    "service_demandeur": [
+        r"(?:Demandeur|Service|Demandé\s*par)\s*:?\s*([^:\n]+?)(?:\n|$)",
+        r"(?:Police|Gendarmerie|Laboratoire|Hôpital|Clinique|Centre)",
+    ],
+    "nom_prenom": [
+        r"(?:Nom|Patient|Nom\s*du\s*patient)\s*:?\s*([A-Z][A-Z\s\-]+?)(?:\n|$)",
+        r"(?:M\.|Mme|Mr|Madame|Monsieur)\s+([A-Z][A-Z\s\-]+)"
+    ]
+}
+
+# Compilés une fois pour le processus, appliqués en une passe sur le texte
+SCANNER_REGEX = RegexScanner(PATTERNS_REGEX)
+
+class PDFExtractor(CascadeExtractor):
     """Extracteur de données PDF avec modèle NER et fallback regex."""
     
-    def __init__(self, model_path: Optional[str] = None):
+    regex_patterns = PATTERNS_REGEX
+    regex_scanner = SCANNER_REGEX
+    
+    def __init__(self, model_path: Optional[str] = None, **options):
         """
         Initialise l'extracteur.
         
         Args:
             model_path: Chemin vers le modèle entraîné. Si None, utilise le modèle par défaut.
+            **options: Options communes de CascadeExtractor (lecture des PDF, boilerplate, portée NER,
+                faisceau, cascade "labels", "regex", "model", regex...). reading_profile="auto" choisit
+                le profil du domaine du modèle d'après le nom de son dossier
         """
+        super().__init__(**options)
+        if self.reading_profile == "auto":
+            # models/medical_model (ou models/medical_compact_model) -> profil "medical"
+            domaine = Path(model_path).name.replace("_model", "").replace("_compact", "") if model_path else None
+            self.reading_profile = domaine if domaine in READING_PROFILES else "complet"
+        self.model_path = None
         self.nlp = None
+        self.vocab_guard = None
         self.use_trained_model = False
         
         # Essayer de charger le modèle entraîné
         if model_path and os.path.exists(model_path):
             try:
-                self.nlp = spacy.load(model_path)
+                self.nlp = load_pipeline(model_path, self.nlp_profile)
+                self.model_path = model_path
                 self.use_trained_model = True
                 logger.info(f"✅ Modèle entraîné chargé: {model_path}")
             except Exception as e:
@@ -41,164 +90,96 @@ class PDFExtractor:
         # Fallback vers le modèle par défaut
         if not self.use_trained_model:
             try:
-                self.nlp = spacy.load("fr_core_news_md")
+                self.nlp = load_pipeline("fr_core_news_md", self.nlp_profile)
+                self.model_path = "fr_core_news_md"
                 logger.info("✅ Modèle par défaut fr_core_news_md chargé")
             except OSError:
                 logger.error("❌ Aucun modèle spaCy disponible")
                 raise
+        
+        if self.max_vocab_growth is not None:
+            chemin_modele = self.model_path
+            self.vocab_guard = VocabGuard(lambda: load_pipeline(chemin_modele, self.nlp_profile),
+                                          self.nlp, self.max_vocab_growth, chemin_modele)
+    
+    def get_model(self, model_id: Optional[str] = None) -> Tuple[Optional[str], Optional[Language]]:
+        """Modèle entraîné ((None, None) avec le modèle par défaut, qui ne connaît pas les champs)."""
+        return (self.model_path, self.nlp) if self.use_trained_model else (None, None)
+    
+    def check_vocab(self):
+        """
+        Lance en arrière-plan le rechargement du modèle si son vocabulaire a dépassé la croissance
+        maximale (appelé après chaque document) ; le nouveau pipeline remplace l'ancien une fois chargé.
+        """
+        if self.vocab_guard is not None:
+            self.vocab_guard.check(self.nlp, self._replace_nlp)
+
+    def _replace_nlp(self, old: Language, nlp: Language):
+        """Substitue le pipeline rechargé (thread de rechargement du vocabulaire)."""
+        if self.nlp is old:
+            self.nlp = nlp
+    
+    def get_vocab_stats(self) -> Dict:
+        """Taille du vocabulaire du modèle (et croissance, rechargements s'il est surveillé)."""
+        return self.vocab_guard.stats() if self.vocab_guard is not None else vocab_size(self.nlp)
     
-    def lire_pdf(self, chemin_fichier: str) -> str:
+    def _clean_regex_results(self, resultats: Dict[str, str]) -> Dict[str, str]:
+        """Post-traitement spécifique : nom en majuscules, service de police ou gendarmerie normalisé."""
+        if "nom_prenom" in resultats:
+            resultats["nom_prenom"] = resultats["nom_prenom"].upper()
+        
+        if "service_demandeur" in resultats:
+            service = resultats["service_demandeur"]
+            if any(word in service.lower() for word in ["police", "gendarmerie"]):
+                resultats["service_demandeur"] = service.capitalize()
+        return resultats
+    
+    # API historique (les traitements sont ceux de CascadeExtractor)
+    
+    def lire_pdf(self, chemin_fichier: PDFSource) -> str:
         """Extrait le texte d'un fichier PDF."""
-        try:
-            with pdfplumber.open(chemin_fichier) as pdf:
-                texte = "\n".join([
-                    page.extract_text() or "" 
-                    for page in pdf.pages
-                ])
-            logger.info(f"✅ PDF lu: {len(texte)} caractères extraits")
-            return texte
-        except Exception as e:
-            logger.error(f"❌ Erreur lors de la lecture du PDF: {e}")
-            raise
+        return self.read_pdf(chemin_fichier)
     
     def extraire_avec_modele(self, texte: str) -> Dict[str, Optional[str]]:
         """Extrait les informations en utilisant le modèle NER."""
-        if not self.use_trained_model:
-            return {}
-        
-        try:
-            doc = self.nlp(texte)
-            
-            # Mapping des labels vers les clés de sortie
-            label_mapping = {
-                "nom_personne": "nom_prenom",
-                "reference_dossier": "reference_dossier",
-                "type_analyse": "type_prelevement",
-                "date_prelevement": "date_prelevement",
-                "service_demandeur": "service_demandeur"
-            }
-
-            resultats = {}
-
-            for ent in doc.ents:
-                if ent.label_ in label_mapping:
-                    key = label_mapping[ent.label_]
-                    # Garder l'entité (pas de score disponible dans notre modèle simple)
-                    if key not in resultats:
-                        resultats[key] = ent.text.strip()
-            
-            logger.info(f"✅ Extraction par modèle: {len(resultats)} champs trouvés")
-            return resultats
-            
-        except Exception as e:
-            logger.warning(f"⚠️ Erreur lors de l'extraction par modèle: {e}")
-            return {}
+        return self.extract_with_model(texte)
+    
+    def extraire_entites_avec_modele(self, texte: str, champs: Optional[Iterable[str]] = None) -> Dict[str, Entity]:
+        """Extrait les entités avec le modèle NER : valeur, position (début, fin) dans le texte et score."""
+        return self.extract_entities_with_model(texte, fields=champs)
     
-    def extraire_avec_regex(self, texte: str) -> Dict[str, Optional[str]]:
-        """Extrait les informations en utilisant des expressions régulières."""
+    def extraire_avec_regex(self, texte: str, champs: Optional[Iterable[str]] = None,
+                            budget: Optional[Dict] = None) -> Dict[str, Optional[str]]:
+        """Extrait les informations en utilisant des expressions régulières (champs : champs à chercher, None pour tous)."""
         try:
-            # Patterns regex améliorés
-            patterns = {
-                "reference_dossier": [
-                    r"(?:Référence|Réf\.?|Reference|N°\s*dossier)\s*:?\s*([\w\d\-\/]+)",
-                    r"Dossier\s*:?\s*([\w\d\-\/]+)"
-                ],
-                "type_prelevement": [
-                    r"(?:Objet|Type\s*d'analyse|Analyse|Examen)\s*:?\s*(.+?)(?:\n|$)",
-                    r"(?:Prélèvement|Échantillon)\s*:?\s*(.+?)(?:\n|$)"
-                ],
-                "date_prelevement": [
-                    r"(?:Date\s*de\s*prélèvement|Date\s*prélèvement|Prélevé\s*le|Date)\s*:?\s*(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})",
-                    r"(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})"
-                ],
-                "service_demandeur": [
-                    r"(?:Demandeur|Service|Demandé\s*par)\s*:?\s*([^:\n]+?)(?:\n|$)",
-                    r"(?:Police|Gendarmerie|Laboratoire|Hôpital|Clinique|Centre)",
-                ],
-                "nom_prenom": [
-                    r"(?:Nom|Patient|Nom\s*du\s*patient)\s*:?\s*([A-Z][A-Z\s\-]+?)(?:\n|$)",
-                    r"(?:M\.|Mme|Mr|Madame|Monsieur)\s+([A-Z][A-Z\s\-]+)"
-                ]
-            }
-            
-            resultats = {}
-            
-            for field, pattern_list in patterns.items():
-                for pattern in pattern_list:
-                    match = re.search(pattern, texte, re.IGNORECASE | re.MULTILINE)
-                    if match:
-                        value = match.group(1).strip()
-                        if value and len(value) > 1:  # Éviter les matches trop courts
-                            resultats[field] = value
-                            break
-            
-            # Post-traitement spécifique
-            if "nom_prenom" in resultats:
-                resultats["nom_prenom"] = resultats["nom_prenom"].upper()
-            
-            if "service_demandeur" in resultats:
-                service = resultats["service_demandeur"]
-                if any(word in service.lower() for word in ["police", "gendarmerie"]):
-                    resultats["service_demandeur"] = service.capitalize()
-            
-            logger.info(f"✅ Extraction par regex: {len(resultats)} champs trouvés")
-            return resultats
-            
+            return self.extract_with_regex(texte, champs, budget)
         except Exception as e:
             logger.warning(f"⚠️ Erreur lors de l'extraction par regex: {e}")
             return {}
     
     def fusionner_resultats(self, resultats_modele: Dict, resultats_regex: Dict) -> Dict[str, Optional[str]]:
         """Fusionne les résultats du modèle et du regex en privilégiant le modèle."""
-        resultats_finaux = {}
-        
-        # Tous les champs possibles
-        champs = {"nom_prenom", "reference_dossier", "type_prelevement", "date_prelevement", "service_demandeur"}
-        
-        for champ in champs:
-            # Privilégier le modèle, puis le regex, puis None
-            if champ in resultats_modele and resultats_modele[champ]:
-                resultats_finaux[champ] = resultats_modele[champ]
-            elif champ in resultats_regex and resultats_regex[champ]:
-                resultats_finaux[champ] = resultats_regex[champ]
-            else:
-                resultats_finaux[champ] = None
-        
-        return resultats_finaux
+        return self.merge_results(resultats_modele, resultats_regex)
     
-    def extraire_infos(self, chemin_fichier: str) -> Dict[str, Optional[str]]:
+    def verifier_vocabulaire(self):
+        """Recharge le modèle si son vocabulaire a dépassé la croissance maximale."""
+        self.check_vocab()
+    
+    def extraire_infos(self, chemin_fichier: PDFSource) -> Dict[str, Optional[str]]:
         """
         Extrait les informations d'un fichier PDF.
         
         Args:
-            chemin_fichier: Chemin vers le fichier PDF
+            chemin_fichier: Chemin vers le fichier PDF (ou ses octets, ou un flux binaire)
             
         Returns:
             Dictionnaire avec les informations extraites
         """
-        # Lire le PDF
-        texte = self.lire_pdf(chemin_fichier)
-        
-        # Extraction avec le modèle NER
-        resultats_modele = self.extraire_avec_modele(texte)
-        
-        # Extraction avec regex (fallback)
-        resultats_regex = self.extraire_avec_regex(texte)
-        
-        # Fusionner les résultats
-        resultats_finaux = self.fusionner_resultats(resultats_modele, resultats_regex)
-        
-        # Ajouter des métadonnées
-        resultats_finaux["_metadata"] = {
-            "extraction_method": "model" if self.use_trained_model else "regex",
-            "model_fields": len(resultats_modele),
-            "regex_fields": len(resultats_regex),
-            "text_length": len(texte)
-        }
-        
-        logger.info(f"✅ Extraction terminée: {sum(1 for v in resultats_finaux.values() if v and not isinstance(v, dict))} champs extraits")
-        
-        return resultats_finaux
+        return self.extract_from_pdf(chemin_fichier)
+    
+    def extraire_infos_streaming(self, chemin_fichier: PDFSource) -> Dict[str, Optional[str]]:
+        """Extrait les informations page par page avec arrêt anticipé (voir extract_from_pdf_streaming)."""
+        return self.extract_from_pdf_streaming(chemin_fichier)
 
 # Fonction de compatibilité avec l'ancienne API
 def extraire_infos(chemin_fichier: str) -> Dict[str, Optional[str]]:
@@ -0,0 +1,34 @@
+"""Retrait du boilerplate et étape "labels" sur des valeurs répétées d'un document à l'autre."""
+
+from core.boilerplate import BoilerplateFilter
+from core.extraction_system import MultiModelExtractor
+
+# Valeur sur la ligne suivant son étiquette, identique dans tous les documents
+DOCUMENT = "Service demandeur :\nCardiologie\nDate de prélèvement : 12/03/2024\nPage 1/2\n"
+
+
+def test_value_line_after_label_is_kept():
+    boilerplate = BoilerplateFilter(min_documents=2)
+    for _ in range(4):
+        filtered, offset_map, removed = boilerplate.filter_text(DOCUMENT)
+    assert "Cardiologie" in filtered
+    # Ligne répétée sans étiquette : retirée
+    assert "Page" not in filtered
+    assert removed == 1
+
+
+def test_repeated_lines_are_dropped():
+    boilerplate = BoilerplateFilter(min_documents=2)
+    text = "Laboratoire central\nCompte rendu\nLaboratoire central\n"
+    filtered, _, removed = boilerplate.filter_text(text)
+    assert filtered == "Laboratoire central\nCompte rendu\n"
+    assert removed == 1
+
+
+def test_labels_stage_reads_repeated_values():
+    extractor = MultiModelExtractor(cascade=("labels",), drop_boilerplate=True)
+    for _ in range(5):
+        result = extractor.extract_document(DOCUMENT)
+    assert result["service_demandeur"] == "Cardiologie"
+    start, end = result["_metadata"]["entity_spans"]["service_demandeur"]
+    assert DOCUMENT[start:end] == "Cardiologie"
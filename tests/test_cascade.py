@@ -0,0 +1,96 @@
+"""Cascade d'extraction : champs transmis à chaque étape, arrêt dès que tous les champs sont satisfaits."""
+
+from core.cascade import COST_ORDERED_CASCADE, DEFAULT_CASCADE, MODEL_FIRST_CASCADE, ExtractionCascade
+from core.fields import FIELDS
+
+VALUES = {
+    "nom_prenom": "DUPONT Jean",
+    "reference_dossier": "AB-1234",
+    "type_prelevement": "Bilan sanguin",
+    "date_prelevement": "12/03/2024",
+    "service_demandeur": "Cardiologie",
+}
+
+
+class RecordingStage:
+    """Étape factice : renvoie ses entités pour les champs demandés et note chaque appel."""
+
+    def __init__(self, entities):
+        self.entities = entities
+        self.calls = []
+
+    def __call__(self, document, fields):
+        self.calls.append(list(fields))
+        return {field: entity for field, entity in self.entities.items() if field in fields}
+
+
+def rule(fields, values=VALUES):
+    return {field: (values[field], None, None, None) for field in fields}
+
+
+def scored(fields, score):
+    return {field: (VALUES[field], 0, len(VALUES[field]), score) for field in fields}
+
+
+def test_default_is_cost_ordered():
+    assert DEFAULT_CASCADE == COST_ORDERED_CASCADE == ("labels", "regex", "model")
+    assert MODEL_FIRST_CASCADE == ("labels", "model", "regex")
+
+
+def test_later_stages_skipped_once_all_fields_satisfied():
+    labels = RecordingStage(rule(FIELDS[:3]))
+    regex = RecordingStage(rule(FIELDS))
+    model = RecordingStage(scored(FIELDS, None))
+    cascade = ExtractionCascade([("labels", labels), ("regex", regex), ("model", model)], None)
+    run = cascade.run({})
+    assert labels.calls == [list(FIELDS)]
+    # Étape suivante : seuls les champs encore absents
+    assert regex.calls == [list(FIELDS[3:])]
+    assert model.calls == []
+    assert run.stopped_after == "regex"
+    assert run.sources == {**{field: "labels" for field in FIELDS[:3]}, **{field: "regex" for field in FIELDS[3:]}}
+    summary = cascade.summary(run)
+    assert summary["stages"]["model"] == {"runs": 0, "skipped": 1, "fields": 0, "found": 0, "satisfied": 0,
+                                          "hit_rate": None, "time_ms": 0.0}
+
+
+def test_invalid_values_are_searched_again():
+    invalid = dict(VALUES, date_prelevement="bientôt")
+    labels = RecordingStage(rule(FIELDS, invalid))
+    regex = RecordingStage(rule(FIELDS))
+    run = ExtractionCascade([("labels", labels), ("regex", regex)], None).run({})
+    assert regex.calls == [["date_prelevement"]]
+    assert run.entities["date_prelevement"][0] == "12/03/2024"
+
+
+def test_confidence_threshold_applies_to_model_entities_only():
+    model = RecordingStage({**scored(FIELDS[:2], 0.95), **scored(FIELDS[2:4], 0.3), **scored(FIELDS[4:], None)})
+    regex = RecordingStage(rule(FIELDS))
+    cascade = ExtractionCascade([("model", model), ("regex", regex)], 0.8)
+    run = cascade.run({})
+    # Score faible ou absent : le champ reste à chercher ; les valeurs des regex, sans score, suffisent
+    assert regex.calls == [list(FIELDS[2:])]
+    assert cascade.pending(run) == []
+    # Sans seuil (NER glouton), toute valeur valide du modèle suffit
+    regex.calls.clear()
+    ExtractionCascade([("model", model), ("regex", regex)], None).run({})
+    assert regex.calls == []
+
+
+def test_run_resumes_after_until():
+    labels = RecordingStage(rule(FIELDS[:1]))
+    model = RecordingStage(scored(FIELDS, None))
+    cascade = ExtractionCascade([("labels", labels), ("model", model)], None)
+    run = cascade.run({}, until="model")
+    assert model.calls == [] and not cascade.finished(run)
+    cascade.run({}, run)
+    assert model.calls == [list(FIELDS[1:])] and cascade.finished(run)
+
+
+def test_failing_stage_does_not_stop_the_cascade():
+    def broken(document, fields):
+        raise RuntimeError("modèle indisponible")
+
+    regex = RecordingStage(rule(FIELDS))
+    run = ExtractionCascade([("model", broken), ("regex", regex)], None).run({})
+    assert regex.calls == [list(FIELDS)] and run.stopped_after == "regex"
@@ -0,0 +1,54 @@
+"""Textes longs découpés pour le NER : morceaux bornés et contigus, positions recalées sur le texte entier."""
+
+import pytest
+import spacy
+
+from core.chunking import split_chunks
+from core.extraction_system import MultiModelExtractor
+from core.model_registry import ModelRegistry
+
+FILLER = "Le patient présente une évolution favorable.\n"
+
+
+def assert_covers(text, spans, max_chars):
+    assert spans[0][0] == 0 and spans[-1][1] == len(text)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(spans, spans[1:]))
+    assert all(0 < end - start <= max_chars for start, end in spans)
+
+
+@pytest.mark.parametrize("text", [FILLER * 100, "mot " * 1000, "x" * 2500, ("ligne\n" * 30 + "\n") * 20])
+def test_chunks_cover_text(text):
+    assert_covers(text, split_chunks(text, 300), 300)
+
+
+def test_chunks_prefer_paragraphs_then_lines_then_spaces():
+    paragraphs = ("a" * 100 + "\n" + "b" * 100 + "\n\n") * 5
+    assert all(paragraphs[end - 2:end] == "\n\n" for _, end in split_chunks(paragraphs, 300)[:-1])
+    lines = ("a" * 90 + "\n") * 10
+    assert all(lines[end - 1] == "\n" for _, end in split_chunks(lines, 250)[:-1])
+    words = "mot " * 100
+    assert all(words[end - 1] == " " for _, end in split_chunks(words, 50)[:-1])
+    assert split_chunks("court", 300) == [(0, 5)]
+    with pytest.raises(ValueError):
+        split_chunks("texte", 0)
+
+
+def test_entities_keep_positions_in_long_text():
+    nlp = spacy.blank("fr")
+    nlp.add_pipe("entity_ruler").add_patterns([
+        {"label": "reference_dossier", "pattern": "AB-123"},
+        {"label": "nom_personne", "pattern": [{"TEXT": "DUPONT"}, {"TEXT": "JEAN"}]}
+    ])
+    extractor = MultiModelExtractor(chunk_chars=500)
+    extractor.models = ModelRegistry(lambda path: nlp)
+    extractor.models.register("general", "general")
+    extractor.model_info = {"general": {"name": "general", "description": "", "type": "trained"}}
+    extractor.current_model = "general"
+
+    text = FILLER * 40 + "Dossier AB-123\n" + FILLER * 40 + "Patient DUPONT JEAN\n"
+    assert len(split_chunks(text, 500)) > 4
+    entities = extractor.extract_entities_with_model(text)
+    assert {field: entity[0] for field, entity in entities.items()} == {"reference_dossier": "AB-123",
+                                                                        "nom_prenom": "DUPONT JEAN"}
+    for value, start, end, _ in entities.values():
+        assert text[start:end] == value
@@ -0,0 +1,73 @@
+"""Routage par domaine : un seul modèle choisi d'après le début du document, repli sur le modèle actuel."""
+
+import random
+
+import pytest
+import spacy
+
+from core.domain_router import FALLBACK_DOMAIN, DomainRouter
+from core.extraction_system import MultiModelExtractor
+from core.generator_vocab import GENERATORS, generate_texts
+from core.model_registry import ModelLoadError, ModelRegistry
+
+
+@pytest.fixture(scope="module")
+def router():
+    return DomainRouter()
+
+
+@pytest.mark.parametrize("domain", GENERATORS)
+def test_generated_documents_route_to_their_domain(router, domain):
+    random.seed(0)
+    texts = generate_texts(domain, 50)
+    assert sum(router.route(text)["domain"] == domain for text in texts) >= 45
+
+
+def test_no_clue_routes_to_fallback(router):
+    assert router.route("") == {"domain": FALLBACK_DOMAIN, "confidence": 0.0, "scores": {}}
+    random.seed(0)
+    text = generate_texts("medical", 1)[0]
+    assert DomainRouter(min_confidence=1.01).route(text)["domain"] == FALLBACK_DOMAIN
+
+
+def test_only_document_start_is_read():
+    random.seed(0)
+    text = generate_texts("legal", 1)[0]
+    assert DomainRouter(max_chars=0).route(text)["domain"] == FALLBACK_DOMAIN
+
+
+def domain_text(router, domain):
+    """Document généré pour le domaine, reconnu comme tel par le routeur."""
+    random.seed(0)
+    return next(text for text in generate_texts(domain, 10) if router.route(text)["domain"] == domain)
+
+
+def routed_extractor(broken=()):
+    extractor = MultiModelExtractor(auto_route=True)
+
+    def load(path):
+        if path in broken:
+            raise OSError(f"Can't read file: {path}")
+        return spacy.blank("fr")
+
+    extractor.models = ModelRegistry(load)
+    extractor.model_info = {}
+    for model_id in GENERATORS:
+        extractor.models.register(model_id, model_id)
+        extractor.model_info[model_id] = {"name": model_id, "description": "", "type": "trained"}
+    extractor.current_model = "general"
+    return extractor
+
+
+def test_extractor_uses_routed_model(router):
+    metadata = routed_extractor().extract_document(domain_text(router, "medical"))["_metadata"]
+    assert metadata["routing"]["domain"] == "medical" and "time_us" in metadata["routing"]
+    assert metadata["model_id"] == "medical"
+
+
+def test_unloadable_domain_keeps_current_model(router):
+    extractor = routed_extractor(broken={"legal"})
+    with pytest.raises(ModelLoadError):
+        extractor.models["legal"]
+    model_id, routing = extractor.route_document(domain_text(router, "legal"))
+    assert routing["domain"] == "legal" and model_id == "general"
@@ -0,0 +1,68 @@
+"""Analyse « Étiquette : valeur » : expression du trie, limites d'étiquettes et positions des valeurs."""
+
+import random
+import re
+
+from core.generator_vocab import GENERATORS, generate_texts
+from core.label_parser import LabelParser, build_trie, default_label_parser, trie_pattern
+
+
+def alternation_parser() -> LabelParser:
+    """Même analyseur avec une simple alternance des étiquettes, les plus longues d'abord."""
+    parser = LabelParser()
+    labels = sorted(parser.label_fields, key=len, reverse=True)
+    alternation = "|".join(r"\s+".join(map(re.escape, label.split(" "))) for label in labels)
+    parser.pattern = re.compile(f"({alternation})" + r"\s*:")
+    parser._pattern_ignorecase = re.compile(parser.pattern.pattern, re.IGNORECASE)
+    return parser
+
+
+def test_trie_pattern_matches_exactly_the_labels():
+    labels = ["nom", "nom usuel", "date", "date de prélèvement", "n° rg"]
+    pattern = re.compile(trie_pattern(build_trie(labels)))
+    for label in labels:
+        assert pattern.fullmatch(label)
+    for other in ["no", "nom usu", "dat", "date de", "n°", "rg"]:
+        assert not pattern.fullmatch(other)
+    # Espaces multiples entre les mots d'une étiquette
+    assert pattern.fullmatch("nom   usuel")
+
+
+def test_trie_matches_alternation_on_generated_texts():
+    random.seed(0)
+    texts = [text for domain in GENERATORS for text in generate_texts(domain, 30)]
+    trie, alternation = default_label_parser(), alternation_parser()
+    for text in texts:
+        assert trie.parse(text) == alternation.parse(text), text
+
+
+def test_longest_label_and_word_start():
+    parser = default_label_parser()
+    text = "Prénom : Jean\nNom du patient : MARTIN Paul"
+    value, start, end, score = parser.parse(text)["nom_prenom"]
+    assert value == "MARTIN Paul"
+    assert text[start:end] == value and score is None
+
+
+def test_values_split_on_next_label_and_next_line():
+    parser = default_label_parser()
+    text = "Nom : DUPONT Jean | Date de prélèvement : 12/03/2024\nService demandeur :\nCardiologie"
+    results = parser.parse(text)
+    assert {field: value for field, (value, *_) in results.items()} == {
+        "nom_prenom": "DUPONT Jean", "date_prelevement": "12/03/2024", "service_demandeur": "Cardiologie"}
+    for value, start, end, _ in results.values():
+        assert text[start:end] == value
+
+
+def test_requested_fields_only():
+    parser = default_label_parser()
+    text = "Nom : DUPONT Jean\nDate de prélèvement : 12/03/2024"
+    assert list(parser.parse(text, ["date_prelevement"])) == ["date_prelevement"]
+
+
+def test_text_whose_lowercase_changes_length():
+    parser = default_label_parser()
+    # « İ » devient deux caractères en minuscules : positions calculées sur le texte original
+    text = "İstanbul\nNOM : DUPONT Jean"
+    value, start, end, _ = parser.parse(text)["nom_prenom"]
+    assert value == text[start:end] == "DUPONT Jean"
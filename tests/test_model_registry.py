@@ -0,0 +1,143 @@
+"""Modèles chargés à la demande : éviction LRU sous budget, chargement unique, erreurs de chargement."""
+
+import threading
+import time
+
+import pytest
+
+from core import model_registry
+from core.extraction_system import MultiModelExtractor
+from core.model_registry import ModelLoadError, ModelRegistry
+
+MODEL_MB = 10.0
+
+
+class Pipeline:
+    """Pipeline factice : seule son identité compte."""
+
+    def __init__(self, path):
+        self.path = path
+
+
+class CountingLoader:
+    def __init__(self, delay=0.0, broken=()):
+        self.calls = []
+        self.delay = delay
+        self.broken = set(broken)
+        self.lock = threading.Lock()
+
+    def __call__(self, path):
+        with self.lock:
+            self.calls.append(path)
+        time.sleep(self.delay)
+        if path in self.broken:
+            raise OSError(f"Can't read file: {path}/strings.json")
+        return Pipeline(path)
+
+
+@pytest.fixture(autouse=True)
+def fixed_sizes(monkeypatch):
+    monkeypatch.setattr(model_registry, "pipeline_size_mb", lambda nlp: MODEL_MB)
+    monkeypatch.setattr(model_registry, "disk_size_mb", lambda path: 0.0)
+
+
+def make_registry(loader, max_memory_mb=None, **kwargs):
+    registry = ModelRegistry(loader, max_memory_mb, **kwargs)
+    for model_id in ("a", "b", "c"):
+        registry.register(model_id, f"models/{model_id}")
+    return registry
+
+
+def test_models_load_on_first_use():
+    loader = CountingLoader()
+    registry = make_registry(loader)
+    assert list(registry) == ["a", "b", "c"] and loader.calls == []
+    assert registry.peek("a") is None
+    nlp = registry["a"]
+    assert registry["a"] is nlp and registry.peek("a") is nlp
+    assert loader.calls == ["models/a"] and registry.loads == 1
+
+
+def test_least_recently_used_model_is_evicted():
+    evicted = []
+    registry = make_registry(CountingLoader(), max_memory_mb=2.5 * MODEL_MB, on_evict=evicted.append)
+    registry["a"]
+    registry["b"]
+    registry["a"]
+    registry["c"]
+    assert evicted == ["b"]
+    assert list(registry.loaded()) == ["a", "c"]
+    assert registry.memory_mb() == 2 * MODEL_MB
+    assert registry.stats()["evictions"] == 1
+    # Toujours disponible : rechargé à la demande
+    assert "b" in registry and registry["b"] is not None
+
+
+def test_injected_pipeline_is_never_evicted():
+    registry = make_registry(CountingLoader(), max_memory_mb=1.5 * MODEL_MB)
+    injected = Pipeline(None)
+    registry["manual"] = injected
+    registry["a"]
+    registry["b"]
+    assert registry.peek("manual") is injected
+    assert list(registry.loaded()) == ["manual", "b"]
+
+
+def test_concurrent_requests_load_once():
+    loader = CountingLoader(delay=0.2)
+    registry = make_registry(loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry["a"])) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loader.calls == ["models/a"]
+    assert len(results) == 8 and all(result is results[0] for result in results)
+
+
+def test_loaded_model_is_served_during_another_load():
+    loader = CountingLoader()
+    registry = make_registry(loader)
+    first = registry["a"]
+    loader.delay = 0.5
+    thread = threading.Thread(target=lambda: registry["b"])
+    thread.start()
+    time.sleep(0.1)
+    start = time.perf_counter()
+    assert registry["a"] is first
+    assert time.perf_counter() - start < 0.2
+    thread.join()
+
+
+def test_failed_load_keeps_model_with_its_error():
+    loader = CountingLoader(broken={"models/b"})
+    registry = make_registry(loader)
+    with pytest.raises(ModelLoadError, match="strings.json"):
+        registry["b"]
+    assert "b" in registry and "strings.json" in registry.errors["b"]
+    # Échec mémorisé : pas de nouvel essai, et get() rend None comme pour un modèle inconnu
+    assert registry.get("b") is None
+    assert loader.calls == ["models/b"]
+    # Nouvel enregistrement : nouvel essai
+    loader.broken.clear()
+    registry.register("b", "models/b")
+    assert registry["b"] is not None and "b" not in registry.errors
+
+
+def test_extractor_falls_back_to_a_loadable_model():
+    extractor = MultiModelExtractor()
+    extractor.models = ModelRegistry(CountingLoader(broken={"models/general"}))
+    extractor.model_info = {}
+    for model_id in ("general", "medical"):
+        extractor.models.register(model_id, f"models/{model_id}")
+        extractor.model_info[model_id] = {"name": model_id, "description": "", "type": "trained"}
+    extractor.current_model = "general"
+
+    model_id, nlp = extractor.get_model()
+    assert (model_id, nlp.path) == ("medical", "models/medical")
+    assert extractor.current_model == "medical"
+    available = extractor.get_available_models()
+    assert available["general"]["available"] is False and available["general"]["error"]
+    assert available["medical"]["available"] is True
+    assert extractor.set_model("general") is False
@@ -0,0 +1,67 @@
+"""Scores du NER par faisceau : confidences dans les métadonnées, champs peu sûrs relayés aux regex."""
+
+import pytest
+import spacy
+from spacy.training import Example
+from spacy.util import fix_random_seed
+
+from core.extraction_system import MultiModelExtractor
+from core.model_registry import ModelRegistry
+from core.ner_confidence import SERVING_BEAM_WIDTH
+from extraction_enhanced import PDFExtractor
+
+TEXT = "Patient DUPONT JEAN\nDossier AB-123\n"
+ENTITIES = [(8, 19, "nom_personne"), (28, 34, "reference_dossier")]
+
+
+@pytest.fixture(scope="module")
+def trained_nlp():
+    """Petit NER entraîné sur TEXT (NER seul, dernier composant : le faisceau s'applique)."""
+    fix_random_seed(0)
+    nlp = spacy.blank("fr")
+    nlp.add_pipe("ner")
+    examples = [Example.from_dict(nlp.make_doc(TEXT), {"entities": ENTITIES})]
+    nlp.initialize(lambda: examples)
+    for _ in range(30):
+        nlp.update(examples)
+    return nlp
+
+
+def extractor_with(nlp, **options) -> MultiModelExtractor:
+    extractor = MultiModelExtractor(**options)
+    extractor.models = ModelRegistry(lambda path: nlp)
+    extractor.models.register("general", "general")
+    extractor.model_info = {"general": {"name": "general", "description": "", "type": "trained"}}
+    extractor.current_model = "general"
+    return extractor
+
+
+def test_beam_fills_confidences(trained_nlp):
+    result = extractor_with(trained_nlp, cascade=("model",), beam_width=SERVING_BEAM_WIDTH).extract_document(TEXT)
+    assert (result["nom_prenom"], result["reference_dossier"]) == ("DUPONT JEAN", "AB-123")
+    confidences = result["_metadata"]["confidences"]
+    assert set(confidences) == {"nom_prenom", "reference_dossier"}
+    assert all(0.0 < score <= 1.0 for score in confidences.values())
+
+
+def test_greedy_ner_has_no_confidences(trained_nlp):
+    result = extractor_with(trained_nlp, cascade=("model",), beam_width=1).extract_document(TEXT)
+    assert result["reference_dossier"] == "AB-123"
+    assert result["_metadata"]["confidences"] == {}
+
+
+@pytest.mark.parametrize("threshold, searched", [(0.5, 3), (1.01, 5)])
+def test_low_confidence_fields_go_to_regex(trained_nlp, threshold, searched):
+    extractor = extractor_with(trained_nlp, cascade=("model", "regex"), beam_width=SERVING_BEAM_WIDTH,
+                               confidence_threshold=threshold)
+    metadata = extractor.extract_document(TEXT)["_metadata"]
+    # Champs sûrs : seuls les trois absents restent à chercher ; sinon les cinq
+    assert metadata["regex_fields_searched"] == searched
+
+
+def test_pdf_extractor_scores_with_serving_beam(trained_nlp, tmp_path):
+    trained_nlp.to_disk(tmp_path / "model")
+    extractor = PDFExtractor(str(tmp_path / "model"), cascade=("model",), beam_width=SERVING_BEAM_WIDTH)
+    assert extractor.use_trained_model
+    metadata = extractor.extract_document(TEXT)["_metadata"]
+    assert set(metadata["confidences"]) == {"nom_prenom", "reference_dossier"}
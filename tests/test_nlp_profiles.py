@@ -0,0 +1,78 @@
+"""Profil d'inférence "ner" : seuls le NER et le tok2vec qu'il écoute sont chargés, mêmes entités."""
+
+import pytest
+import spacy
+from spacy.training import Example
+from spacy.util import fix_random_seed
+
+from core.nlp_profiles import excluded_components, load_pipeline, model_config, resolve_nlp_profile
+
+TEXT = "Patient DUPONT JEAN\nDossier AB-123\n"
+ENTITIES = [(8, 19, "nom_personne"), (28, 34, "reference_dossier")]
+
+# NER branché sur le tok2vec partagé du pipeline
+LISTENING_NER = {"model": {
+    "@architectures": "spacy.TransitionBasedParser.v2", "state_type": "ner", "extra_state_tokens": False,
+    "hidden_width": 64, "maxout_pieces": 2, "use_upper": True,
+    "tok2vec": {"@architectures": "spacy.Tok2VecListener.v1", "width": 96, "upstream": "tok2vec"}
+}}
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    """Pipeline complet sur le disque : tok2vec partagé, NER qui l'écoute, tagger et sentencizer."""
+    fix_random_seed(0)
+    nlp = spacy.blank("fr")
+    nlp.add_pipe("tok2vec")
+    nlp.add_pipe("ner", config=LISTENING_NER)
+    nlp.add_pipe("tagger").add_label("NOUN")
+    nlp.add_pipe("sentencizer")
+    doc = nlp.make_doc(TEXT)
+    examples = [Example.from_dict(doc, {"entities": ENTITIES, "tags": ["NOUN"] * len(doc)})]
+    nlp.initialize(lambda: examples)
+    for _ in range(30):
+        nlp.update(examples)
+    path = tmp_path_factory.mktemp("model") / "general"
+    nlp.to_disk(path)
+    return str(path)
+
+
+def test_ner_profile_keeps_listened_tok2vec(model_path):
+    assert excluded_components(model_config(model_path), ("ner",)) == ["tagger", "sentencizer"]
+    assert load_pipeline(model_path).pipe_names == ["tok2vec", "ner"]
+    assert load_pipeline(model_path, "complet").pipe_names == ["tok2vec", "ner", "tagger", "sentencizer"]
+    assert load_pipeline(model_path, ["sentencizer"]).pipe_names == ["sentencizer"]
+
+
+def test_ner_profile_finds_same_entities(model_path):
+    def entities(nlp):
+        return [(ent.text, ent.label_) for ent in nlp(TEXT).ents]
+
+    assert entities(load_pipeline(model_path)) == entities(load_pipeline(model_path, "complet"))
+    assert entities(load_pipeline(model_path))
+
+
+def test_unnamed_listener_keeps_embedding_components():
+    config = {
+        "nlp": {"pipeline": ["tok2vec", "tagger", "ner"]},
+        "components": {
+            "tok2vec": {"factory": "tok2vec"},
+            "tagger": {"factory": "tagger"},
+            "ner": {"factory": "ner", "model": {"tok2vec": {"@architectures": "spacy.Tok2VecListener.v1",
+                                                            "upstream": "*"}}}
+        }
+    }
+    assert excluded_components(config, ("ner",)) == ["tagger"]
+
+
+def test_resolve_nlp_profile():
+    assert resolve_nlp_profile("ner") == ("ner",)
+    assert resolve_nlp_profile("complet") is None and resolve_nlp_profile(None) is None
+    assert resolve_nlp_profile(["ner", "tagger"]) == ("ner", "tagger")
+    with pytest.raises(ValueError):
+        resolve_nlp_profile("rapide")
+
+
+def test_missing_model_raises_like_spacy(tmp_path):
+    with pytest.raises(OSError):
+        load_pipeline(str(tmp_path / "absent"))
@@ -0,0 +1,97 @@
+"""Positions ramenées au texte original à travers le boilerplate, les fenêtres d'ancrage et les morceaux."""
+
+import random
+import re
+
+from core.anchors import anchor_windows
+from core.boilerplate import BoilerplateFilter
+from core.chunking import split_chunks
+from core.generator_vocab import GENERATORS, generate_texts
+from core.offsets import OffsetMap, map_span
+
+HEADER = "CENTRE HOSPITALIER UNIVERSITAIRE\nLaboratoire d'analyses médicales\n"
+FOOTER = "Document confidentiel - ne pas diffuser\nPage 1/3\n"
+PROSE = "Le patient présente une évolution favorable, contrôle prévu dans trois mois. "
+
+_WORD_RE = re.compile(r"\S+")
+
+
+def sample_documents():
+    random.seed(0)
+    documents = []
+    for domain in GENERATORS:
+        for text in generate_texts(domain, 10):
+            pages = [HEADER + PROSE * random.randint(0, 40) + "\n" + text + "\n" + FOOTER for _ in range(3)]
+            documents.append("\n".join(pages))
+    return documents
+
+
+def assert_round_trip(original, derived, offset_maps, shift=0):
+    """Chaque mot du texte dérivé (décalé de shift) se retrouve à sa position dans le texte original."""
+    for match in _WORD_RE.finditer(derived):
+        start, end = map_span((match.start() + shift, match.end() + shift), offset_maps)
+        assert original[start:end] == match.group(), (match.group(), original[start:end])
+
+
+def test_offset_map_segments():
+    offset_map = OffsetMap()
+    offset_map.add(10, 5)
+    offset_map.add(15, 5)   # contigu : segment prolongé
+    offset_map.add(40, 3)
+    assert offset_map.length == 13
+    assert offset_map.span(0, 10) == (10, 20)
+    assert offset_map.span(10, 13) == (40, 43)
+    assert offset_map.span(4, 4) == (14, 14)
+    copy = OffsetMap()
+    copy.extend(offset_map)
+    assert [copy.to_original(i) for i in range(13)] == [offset_map.to_original(i) for i in range(13)]
+    assert map_span((2, 4), [None, OffsetMap.shifted(100, 10)]) == (102, 104)
+
+
+def test_boilerplate_round_trip():
+    boilerplate = BoilerplateFilter(min_documents=2)
+    for document in sample_documents():
+        filtered, offset_map, removed = boilerplate.filter_text(document)
+        assert removed > 0
+        assert_round_trip(document, filtered, [offset_map])
+
+
+def test_boilerplate_pages_round_trip():
+    boilerplate = BoilerplateFilter()
+    for document in sample_documents():
+        document_filter = boilerplate.document()
+        page_start = 0
+        for page in document.split("\n"):
+            filtered, offset_map = document_filter.filter(page, page_start)
+            assert_round_trip(document, filtered, [offset_map])
+            page_start += len(page) + 1
+        document_filter.close()
+
+
+def test_anchor_windows_round_trip():
+    for document in sample_documents():
+        windows, offset_map, count = anchor_windows(document)
+        assert count > 0 and len(windows) < len(document)
+        assert_round_trip(document, windows, [offset_map])
+
+
+def test_boilerplate_anchors_and_chunks_round_trip():
+    boilerplate = BoilerplateFilter(min_documents=2)
+    for document in sample_documents():
+        filtered, filtered_map, _ = boilerplate.filter_text(document)
+        ner_text, window_map, _ = anchor_windows(filtered)
+        offset_maps = [filtered_map, window_map]
+        chunks = split_chunks(ner_text, 200)
+        assert "".join(ner_text[start:end] for start, end in chunks) == ner_text
+        for start, end in chunks:
+            # Positions d'un morceau décalées de son début, comme pour les entités du modèle
+            chunk = ner_text[start:end]
+            assert_round_trip(document, chunk, offset_maps, shift=start)
+
+
+def test_split_chunks_bounds():
+    text = ("mot " * 300 + "\n\n") * 5 + "x" * 1000
+    chunks = split_chunks(text, 500)
+    assert all(end - start <= 500 for start, end in chunks)
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(text)
+    assert all(previous[1] == current[0] for previous, current in zip(chunks, chunks[1:]))
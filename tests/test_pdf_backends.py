@@ -0,0 +1,54 @@
+"""Moteurs PDF : calibration sur un dossier d'exemples, choix enregistré puis relu par get_backend("auto")."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from core import pdf_backends
+from core.pdf_backends import BACKENDS, FALLBACK_BACKEND, calibrate, get_backend, load_calibrated_backend
+
+TEST_FILES = Path(__file__).resolve().parent.parent / "test_files"
+
+
+@pytest.fixture
+def calibration_file(tmp_path, monkeypatch):
+    path = tmp_path / "pdf_backend.json"
+    monkeypatch.setattr(pdf_backends, "CALIBRATION_FILE", str(path))
+    return path
+
+
+def test_calibration_picks_fastest_faithful_backend():
+    report = calibrate(str(TEST_FILES), repeats=1)
+    results = report["results"]
+    assert set(results) == set(BACKENDS) and report["files"] == 3
+    # pdfplumber est la référence de fidélité
+    assert results["pdfplumber"]["line_recall"] == 1.0
+    eligible = [name for name, result in results.items() if result["line_recall"] >= report["min_line_recall"]]
+    assert report["default_backend"] == min(eligible, key=lambda name: results[name]["seconds"])
+
+
+def test_unreachable_recall_falls_back():
+    report = calibrate(str(TEST_FILES), repeats=1, min_line_recall=1.01)
+    assert report["default_backend"] == FALLBACK_BACKEND
+
+
+def test_calibration_without_pdf(tmp_path):
+    with pytest.raises(ValueError):
+        calibrate(str(tmp_path))
+
+
+def test_auto_uses_calibrated_backend(calibration_file):
+    assert load_calibrated_backend() == FALLBACK_BACKEND
+    calibration_file.write_text(json.dumps({"default_backend": "pdfminer"}), encoding="utf-8")
+    assert get_backend("auto").name == "pdfminer"
+    # Moteur enregistré mais indisponible, ou fichier illisible : moteur par défaut
+    calibration_file.write_text(json.dumps({"default_backend": "absent"}), encoding="utf-8")
+    assert load_calibrated_backend() == FALLBACK_BACKEND
+    calibration_file.write_text("{", encoding="utf-8")
+    assert load_calibrated_backend() == FALLBACK_BACKEND
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="inconnu"):
+        get_backend("absent")
@@ -0,0 +1,215 @@
+"""Lecture des PDF : lecture parallèle par plages de pages, profils de lecture (pages et zone retenues),
+PDF fournis par leur chemin, leurs octets ou un flux, plafond mémoire, PDF sans couche texte."""
+
+import io
+from pathlib import Path
+
+import pypdfium2 as pdfium  # dépendance de pdfplumber
+import pytest
+
+from core.extraction_system import MultiModelExtractor
+from core import pdf_backends, pdf_reader
+from core.pdf_reader import MemoryBudgetExceeded, PDFReader, resolve_profile, select_pages, split_page_ranges
+
+TEST_FILES = Path(__file__).resolve().parent.parent / "test_files"
+LONG_PDF = str(TEST_FILES / "rapport_long_etendu.pdf")
+
+
+def repeated_pdf(copies: int) -> bytes:
+    """PDF de plusieurs copies des pages de rapport_long_etendu.pdf (3 pages chacune)."""
+    source = pdfium.PdfDocument(LONG_PDF)
+    document = pdfium.PdfDocument.new()
+    for _ in range(copies):
+        document.import_pages(source)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("num_pages, num_chunks", [(9, 2), (9, 4), (3, 8), (1, 1)])
+def test_split_page_ranges_covers_pages_in_order(num_pages, num_chunks):
+    ranges = split_page_ranges(num_pages, num_chunks)
+    assert len(ranges) == min(num_pages, num_chunks)
+    assert [page for start, end in ranges for page in range(start, end)] == list(range(num_pages))
+    sizes = [end - start for start, end in ranges]
+    assert max(sizes) - min(sizes) <= 1
+
+
+@pytest.mark.parametrize("backend", ["pdfplumber", "pdfium"])
+def test_parallel_read_matches_sequential(backend):
+    pdf = repeated_pdf(3)
+    sequential, sequential_info = PDFReader(backend=backend).read_pages(pdf)
+    reader = PDFReader(workers=2, min_pages_parallel=2, backend=backend)
+    try:
+        pages, info = reader.read_pages(pdf)
+    finally:
+        reader.close()
+    assert pages == sequential
+    assert (info["pages"], info["pages_read"], info["workers"]) == (9, 9, 2)
+    assert sequential_info["workers"] == 1
+
+
+def test_few_pages_stay_sequential():
+    reader = PDFReader(workers=2, backend="pdfplumber")
+    try:
+        _, info = reader.read_pages(LONG_PDF)
+    finally:
+        reader.close()
+    # 3 pages < DEFAULT_MIN_PAGES_PARALLEL : pas de pool de processus
+    assert info["workers"] == 1 and reader._executor is None
+
+
+@pytest.mark.parametrize("profile, expected", [
+    ("complet", list(range(10))),
+    ("entete", [0]),
+    ("general", [0, 1, 9]),
+    ("legal", [0, 1, 2, 9]),
+    ({"first_pages": 20, "last_pages": 5}, list(range(10))),
+    ({"first_pages": 0, "last_pages": 2}, [8, 9]),
+])
+def test_select_pages(profile, expected):
+    assert select_pages(10, resolve_profile(profile)) == expected
+
+
+def test_resolve_profile():
+    assert resolve_profile(None) == resolve_profile("complet")
+    # Dictionnaire partiel : complété par le profil complet
+    assert resolve_profile({"crop": (0.0, 0.0, 1.0, 0.5)}) == {"first_pages": None, "last_pages": None,
+                                                                 "crop": (0.0, 0.0, 1.0, 0.5)}
+    with pytest.raises(ValueError):
+        resolve_profile("inconnu")
+
+
+@pytest.mark.parametrize("backend", ["pdfplumber", "pdfium", "pdfminer"])
+def test_crop_keeps_top_of_first_page(backend):
+    full, _ = PDFReader(backend="pdfplumber").read_pages(LONG_PDF)
+    profile = {"first_pages": 1, "last_pages": 0, "crop": (0.0, 0.0, 1.0, 0.1)}
+    pages, info = PDFReader(backend=backend).read_pages(LONG_PDF, profile)
+    assert (info["pages"], info["pages_read"]) == (3, 1)
+    assert pages == ["CHRU de Nancy - Rapport d'Analyse Judiciaire\nService : Biopathologie"]
+    assert full[0].startswith(pages[0])
+    # pdfminer ne sait pas recadrer : repli sur pdfplumber
+    assert info["backend"] == ("pdfplumber" if backend == "pdfminer" else backend)
+
+
+class UnseekableStream(io.RawIOBase):
+    """Flux lisible une seule fois (requête HTTP, pipe)."""
+
+    def __init__(self, data: bytes):
+        self.buffer = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        return self.buffer.readinto(target)
+
+
+def test_bytes_and_streams_read_like_paths():
+    data = Path(LONG_PDF).read_bytes()
+    reader = PDFReader(backend="pdfplumber")
+    expected, _ = reader.read(LONG_PDF)
+    assert reader.read(data)[0] == expected
+    stream = io.BytesIO(data)
+    stream.seek(10)
+    # Flux relu depuis le début
+    assert reader.read(stream)[0] == expected
+
+
+def test_extractor_accepts_bytes_and_streams():
+    extractor = MultiModelExtractor()
+    data = Path(LONG_PDF).read_bytes()
+    expected = extractor.extract_from_pdf(LONG_PDF)
+    fields = [field for field in expected if field != "_metadata"]
+    for result in (extractor.extract_from_bytes(data), extractor.extract_from_stream(io.BytesIO(data)),
+                   extractor.extract_from_stream(UnseekableStream(data)), extractor.extract_document(data)):
+        assert {field: result[field] for field in fields} == {field: expected[field] for field in fields}
+
+
+@pytest.fixture
+def growing_memory(monkeypatch):
+    """RSS simulée : 100 Mo, puis +30 Mo par page extraite par pdfplumber."""
+    extracted = []
+    page_text = pdf_backends._PdfplumberDocument.page_text
+
+    def counting_page_text(document, index, crop=None):
+        extracted.append(index)
+        return page_text(document, index, crop)
+
+    monkeypatch.setattr(pdf_backends._PdfplumberDocument, "page_text", counting_page_text)
+    monkeypatch.setattr(pdf_reader, "current_rss_mb", lambda: 100.0 + 30 * len(extracted))
+
+
+def test_memory_ceiling_degrades_to_pages_read(growing_memory):
+    pdf = repeated_pdf(2)
+    full, _ = PDFReader(backend="pdfplumber").read_pages(pdf)
+    pages, info = PDFReader(backend="pdfplumber", max_memory_mb=50).read_pages(pdf)
+    # Mesures après chaque page : +30 puis +60 Mo, arrêt après la deuxième page
+    assert pages == full[:2]
+    assert (info["pages"], info["pages_read"], info["truncated"]) == (6, 2, True)
+    assert info["peak_memory_mb"] > 150
+
+
+def test_memory_ceiling_aborts(growing_memory):
+    reader = PDFReader(backend="pdfplumber", max_memory_mb=50, memory_policy="abort")
+    with pytest.raises(MemoryBudgetExceeded, match="page 2"):
+        reader.read_pages(repeated_pdf(2))
+
+
+def test_memory_ceiling_stops_page_iteration(growing_memory):
+    stats = {}
+    pages = list(PDFReader(backend="pdfplumber", max_memory_mb=50).iter_pages(repeated_pdf(2), stats=stats))
+    assert len(pages) == 2 and stats["truncated"]
+
+
+def test_extractor_reports_memory_truncation(growing_memory):
+    metadata = MultiModelExtractor(max_memory_mb=50).extract_from_pdf(repeated_pdf(2))["_metadata"]
+    assert metadata["memory_truncated"] and metadata["pdf_pages_read"] == 2
+    aborted = MultiModelExtractor(max_memory_mb=50, memory_policy="abort").extract_document(repeated_pdf(2))
+    assert aborted["_metadata"]["status"] == "error" and "plafond mémoire" in aborted["_metadata"]["error"]
+
+
+def test_unknown_memory_policy():
+    with pytest.raises(ValueError):
+        PDFReader(memory_policy="ignore")
+
+
+def blank_pdf(pages: int = 2) -> bytes:
+    """PDF scanné simulé : pages sans aucun texte."""
+    document = pdfium.PdfDocument.new()
+    for _ in range(pages):
+        document.new_page(595, 842)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("backend", ["pdfplumber", "pdfminer", "pdfium"])
+def test_pdf_without_text_layer_is_not_laid_out(backend):
+    pages, info = PDFReader(backend=backend).read_pages(blank_pdf())
+    assert pages == [] and (info["pages"], info["pages_read"], info["text_layer"]) == (2, 0, False)
+    stats = {}
+    assert list(PDFReader(backend=backend).iter_pages(blank_pdf(), stats=stats)) == []
+    assert stats["text_layer"] is False
+    with pdf_backends.get_backend(backend).open(LONG_PDF) as document:
+        assert document.has_text_layer(list(range(document.page_count)))
+
+
+def test_blank_first_page_keeps_text_layer():
+    source = pdfium.PdfDocument(io.BytesIO(blank_pdf(1)))
+    source.import_pages(pdfium.PdfDocument(LONG_PDF))
+    buffer = io.BytesIO()
+    source.save(buffer)
+    pages, info = PDFReader(backend="pdfplumber").read_pages(buffer.getvalue())
+    assert info["text_layer"] and info["pages_read"] == 4 and pages[0] == ""
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_extractor_skips_pdf_without_text_layer(streaming):
+    result = MultiModelExtractor(streaming=streaming).extract_from_pdf(blank_pdf())
+    metadata = result["_metadata"]
+    assert metadata["status"] == "no_text_layer"
+    # Aucune étape lancée, NER compris
+    assert all(stage["runs"] == 0 for stage in metadata["cascade"]["stages"].values())
+    assert metadata["pdf_pages"] == 2 and metadata["pdf_pages_read"] == 0
+    assert all(result[field] is None for field in result if field != "_metadata")
@@ -0,0 +1,113 @@
+"""Scanner regex en une passe : mêmes valeurs que la boucle re.search par pattern, avec re et RE2."""
+
+import random
+import re
+
+import pytest
+
+from core.fields import REGEX_PATTERNS
+from core.generator_vocab import GENERATORS, generate_texts
+from core.regex_scanner import DEFAULT_REGEX_FLAGS, LONG_LINE_CHARS, RE2_MIN_CHARS, RegexScanner, cap_lines, re2
+from extraction_enhanced import PATTERNS_REGEX
+
+ENGINES = ["re", pytest.param("re2", marks=pytest.mark.skipif(re2 is None, reason="google-re2 non installé"))]
+PATTERN_SETS = {"core": REGEX_PATTERNS, "pdf_extractor": PATTERNS_REGEX}
+
+PROSE = "le patient présente une évolution favorable du traitement, résultats conformes aux valeurs. "
+
+
+def loop_scan(patterns, text, fields=None):
+    """Référence : un re.search par pattern, dans l'ordre des champs et des patterns."""
+    results = {}
+    for field, pattern_list in patterns.items():
+        if fields is not None and field not in fields:
+            continue
+        for pattern in pattern_list:
+            match = re.search(pattern, text, DEFAULT_REGEX_FLAGS)
+            if match:
+                value = (match.group(1) if match.re.groups else match.group(0)).strip()
+                if len(value) > 1:
+                    results[field] = value
+                    break
+    return results
+
+
+def sample_texts():
+    random.seed(0)
+    texts = [text for domain in GENERATORS for text in generate_texts(domain, 20)]
+    # Textes longs (passage par RE2 s'il est installé) : étiquettes en fin de texte, après de la prose
+    texts += [PROSE * (RE2_MIN_CHARS // len(PROSE) + 1) + text for text in texts[::10]]
+    texts += ["", "Nom :", "date date date 12/03/2024", "RÉFÉRENCE: AB-1234\nnom: Dupont Jean"]
+    return texts
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("pattern_set", PATTERN_SETS)
+def test_scan_matches_pattern_loop(pattern_set, engine):
+    patterns = PATTERN_SETS[pattern_set]
+    scanner = RegexScanner(patterns, engine=engine)
+    for text in sample_texts():
+        assert scanner.scan(text) == loop_scan(patterns, text), text
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_scan_restricted_fields(engine):
+    scanner = RegexScanner(REGEX_PATTERNS, engine=engine)
+    fields = list(REGEX_PATTERNS)[1::2]
+    for text in sample_texts():
+        assert scanner.scan(text, fields) == loop_scan(REGEX_PATTERNS, text, fields)
+
+
+def test_budget_exhausted_returns_nothing():
+    scanner = RegexScanner(REGEX_PATTERNS, engine="re")
+    assert scanner.scan_with_budget("Nom : Dupont Jean", budget_s=0) == ({}, True)
+
+
+def test_cap_lines_bounds_line_length():
+    text = "nom " * 5000 + "\ncourte ligne"
+    capped = cap_lines(text, 1000)
+    assert max(len(line) for line in capped.split("\n")) <= 1000
+    assert capped.replace("\n", " ").split() == text.replace("\n", " ").split()
+
+
+def test_cap_lines_breaks_only_at_blanks():
+    word = "A" * 1500
+    text = "Nom : " + word + " suite\tde " + "mots " * 400
+    capped = cap_lines(text, 1000)
+    # Même longueur, seuls des blancs deviennent des sauts de ligne ; le mot trop long reste entier
+    assert len(capped) == len(text)
+    assert all(a == b or (a.isspace() and b == "\n") for a, b in zip(text, capped))
+    lines = capped.split("\n")
+    assert word in lines
+    assert max(len(line) for line in lines if line != word) <= 1000
+
+
+def test_small_budget_interrupts_long_line():
+    scanner = RegexScanner(REGEX_PATTERNS, engine="re")
+    text = "Nom : DUPONT " * (20 * LONG_LINE_CHARS)
+    assert scanner.scan_with_budget(text, budget_s=1e-6) == ({}, True)
+    results, interrupted = scanner.scan_with_budget(text, budget_s=None)
+    assert not interrupted and results == loop_scan(REGEX_PATTERNS, cap_lines(text))
+
+
+@pytest.mark.skipif(re2 is None, reason="google-re2 non installé")
+def test_only_re_patterns_see_capped_lines():
+    # Premier pattern accepté par RE2, second (\b) laissé au moteur re
+    patterns = {"service_demandeur": [r"Service\s*:\s*([^:\n]+)$"], "nom_prenom": [r"\bNom\s*:\s*([A-Z]+)"]}
+    scanner = RegexScanner(patterns, engine="re2")
+    text = "suite " * 1000 + "Service : Cardiologie " + "adulte " * 1000 + "\nNom : DUPONT"
+    assert cap_lines(text) != text
+    results, interrupted = scanner.scan_with_budget(text, budget_s=None)
+    # Valeur RE2 entière malgré la coupe des lignes du moteur re
+    assert not interrupted and results == loop_scan(patterns, text)
+
+
+@pytest.mark.parametrize("text", ["Doſſier : AB-1234\nNom : DUPONT JEAN",
+                                  "Dossıer : AB-1234\nNom : DUPONT JEAN",
+                                  "İdentité : DUPONT JEAN\nRéférence : AB-1234",
+                                  "Straße 12\nSERVİCE : Cardiologie\nNom : DUPONT JEAN"])
+def test_scan_folds_case_like_ignorecase(text):
+    # « ſ » et « ı » : casse de base de même longueur ; « İ », « ß » : longueur différente
+    expected = loop_scan(REGEX_PATTERNS, text)
+    assert len(expected) >= 2
+    assert RegexScanner(REGEX_PATTERNS, engine="re").scan(text) == expected
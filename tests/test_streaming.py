@@ -0,0 +1,45 @@
+"""Lecture page par page : mêmes résultats que l'extraction complète, métadonnées de lecture renseignées."""
+
+from pathlib import Path
+
+import pytest
+
+from core.cascade import MODEL_FIRST_CASCADE
+from core.extraction_system import MultiModelExtractor
+
+SAMPLE_PDFS = sorted(str(path) for path in (Path(__file__).resolve().parent.parent / "test_files").glob("*.pdf"))
+
+
+def fields(result):
+    return {field: value for field, value in result.items() if field != "_metadata"}
+
+
+@pytest.mark.parametrize("pdf", SAMPLE_PDFS, ids=lambda path: Path(path).name)
+@pytest.mark.parametrize("options", [{}, {"label_fast_path": False}, {"cascade": MODEL_FIRST_CASCADE}],
+                         ids=["cost_ordered", "no_labels", "model_first"])
+def test_streaming_matches_full_extraction(pdf, options):
+    full = MultiModelExtractor(**options).extract_from_pdf(pdf)
+    streamed = MultiModelExtractor(streaming=True, **options).extract_from_pdf(pdf)
+    assert fields(streamed) == fields(full)
+    assert streamed["_metadata"]["field_sources"] == full["_metadata"]["field_sources"]
+
+
+def test_regex_hit_does_not_hide_later_label():
+    # Page 1 : « Objet : Judiciaire » (regex) ; étiquette du type de prélèvement plus loin
+    pdf = str(Path(__file__).resolve().parent.parent / "test_files" / "rapport_long_etendu.pdf")
+    result = MultiModelExtractor(streaming=True).extract_from_pdf(pdf)
+    assert result["type_prelevement"] == "Réquisition judiciaire pour analyse"
+    assert result["_metadata"]["field_sources"]["type_prelevement"] == "labels"
+
+
+@pytest.mark.parametrize("pdf", SAMPLE_PDFS, ids=lambda path: Path(path).name)
+def test_streaming_read_metadata(pdf):
+    metadata = MultiModelExtractor(streaming=True).extract_from_pdf(pdf)["_metadata"]
+    full_metadata = MultiModelExtractor().extract_from_pdf(pdf)["_metadata"]
+    for key in ("pdf_pages", "pdf_backend", "pdf_cache", "pdf_workers"):
+        assert metadata[key] is not None
+        assert metadata[key] == full_metadata[key]
+    assert metadata["pdf_pages_read"] <= metadata["pdf_pages"]
+    if metadata["early_stop"]:
+        # Arrêt anticipé : les étiquettes ont rempli les cinq champs
+        assert list(metadata["field_sources"].values()) == ["labels"] * 5
@@ -0,0 +1,94 @@
+"""Cache disque du texte des PDF : clés, écriture atomique et éviction LRU."""
+
+import io
+import os
+import threading
+
+from core import text_cache
+from core.text_cache import TextCache, source_sha256
+
+PAGES = ["Nom : DUPONT Jean\nDate de prélèvement : 12/03/2024", "Page 2"]
+INFO = {"pages": 2, "backend": "pdfminer"}
+
+
+def entries(cache):
+    return sorted(path.name for path in cache.cache_dir.iterdir())
+
+
+def test_put_get_round_trip(tmp_path):
+    cache = TextCache(tmp_path)
+    key = cache.make_key("abc", {"backend": "pdfminer", "profile": "complet"})
+    assert cache.get(key) is None
+    cache.put(key, PAGES, INFO)
+    assert cache.get(key) == (PAGES, INFO)
+    # Paramètres de lecture différents : autre entrée
+    assert cache.make_key("abc", {"backend": "pdfplumber", "profile": "complet"}) != key
+
+
+def test_source_sha256_same_for_all_sources(tmp_path):
+    data = b"%PDF-1.4 contenu"
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(data)
+    stream = io.BytesIO(data)
+    assert source_sha256(data) == source_sha256(str(path)) == source_sha256(stream)
+    # Flux rembobiné pour la lecture qui suit
+    assert stream.tell() == 0
+
+
+def test_failed_write_keeps_previous_entry(tmp_path, monkeypatch):
+    cache = TextCache(tmp_path)
+    key = cache.make_key("abc", {})
+    cache.put(key, PAGES, INFO)
+
+    def fail(*args):
+        raise OSError("disque plein")
+
+    monkeypatch.setattr(text_cache.os, "replace", fail)
+    cache.put(key, ["autre texte"], {})
+    assert cache.get(key) == (PAGES, INFO)
+    # Fichier temporaire supprimé
+    assert entries(cache) == [f"{key}.json.z"]
+
+
+def test_concurrent_writers_leave_complete_entries(tmp_path):
+    cache = TextCache(tmp_path)
+    key = cache.make_key("abc", {})
+    versions = [[f"version {i} " * 2000] for i in range(8)]
+    threads = [threading.Thread(target=cache.put, args=(key, pages, {})) for pages in versions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pages, _ = cache.get(key)
+    assert pages in versions
+    assert entries(cache) == [f"{key}.json.z"]
+
+
+def test_corrupted_entry_is_ignored(tmp_path):
+    cache = TextCache(tmp_path)
+    key = cache.make_key("abc", {})
+    (tmp_path / f"{key}.json.z").write_bytes(b"pas du zlib")
+    assert cache.get(key) is None
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = TextCache(tmp_path)
+    keys = [cache.make_key(str(i), {}) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, [f"document {i} " + os.urandom(2000).hex()], {})
+        os.utime(cache._path(key), (1000 + i, 1000 + i))
+    size = cache._path(keys[0]).stat().st_size
+    # Le plus ancien est relu : il devient le plus récent
+    assert cache.get(keys[0]) is not None
+    cache.max_bytes = int(size * 2.5)
+    cache.evict()
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+
+
+def test_clear(tmp_path):
+    cache = TextCache(tmp_path)
+    cache.put(cache.make_key("abc", {}), PAGES, INFO)
+    (tmp_path / "autre.txt").write_text("garde")
+    cache.clear()
+    assert entries(cache) == ["autre.txt"]
@@ -0,0 +1,126 @@
+"""Vocabulaire borné : rechargement en arrière-plan au-delà de la croissance maximale, puis substitution."""
+
+import threading
+
+import spacy
+
+from core.extraction_system import MultiModelExtractor
+from core.model_registry import ModelRegistry
+from core.vocab_guard import VocabGuard
+from extraction_enhanced import PDFExtractor
+
+
+class SlowLoader:
+    """Recharge un pipeline vierge, après le feu vert du test (rechargement en cours observable)."""
+
+    def __init__(self, fail=False):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+        self.fail = fail
+
+    def __call__(self, path=None):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(10)
+        if self.fail:
+            raise OSError("modèle illisible")
+        return spacy.blank("fr")
+
+
+def grow(nlp, count):
+    for index in range(count):
+        nlp.vocab.strings.add(f"mot-inconnu-{index}")
+
+
+def test_no_reload_below_max_growth():
+    nlp = spacy.blank("fr")
+    guard = VocabGuard(SlowLoader(), nlp, max_growth=100)
+    grow(nlp, 50)
+    assert guard.check(nlp) is False
+    assert guard.stats()["growth"] == 50 and guard.reloads == 0
+
+
+def test_reload_runs_in_background_then_swaps():
+    loader = SlowLoader()
+    nlp = spacy.blank("fr")
+    guard = VocabGuard(loader, nlp, max_growth=100)
+    swapped = []
+    grow(nlp, 150)
+
+    # Rendu sans attendre le chargement ; un second appel ne lance pas d'autre rechargement
+    assert guard.check(nlp, lambda old, new: swapped.append((old, new))) is True
+    assert guard.check(nlp) is False
+    assert swapped == [] and guard.nlp is nlp
+
+    loader.release.set()
+    guard.wait(10)
+    assert loader.calls == 1 and guard.reloads == 1
+    assert swapped == [(nlp, guard.nlp)] and guard.nlp is not nlp
+    assert guard.growth() == 0
+    # Ancien pipeline : déjà remplacé
+    assert guard.check(nlp) is False
+
+
+def test_failed_reload_waits_for_new_growth():
+    loader = SlowLoader(fail=True)
+    loader.release.set()
+    nlp = spacy.blank("fr")
+    guard = VocabGuard(loader, nlp, max_growth=100)
+    grow(nlp, 150)
+    assert guard.check(nlp) is True
+    guard.wait(10)
+    assert guard.nlp is nlp and guard.reloads == 0
+    assert guard.check(nlp) is False
+
+
+def test_registry_replace_ignores_unloaded_model():
+    registry = ModelRegistry(lambda path: spacy.blank("fr"))
+    registry.register("general", "general")
+    old = registry["general"]
+    new = spacy.blank("fr")
+    assert registry.replace("general", old, new) is True
+    assert registry.peek("general") is new
+    # Le rechargement d'un pipeline qui n'est plus celui du registre est ignoré
+    assert registry.replace("general", old, spacy.blank("fr")) is False
+    assert registry.peek("general") is new
+
+
+def test_extractor_keeps_serving_during_reload(tmp_path):
+    spacy.blank("fr").to_disk(tmp_path / "model")
+    extractor = PDFExtractor(str(tmp_path / "model"), max_vocab_growth=100)
+    loader = SlowLoader()
+    extractor.vocab_guard.loader = loader
+    old = extractor.nlp
+    grow(old, 150)
+
+    # Dépassement constaté après le document : l'extraction rend son résultat sans attendre
+    result = extractor.extract_document("Nom : DUPONT JEAN\nRéférence : AB-1234")
+    assert result["nom_prenom"] == "DUPONT JEAN"
+    assert loader.started.wait(10) and extractor.nlp is old
+
+    loader.release.set()
+    extractor.vocab_guard.wait(10)
+    assert extractor.nlp is not old and extractor.nlp is extractor.vocab_guard.nlp
+    assert extractor.get_vocab_stats()["reloads"] == 1
+
+
+def test_multi_model_extractor_swaps_registry_model():
+    extractor = MultiModelExtractor(max_vocab_growth=100)
+    extractor.models = ModelRegistry(lambda path: spacy.blank("fr"), on_load=extractor._watch_vocab,
+                                     on_evict=extractor._forget_vocab)
+    extractor.models.register("general", "general")
+    extractor.model_info = {"general": {"name": "general", "path": "general", "description": "", "type": "trained"}}
+    extractor.current_model = "general"
+    old = extractor.models["general"]
+    guard = extractor.vocab_guards["general"]
+    loader = SlowLoader()
+    guard.loader = loader
+    grow(old, 150)
+
+    extractor.check_vocab()
+    assert loader.started.wait(10) and extractor.models.peek("general") is old
+    loader.release.set()
+    guard.wait(10)
+    assert guard.nlp is not old and extractor.models.peek("general") is guard.nlp
+    assert extractor.get_vocab_stats()["general"]["reloads"] == 1
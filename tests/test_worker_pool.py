@@ -0,0 +1,42 @@
+"""Pool pré-forké : un worker arrêté en cours de document est remplacé et le pool continue."""
+
+import os
+import time
+
+import pytest
+
+from core.worker_pool import WorkerPool
+
+
+class CrashingExtractor:
+    """Extracteur factice : « crash » arrête le worker, les autres documents renvoient le pid."""
+
+    def preload_models(self, preload=None):
+        return []
+
+    def extract_document(self, item):
+        if item == "crash":
+            # Laisse le message « start » parvenir au parent avant l'arrêt
+            time.sleep(0.3)
+            os._exit(3)
+        return {"item": item, "pid": os.getpid()}
+
+
+def test_pool_recovers_from_worker_crash():
+    with WorkerPool(2, extractor=CrashingExtractor(), factory=CrashingExtractor) as pool:
+        initial = {process.pid for process in pool._processes}
+        crashed = pool.submit("crash")
+        with pytest.raises(RuntimeError, match="arrêté"):
+            crashed.result(timeout=30)
+
+        items = [f"doc{index}" for index in range(8)]
+        results = list(pool.map(items))
+        assert [result["item"] for result in results] == items
+
+        deadline = time.monotonic() + 30
+        while len([process for process in pool._processes if process.is_alive()]) < 2:
+            assert time.monotonic() < deadline
+            time.sleep(0.1)
+        replacements = {process.pid for process in pool._processes} - initial
+        assert len(replacements) == 1
+        assert set(pool.memory()) >= replacements
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Distillation d'un modèle NER entraîné (enseignant) vers un modèle compact (élève).
+
+L'enseignant (models/<domaine>_model, basé sur fr_core_news_md) annote un grand
+corpus de textes synthétiques et de PDF non annotés ; l'élève, un pipeline
+« ner » seul avec un tok2vec à hash-embeddings étroit et sans vecteurs statiques,
+apprend à reproduire ces annotations. Un rapport compare ensuite F1 et débit
+des deux modèles sur des exemples synthétiques annotés jamais vus.
+
+    python -m training.distill --domain medical
+    python -m training.distill --domain legal --examples 20000 --unlabeled training/data/raw
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import spacy
+from spacy.language import Language
+from spacy.training import Example
+from spacy.util import minibatch
+
+from core.chunking import split_chunks
+from core.generator_vocab import GENERATORS, generate_examples, generate_texts
+from core.nlp_profiles import load_pipeline
+from core.pdf_reader import PDFReader
+
+# Élève : tok2vec étroit, hash-embeddings sur NORM/PREFIX/SUFFIX/SHAPE, sans vecteurs statiques
+STUDENT_TOK2VEC = {
+    "@architectures": "spacy.HashEmbedCNN.v2",
+    "width": 64,
+    "depth": 2,
+    "embed_size": 2000,
+    "window_size": 1,
+    "maxout_pieces": 2,
+    "subword_features": True,
+    "pretrained_vectors": None
+}
+
+STUDENT_NER = {
+    "@architectures": "spacy.TransitionBasedParser.v2",
+    "state_type": "ner",
+    "extra_state_tokens": False,
+    "hidden_width": 64,
+    "maxout_pieces": 2,
+    "use_upper": True,
+    "nO": None,
+    "tok2vec": STUDENT_TOK2VEC
+}
+
+# Taille des extraits de PDF non annotés soumis à l'enseignant, en caractères
+UNLABELED_CHUNK_CHARS = 2000
+
+
+def student_model_path(domain: str) -> Path:
+    """Dossier de l'élève d'un domaine (identifiant "<domaine>_compact" dans MultiModelExtractor)."""
+    return Path("models") / f"{domain}_compact_model"
+
+
+def unlabeled_texts(directory: str) -> List[str]:
+    """Extraits des PDF d'un dossier, découpés en morceaux courts."""
+    reader = PDFReader()
+    texts = []
+    for path in sorted(Path(directory).glob("*.pdf")):
+        try:
+            text, _ = reader.read(str(path))
+        except Exception as e:
+            print(f"⚠️ PDF ignoré {path.name}: {e}")
+            continue
+        texts.extend(text[start:end] for start, end in split_chunks(text, UNLABELED_CHUNK_CHARS) if text[start:end].strip())
+    return texts
+
+
+def teacher_annotations(teacher: Language, texts: List[str]) -> List[Tuple[str, Dict]]:
+    """Annotations de l'enseignant, au format des générateurs."""
+    annotated = []
+    for text, doc in zip(texts, teacher.pipe(texts, batch_size=64)):
+        annotated.append((text, {"entities": [(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents]}))
+    return annotated
+
+
+def create_student(teacher: Language) -> Language:
+    """Pipeline élève : tokenizer de l'enseignant et composant NER compact."""
+    student = spacy.blank(teacher.lang)
+    # Même tokenisation que l'enseignant : ses annotations restent alignées sur les tokens
+    student.tokenizer.from_bytes(teacher.tokenizer.to_bytes(exclude=["vocab"]))
+    ner = student.add_pipe("ner", config={"model": STUDENT_NER})
+    for label in teacher.get_pipe("ner").labels:
+        ner.add_label(label)
+    return student
+
+
+def make_examples(nlp: Language, annotated: List[Tuple[str, Dict]]) -> List[Example]:
+    """Exemples spaCy dont la référence porte les entités annotées (les entités non alignées sont ignorées)."""
+    examples = []
+    for text, annotations in annotated:
+        doc = nlp.make_doc(text)
+        reference = nlp.make_doc(text)
+        spans = [reference.char_span(start, end, label=label, alignment_mode="contract")
+                 for start, end, label in annotations["entities"]]
+        reference.ents = spacy.util.filter_spans([span for span in spans if span is not None])
+        examples.append(Example(doc, reference))
+    return examples
+
+
+def docs_per_second(nlp: Language, texts: List[str], repeats: int = 3) -> float:
+    """Débit d'un pipeline sur un cœur (nlp.pipe, meilleur de plusieurs passages)."""
+    list(nlp.pipe(texts[:16]))
+    best = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in nlp.pipe(texts, batch_size=64):
+            pass
+        best = max(best, len(texts) / (time.perf_counter() - start))
+    return best
+
+
+def model_size_mb(path: Path) -> float:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file()) / (1024 * 1024)
+
+
+def distill(domain: str, teacher_path: str, output_dir: Path, examples: int, eval_examples: int,
+            unlabeled_dir: str, epochs: int, seed: int) -> Dict:
+    """Distille l'enseignant dans un élève compact et retourne le rapport."""
+    random.seed(seed)
+    spacy.util.fix_random_seed(seed)
+
+    print(f"👩‍🏫 Enseignant: {teacher_path}")
+    teacher = load_pipeline(teacher_path)
+
+    # 1. Corpus : textes synthétiques du domaine et PDF non annotés
+    texts = generate_texts(domain, examples)
+    if unlabeled_dir and Path(unlabeled_dir).exists():
+        pdf_texts = unlabeled_texts(unlabeled_dir)
+        print(f"📄 {len(pdf_texts)} extrait(s) de PDF non annotés")
+        texts.extend(pdf_texts)
+
+    # 2. Annotations de l'enseignant
+    start = time.perf_counter()
+    annotated = teacher_annotations(teacher, texts)
+    print(f"🏷️ {len(annotated)} textes annotés par l'enseignant en {time.perf_counter() - start:.1f} s")
+
+    # 3. Entraînement de l'élève, l'époque la plus fidèle à l'enseignant est gardée
+    student = create_student(teacher)
+    random.shuffle(annotated)
+    split = max(1, int(len(annotated) * 0.9))
+    train_examples = make_examples(student, annotated[:split])
+    dev_examples = make_examples(student, annotated[split:]) or train_examples[:100]
+    optimizer = student.initialize(lambda: train_examples)
+
+    best_f1, best_state = -1.0, None
+    for epoch in range(epochs):
+        random.shuffle(train_examples)
+        losses = {}
+        for batch in minibatch(train_examples, size=32):
+            student.update(batch, drop=0.1, losses=losses, sgd=optimizer)
+        agreement = student.evaluate(dev_examples)["ents_f"] or 0.0
+        print(f"Époque {epoch + 1}/{epochs} - perte NER: {losses.get('ner', 0):.2f} - accord enseignant F1: {agreement:.3f}")
+        if agreement > best_f1:
+            best_f1, best_state = agreement, student.to_bytes()
+    student.from_bytes(best_state)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    student.to_disk(output_dir)
+
+    # 4. Rapport : F1 sur des exemples annotés jamais vus, débit sur un cœur
+    gold = generate_examples(domain, eval_examples)
+    eval_texts = [text for text, _ in gold]
+    teacher_scores = teacher.evaluate(make_examples(teacher, gold))
+    student_scores = student.evaluate(make_examples(student, gold))
+    teacher_speed = docs_per_second(teacher, eval_texts)
+    student_speed = docs_per_second(student, eval_texts)
+    report = {
+        "domain": domain,
+        "teacher": {
+            "path": teacher_path,
+            "components": list(teacher.pipe_names),
+            "f1": round(teacher_scores["ents_f"] or 0.0, 4),
+            "docs_per_second": round(teacher_speed, 1),
+            "size_mb": round(model_size_mb(Path(teacher_path)), 1)
+        },
+        "student": {
+            "path": str(output_dir),
+            "components": list(student.pipe_names),
+            "f1": round(student_scores["ents_f"] or 0.0, 4),
+            "precision": round(student_scores["ents_p"] or 0.0, 4),
+            "recall": round(student_scores["ents_r"] or 0.0, 4),
+            "docs_per_second": round(student_speed, 1),
+            "size_mb": round(model_size_mb(output_dir), 1)
+        },
+        "teacher_agreement_f1": round(best_f1, 4),
+        "speedup": round(student_speed / teacher_speed, 2) if teacher_speed else None,
+        "training_texts": len(train_examples),
+        "eval_examples": len(gold)
+    }
+
+    metadata = {
+        "model_type": domain,
+        "model_name": f"Modèle {domain} compact (distillé)",
+        "description": f"Élève compact distillé depuis {teacher_path}",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "version": "1.0.0",
+        "labels": list(student.get_pipe("ner").labels),
+        "training_info": {
+            "framework": "spaCy",
+            "base_model": None,
+            "teacher": teacher_path,
+            "training_examples": len(train_examples),
+            "epochs": epochs
+        },
+        "performance": {
+            "precision": report["student"]["precision"],
+            "recall": report["student"]["recall"],
+            "f1_score": report["student"]["f1"]
+        }
+    }
+    with open(output_dir / "model_info.json", "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    with open(output_dir / "distillation_report.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distillation d'un modèle NER en modèle compact")
+    parser.add_argument("--domain", choices=sorted(GENERATORS), default="general", help="Domaine du modèle")
+    parser.add_argument("--teacher", help="Modèle enseignant (défaut: models/<domaine>_model)")
+    parser.add_argument("--output", help="Dossier de l'élève (défaut: models/<domaine>_compact_model)")
+    parser.add_argument("--examples", type=int, default=5000, help="Textes synthétiques annotés par l'enseignant")
+    parser.add_argument("--eval-examples", type=int, default=500, help="Exemples annotés pour le rapport")
+    parser.add_argument("--unlabeled", default="training/data/raw", help="Dossier de PDF non annotés")
+    parser.add_argument("--epochs", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    teacher_path = args.teacher or f"models/{args.domain}_model"
+    output_dir = Path(args.output) if args.output else student_model_path(args.domain)
+    try:
+        report = distill(args.domain, teacher_path, output_dir, args.examples, args.eval_examples,
+                         args.unlabeled, args.epochs, args.seed)
+    except Exception as e:
+        print(f"❌ Erreur lors de la distillation: {e}")
+        return False
+
+    teacher, student = report["teacher"], report["student"]
+    print(f"\n{'':<12} {'F1':>7} {'doc/s':>9} {'taille':>9}")
+    print(f"{'enseignant':<12} {teacher['f1']:>7.3f} {teacher['docs_per_second']:>9.1f} {teacher['size_mb']:>6.1f} Mo")
+    print(f"{'élève':<12} {student['f1']:>7.3f} {student['docs_per_second']:>9.1f} {student['size_mb']:>6.1f} Mo")
+    print(f"⚡ Accélération: x{report['speedup']} - accord avec l'enseignant F1: {report['teacher_agreement_f1']:.3f}")
+    print(f"✅ Élève sauvegardé dans {output_dir} (rapport: distillation_report.json)")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Post-traitement d'un modèle entraîné : réduction de la table de vecteurs et
+retrait des tables de lemmatisation.
+
+Les modèles dérivés de fr_core_news_md embarquent toute la table de vecteurs
+du modèle de base. On ne garde que les lignes des mots rencontrés dans le
+corpus du domaine (données d'entraînement et textes des générateurs), et
+éventuellement les top-K lignes les plus fréquentes ; les autres mots sont
+remappés vers le vecteur conservé le plus proche (cosinus), comme le fait
+Vocab.prune_vectors. Les tables lemma_* et le lemmatizer, inutiles à
+l'extraction, sont retirés ; lexeme_norm est gardée (attribut NORM du tok2vec).
+
+Le modèle réduit est écrit à côté du modèle (dossier <modèle>_pruned par défaut) ;
+--in-place remplace le modèle, une fois le modèle réduit écrit et mesuré.
+
+    python -m training.scripts.prune_vectors models/medical_model
+    python -m training.scripts.prune_vectors models/general_model --top-k 20000 --output models/general_small
+    python -m training.scripts.prune_vectors models/legal_model --in-place
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy
+import spacy
+from spacy.language import Language
+from spacy.vectors import Mode, Vectors
+
+from core.generator_vocab import GENERATORS, generate_texts
+from core.memory import current_rss_mb
+from core.nlp_profiles import load_pipeline
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Données d'entraînement JSON ([texte, annotations]) utilisées comme corpus
+TRAINING_DATA_FILES = [
+    "training/data/spacy_format/train_data.json",
+    "training/data/medical_format/train_data.json",
+    "training/data/legal_format/train_data.json"
+]
+
+# Textes synthétiques ajoutés au corpus, par domaine
+GENERATED_TEXTS_PER_DOMAIN = 2000
+
+# Suffixe du dossier du modèle réduit, à côté du modèle (sans --output ni --in-place)
+PRUNED_SUFFIX = "_pruned"
+
+
+def corpus_texts(extra_files: Iterable[str] = (), generated_per_domain: int = GENERATED_TEXTS_PER_DOMAIN) -> List[str]:
+    """Textes du domaine : données d'entraînement existantes et textes des générateurs."""
+    texts = []
+    for path in list(TRAINING_DATA_FILES) + list(extra_files):
+        if not Path(path).exists():
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            texts.extend(text for text, _ in json.load(f))
+    for domain in GENERATORS:
+        texts.extend(generate_texts(domain, generated_per_domain))
+    return texts
+
+
+def corpus_keys(nlp: Language, texts: Iterable[str]) -> Set[int]:
+    """Clés de la table de vecteurs (attribut ORTH, NORM... de la table) des tokens du corpus."""
+    attr = nlp.vocab.vectors.attr
+    keys = set()
+    for text in texts:
+        keys.update(int(value) for value in nlp.make_doc(text).to_array([attr]).ravel())
+    return keys
+
+
+def prune_table(nlp: Language, keep_keys: Set[int], top_k: Optional[int] = None,
+                batch_size: int = 1024) -> Dict:
+    """
+    Réduit la table de vecteurs aux lignes des clés keep_keys et aux top_k premières lignes
+    (les plus fréquentes dans les modèles spaCy). Les clés retirées pointent vers la ligne
+    conservée la plus proche.
+    """
+    vectors = nlp.vocab.vectors
+    rows_before = vectors.shape[0]
+    if rows_before == 0:
+        return {"rows_before": 0, "rows_after": 0, "remapped_keys": 0}
+    if vectors.mode != Mode.default:
+        raise ValueError(f"Table de vecteurs {vectors.mode} : réduction non supportée")
+
+    key2row = {int(key): int(row) for key, row in vectors.key2row.items()}
+    keep_rows = set(range(min(top_k or 0, rows_before)))
+    keep_rows.update(key2row[key] for key in keep_keys if key in key2row)
+    if not keep_rows:
+        # Au moins une ligne : le tok2vec attend une table non vide
+        keep_rows = {0}
+    kept = sorted(keep_rows)
+    if len(kept) == rows_before:
+        return {"rows_before": rows_before, "rows_after": rows_before, "remapped_keys": 0}
+
+    new_row = {old: new for new, old in enumerate(kept)}
+    pruned = Vectors(strings=nlp.vocab.strings, data=numpy.ascontiguousarray(vectors.data[kept]),
+                     name=vectors.name, attr=vectors.attr)
+    tossed_keys = []
+    for key, row in key2row.items():
+        if row in new_row:
+            pruned.add(key, row=new_row[row])
+        else:
+            tossed_keys.append(key)
+
+    similarity = 0.0
+    if tossed_keys:
+        queries = numpy.ascontiguousarray(vectors.data[[key2row[key] for key in tossed_keys]])
+        _, best_rows, scores = pruned.most_similar(queries, batch_size=batch_size)
+        for key, rows in zip(tossed_keys, best_rows):
+            pruned.add(key, row=int(rows[0]))
+        similarity = float(numpy.mean(scores[:, 0]))
+
+    nlp.vocab.vectors = pruned
+    return {
+        "rows_before": rows_before,
+        "rows_after": len(kept),
+        "remapped_keys": len(tossed_keys),
+        "mean_remap_similarity": round(similarity, 3)
+    }
+
+
+def drop_lemmatizer(nlp: Language) -> Dict:
+    """Retire les tables lemma_* du vocabulaire et le composant lemmatizer (lexeme_norm est gardée)."""
+    tables = [name for name in nlp.vocab.lookups.tables if name.startswith("lemma_")]
+    for name in tables:
+        nlp.vocab.lookups.remove_table(name)
+    components = [name for name in nlp.pipe_names if nlp.get_pipe_meta(name).factory == "lemmatizer"]
+    for name in components:
+        nlp.remove_pipe(name)
+    return {"lookups_removed": tables, "components_removed": components}
+
+
+def model_size_mb(path: Path) -> float:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file()) / (1024 * 1024)
+
+
+def _measure_load(path: str) -> Dict:
+    """Temps de chargement et RSS du modèle (exécuté dans un processus neuf)."""
+    # Initialisation de spaCy (registres, classe de langue) hors mesure
+    spacy.blank(spacy.util.load_config(Path(path) / "config.cfg")["nlp"]["lang"])
+    rss_start = current_rss_mb()
+    start = time.perf_counter()
+    load_pipeline(path)
+    return {"load_s": round(time.perf_counter() - start, 2), "rss_mb": round(current_rss_mb() - rss_start, 1)}
+
+
+def measure_load(path: Path) -> Dict:
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_measure_load, (str(path),))
+
+
+def replace_directory(staging: Path, target: Path):
+    """
+    Remplace target par staging (même dossier parent) par renommages : à tout moment, l'ancien
+    ou le nouveau modèle est complet sur le disque, et l'ancien est rétabli si le remplacement échoue.
+    """
+    if not target.exists():
+        staging.rename(target)
+        return
+    previous = target.with_name(target.name + ".previous")
+    if previous.exists():
+        shutil.rmtree(previous)
+    target.rename(previous)
+    try:
+        staging.rename(target)
+    except Exception:
+        previous.rename(target)
+        raise
+    shutil.rmtree(previous)
+
+
+def prune_model(model_path: str, output_path: Optional[str] = None, top_k: Optional[int] = None,
+                keep_lemmatizer: bool = False, extra_files: Iterable[str] = (), in_place: bool = False) -> Dict:
+    """
+    Réduit un modèle et retourne le rapport (taille, chargement, RSS avant/après).
+
+    Args:
+        model_path: Modèle à réduire
+        output_path: Dossier du modèle réduit (None = <modèle>_pruned, à côté du modèle)
+        top_k: Lignes les plus fréquentes à garder en plus des mots du corpus
+        keep_lemmatizer: Garder le lemmatizer et ses tables
+        extra_files: Fichiers JSON ([texte, annotations]) à ajouter au corpus
+        in_place: Remplacer le modèle par le modèle réduit (incompatible avec output_path)
+    """
+    source = Path(model_path)
+    if in_place and output_path:
+        raise ValueError("--output et --in-place sont incompatibles")
+    if in_place:
+        target = source
+    else:
+        target = Path(output_path) if output_path else source.with_name(source.name + PRUNED_SUFFIX)
+        if target.resolve() == source.resolve():
+            raise ValueError(f"{target} est le modèle d'origine : utilisez --in-place pour le remplacer")
+    before = {"size_mb": round(model_size_mb(source), 1), **measure_load(source)}
+
+    nlp = spacy.load(source)
+    keys = corpus_keys(nlp, corpus_texts(extra_files))
+    report = {"model": str(source), "output": str(target), "corpus_keys": len(keys), "top_k": top_k}
+    report["vectors"] = prune_table(nlp, keys, top_k)
+    report.update(drop_lemmatizer(nlp) if not keep_lemmatizer else {"lookups_removed": [], "components_removed": []})
+    logger.info(f"✂️ Vecteurs: {report['vectors']['rows_before']} -> {report['vectors']['rows_after']} lignes, "
+                f"tables retirées: {report['lookups_removed'] or 'aucune'}")
+
+    # Modèle réduit écrit et mesuré à côté, puis mis en place : la cible reste utilisable en cas d'erreur
+    staging = target.with_name(target.name + ".pruning")
+    if staging.exists():
+        shutil.rmtree(staging)
+    try:
+        nlp.to_disk(staging)
+        for extra in source.glob("*.json"):
+            if not (staging / extra.name).exists():
+                shutil.copy2(extra, staging / extra.name)
+        after = {"size_mb": round(model_size_mb(staging), 1), **measure_load(staging)}
+        report["before"], report["after"] = before, after
+        with open(staging / "pruning_report.json", "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        replace_directory(staging, target)
+    finally:
+        if staging.exists():
+            shutil.rmtree(staging)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Réduction de la table de vecteurs d'un modèle")
+    parser.add_argument("model", help="Dossier du modèle")
+    parser.add_argument("--output", help="Dossier du modèle réduit (défaut: <modèle>_pruned)")
+    parser.add_argument("--in-place", action="store_true", help="Remplacer le modèle par le modèle réduit")
+    parser.add_argument("--top-k", type=int, help="Lignes les plus fréquentes à garder en plus des mots du corpus")
+    parser.add_argument("--keep-lemmatizer", action="store_true", help="Garder le lemmatizer et ses tables")
+    parser.add_argument("--corpus", nargs="*", default=[], help="Fichiers JSON supplémentaires ([texte, annotations])")
+    args = parser.parse_args()
+
+    try:
+        report = prune_model(args.model, args.output, args.top_k, args.keep_lemmatizer, args.corpus, args.in_place)
+    except Exception as e:
+        logger.error(f"❌ Erreur lors de la réduction du modèle: {e}")
+        return False
+
+    before, after = report["before"], report["after"]
+    logger.info(f"📦 Taille: {before['size_mb']} -> {after['size_mb']} Mo")
+    logger.info(f"⏱️ Chargement: {before['load_s']} -> {after['load_s']} s")
+    logger.info(f"🧠 RSS: {before['rss_mb']} -> {after['rss_mb']} Mo")
+    logger.info(f"✅ Modèle réduit: {report['output']} (rapport: pruning_report.json)")
+    return True
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(0 if main() else 1)